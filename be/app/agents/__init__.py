@@ -1,9 +1,23 @@
 """Agents module"""
-from app.agents.router import router_agent
-from app.agents.welcome import welcome_agent
-from app.agents.numerology import numerology_agent
-from app.agents.tarot_swarm import tarot_swarm
-from app.agents.graph import agent_graph
+from importlib import import_module
+
+# Default instances are created on first access, so importing the package
+# does no network I/O (see app/api/lifespan.py for the startup warm-up).
+# `app.agents.tarot_swarm` is the submodule; the default swarm instance is
+# `app.agents.tarot_swarm.tarot_swarm`.
+_DEFAULTS = {
+    "router_agent": "app.agents.router",
+    "welcome_agent": "app.agents.welcome",
+    "numerology_agent": "app.agents.numerology",
+    "agent_graph": "app.agents.graph",
+}
+
+
+def __getattr__(name: str):
+    if name in _DEFAULTS:
+        return getattr(import_module(_DEFAULTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "router_agent",
@@ -1,28 +1,39 @@
 from strands import Agent
-from strands.models import BedrockModel
 from strands.types.content import Messages
 from app.core.config import config
 from app.core.prompt_manager import prompt_manager
+from app.agents.model import get_model
+from app.tools.tarot_tools import lookup_card_meanings
 
-model = BedrockModel(
-    model_id=config.MODEL_ID,
-    region_name=config.AWS_REGION
-)
+# Appended to the managed prompt in the swarm; pipeline and follow-up
+# interpreters append their own mode instructions to the bare prompt instead
+LOOKUP_INSTRUCTIONS = """
+
+**Card meanings:** Get the traditional meanings of all the cards at once with the
+lookup_card_meanings tool rather than reciting them from memory, then add the
+symbolism they do not cover."""
 
-# Get prompt config with version
-prompt_config = prompt_manager.get_prompt_config(
+# Prompt config with version, fetched on first use or during startup warm-up
+prompt = prompt_manager.lazy_prompt(
+    "card_interpreter",
     config.CARD_INTERPRETER_PROMPT_ID,
-    config.CARD_INTERPRETER_PROMPT_VERSION
+    config.CARD_INTERPRETER_PROMPT_VERSION,
+    instructions=LOOKUP_INSTRUCTIONS
 )
 
 def create_card_interpreter_agent(messages: Messages = None):
     """Create card interpreter agent with optional conversation history"""
     return Agent(
         name="card_interpreter",
-        system_prompt=prompt_config.text,
-        model=model,
+        system_prompt=prompt.text,
+        model=get_model(),
+        tools=[lookup_card_meanings],
         messages=messages or []
     )
 
-# Default agent without history
-card_interpreter_agent = create_card_interpreter_agent()
+def __getattr__(attr: str):
+    # Default agent without history, created on first access
+    if attr == "card_interpreter_agent":
+        agent = globals()["card_interpreter_agent"] = create_card_interpreter_agent()
+        return agent
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
@@ -1,9 +1,22 @@
-from strands.multiagent import GraphBuilder
-from strands.types.content import Messages
-from .router import router_agent
-from .welcome import create_welcome_agent, welcome_agent
-from .numerology import create_numerology_agent, numerology_agent
-from .tarot_swarm import create_tarot_swarm_with_history, tarot_swarm
+import asyncio
+import threading
+from typing import Dict, List, Optional
+from strands import Agent
+from strands.agent.state import AgentState
+from strands.multiagent import GraphBuilder, Swarm
+from strands.multiagent.base import Status
+from strands.multiagent.graph import Graph
+from strands.telemetry.metrics import EventLoopMetrics
+from strands.types.content import Message, Messages
+from app.core.config import config
+from app.core.history_window import history_window
+from app.core.prompt_manager import prompt_manager
+from . import router, welcome, numerology, tarot_swarm, tarot_pipeline
+from .router import create_router_agent
+from .welcome import create_welcome_agent
+from .numerology import create_numerology_agent
+from .tarot_swarm import create_tarot_swarm_with_history
+from .tarot_pipeline import TarotPipeline, create_tarot_pipeline
 
 def route_to_welcome(state):
     """Route to welcome agent if router decides on welcome."""
@@ -29,30 +42,63 @@ def route_to_tarot(state):
     result_text = str(router_result.result).lower().strip()
     return "tarot" in result_text
 
-def create_agent_graph_with_history(messages: Messages = None):
+def routed_intents(router_text: str) -> List[str]:
+    """Specialists the route_to_* conditions start for a router answer"""
+    text = router_text.lower().strip()
+    return [intent for intent in ("welcome", "numerology", "tarot") if intent in text]
+
+def _create_specialist(intent: str, messages: Messages = None, fresh: bool = False):
+    """Create the agent (or swarm) that handles an intent"""
+    # Without history the module-level defaults are shared unless fresh ones are asked for
+    new = bool(messages) or fresh
+    if intent == "welcome":
+        return create_welcome_agent(messages) if new else welcome.welcome_agent
+    if intent == "numerology":
+        return create_numerology_agent(messages) if new else numerology.numerology_agent
+    if intent == "tarot":
+        if config.TAROT_MODE == "pipeline":
+            return create_tarot_pipeline(messages, fresh) if new else tarot_pipeline.tarot_pipeline
+        return create_tarot_swarm_with_history(messages, fresh) if new else tarot_swarm.tarot_swarm
+    raise ValueError(f"Unknown intent '{intent}'")
+
+def create_agent_graph_with_history(messages: Messages = None, intent: str = None, fresh: bool = False):
     """
     Create a multi-agent graph with conversation history
     
     The graph routes to:
     - welcome: General greetings and introductions
     - numerology: Numerology calculations and readings
-    - tarot: Tarot readings (uses a Swarm of 3 specialized agents)
+    - tarot: Tarot readings (a fixed pipeline over a Swarm of 3 specialized
+      agents, or the swarm alone with TAROT_MODE=swarm)
     
     Args:
         messages: Conversation history to provide context to agents
+        intent: Specialist already chosen by the local intent classifier (or
+            the standalone router); the graph then holds just that node and
+            skips the router. Several specialists joined by "+" (as in
+            "numerology+tarot") all run, like a router answer naming both
+        fresh: Build new agents instead of sharing the module-level defaults
     """
     builder = GraphBuilder()
     
+    if intent is not None:
+        for name in intent.split("+"):
+            builder.add_node(_create_specialist(name, messages, fresh), name)
+            builder.set_entry_point(name)
+        builder.set_execution_timeout(600)
+        builder.set_node_timeout(180)
+        return builder.build()
+    
     # Create agents and swarm (with or without history)
-    welcome = create_welcome_agent(messages) if messages else welcome_agent
-    numerology = create_numerology_agent(messages) if messages else numerology_agent
-    tarot = create_tarot_swarm_with_history(messages) if messages else tarot_swarm
+    welcome_node = _create_specialist("welcome", messages, fresh)
+    numerology_node = _create_specialist("numerology", messages, fresh)
+    tarot_node = _create_specialist("tarot", messages, fresh)
     
     # Add nodes
-    builder.add_node(router_agent, "router")
-    builder.add_node(welcome, "welcome")
-    builder.add_node(numerology, "numerology")
-    builder.add_node(tarot, "tarot")  # Tarot is a Swarm!
+    builder.add_node(create_router_agent() if fresh else router.router_agent, "router")
+    builder.add_node(welcome_node, "welcome")
+    builder.add_node(numerology_node, "numerology")
+    builder.add_node(tarot_node, "tarot")  # Tarot is a pipeline or a Swarm!
     
     # Add conditional edges
     builder.add_edge("router", "welcome", condition=route_to_welcome)
@@ -68,5 +114,179 @@ def create_agent_graph_with_history(messages: Messages = None):
     
     return builder.build()
 
-# Create default graph instance without history
-agent_graph = create_agent_graph_with_history()
+def _copy_history(messages: Messages) -> Messages:
+    # Agents append to their list, so every agent gets its own
+    return [Message(role=m["role"], content=list(m["content"])) for m in messages]
+
+def _reset_agent(agent: Agent, messages: Messages):
+    """Give a pooled agent a clean per-request conversation"""
+    prompt = prompt_manager.registered(agent.name)
+    if prompt is not None and prompt.loaded:
+        # Pick up refreshed DRAFT prompts without rebuilding the agent; a
+        # prompt that is not cached would be fetched here, so the agent keeps
+        # the one it was built with
+        agent.system_prompt = prompt.text
+    if agent.name == "numerology":
+        numerology.bind_tools(agent)
+    agent.messages = _copy_history(messages)
+    agent.state = AgentState()
+    agent.event_loop_metrics = EventLoopMetrics()
+    if hasattr(agent.conversation_manager, "removed_message_count"):
+        agent.conversation_manager.removed_message_count = 0
+
+def bind_history(graph: Graph, messages: Messages = None):
+    """
+    Bind a session's history to a prebuilt graph before running it
+
+    Specialists (and every swarm member) start from the history, or the last
+    turns of it for agents listed in HISTORY_AGENT_TURNS; the router stays
+    stateless. Swarm members are reset to their initial messages each
+    time they run, so the history is bound there too. A tarot pipeline keeps
+    the history for its advisor and binds it to its fallback swarm.
+    Numerology agents also get the tools picked for this request (MCP or local).
+
+    Args:
+        graph: Graph built by create_agent_graph_with_history(fresh=True)
+        messages: Conversation history for this request
+    """
+    messages = messages or []
+    for node_id, node in graph.nodes.items():
+        history = [] if node_id == "router" else messages
+        executor = node.executor
+        if isinstance(executor, TarotPipeline):
+            # Only the advisor sees history in the pipeline
+            executor.messages = _copy_history(history_window.slice_for("life_advisor", history))
+            executor = executor.swarm
+        if isinstance(executor, Swarm):
+            for swarm_node in executor.nodes.values():
+                member_history = history_window.slice_for(swarm_node.node_id, history)
+                _reset_agent(swarm_node.executor, member_history)
+                swarm_node._initial_messages = _copy_history(member_history)
+                swarm_node._initial_state = AgentState()
+        else:
+            node_history = history_window.slice_for(node_id, history)
+            _reset_agent(executor, node_history)
+            node._initial_messages = _copy_history(node_history)
+            node._initial_state = AgentState()
+        node.execution_status = Status.PENDING
+        node.result = None
+
+class AgentGraphPool:
+    """
+    Reuse compiled graphs across requests instead of rebuilding them per turn.
+
+    Building a graph creates seven agents (tool registries, swarm handoff
+    tools) and validates the graph and swarm. Graphs are built once per route
+    ("router" or a fast-path intent), checked out by one request at a time with
+    that request's history bound, and returned afterwards. A graph whose run
+    failed or was cancelled is discarded rather than returned. Standalone
+    router agents (speculative and shadow routing) are pooled the same way.
+    """
+
+    ROUTER = "router"
+
+    def __init__(self, max_idle: int = None):
+        self.max_idle = max_idle or config.GRAPH_POOL_MAX_IDLE
+        self._idle: Dict[str, List[Graph]] = {}
+        self._idle_routers: List[Agent] = []
+        self._lock = threading.Lock()
+        self.built = 0
+        self.reused = 0
+
+    def _build(self, intent: Optional[str]) -> Graph:
+        with self._lock:
+            self.built += 1
+        return create_agent_graph_with_history(intent=intent, fresh=True)
+
+    def acquire(self, messages: Messages = None, intent: str = None) -> Graph:
+        """
+        Check out a graph with the session's history bound
+
+        Args:
+            messages: Conversation history for this request
+            intent: Fast-path intent, or None for the full routed graph
+
+        Returns:
+            A graph owned by the caller until release()
+        """
+        graph = self._take_idle(intent) or self._build(intent)
+        bind_history(graph, messages)
+        return graph
+
+    async def acquire_async(self, messages: Messages = None, intent: str = None) -> Graph:
+        """Like acquire(), but builds on a worker thread when no graph is idle"""
+        graph = self._take_idle(intent)
+        if graph is None:
+            # Building takes long enough to stall every other request on the loop
+            graph = await asyncio.to_thread(self._build, intent)
+        await prompt_manager.load_async()
+        bind_history(graph, messages)
+        return graph
+
+    def _take_idle(self, intent: Optional[str]) -> Optional[Graph]:
+        with self._lock:
+            idle = self._idle.get(intent or self.ROUTER)
+            graph = idle.pop() if idle else None
+            if graph is not None:
+                self.reused += 1
+        return graph
+
+    def release(self, graph: Graph, intent: str = None):
+        """Return a graph after a successful run"""
+        key = intent or self.ROUTER
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(graph)
+
+    async def acquire_router_async(self) -> Agent:
+        """Check out a standalone router agent, building one on a worker thread when none is idle"""
+        with self._lock:
+            agent = self._idle_routers.pop() if self._idle_routers else None
+            if agent is not None:
+                self.reused += 1
+            else:
+                self.built += 1
+        if agent is None:
+            agent = await asyncio.to_thread(create_router_agent)
+        await prompt_manager.load_async([router.prompt])
+        _reset_agent(agent, [])
+        return agent
+
+    def release_router(self, agent: Agent):
+        """Return a standalone router agent after a successful run"""
+        with self._lock:
+            if len(self._idle_routers) < self.max_idle:
+                self._idle_routers.append(agent)
+
+    def clear(self):
+        """Drop idle graphs, e.g. after the MCP tool list changed"""
+        with self._lock:
+            self._idle.clear()
+
+    def warm(self, intents: List[Optional[str]] = None):
+        """Prebuild one graph per route, and a router agent when the router runs on its own"""
+        for intent in intents if intents is not None else [None, "welcome", "numerology", "tarot"]:
+            self.release(self._build(intent), intent)
+        if intents is None and (config.SPECULATIVE_ROUTING or config.INTENT_SHADOW_RATE > 0):
+            with self._lock:
+                self.built += 1
+            self.release_router(create_router_agent())
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "built": self.built,
+                "reused": self.reused,
+                "idle": sum(len(graphs) for graphs in self._idle.values()) + len(self._idle_routers)
+            }
+
+def __getattr__(attr: str):
+    # Default graph instance without history, created on first access
+    if attr == "agent_graph":
+        graph = globals()["agent_graph"] = create_agent_graph_with_history()
+        return graph
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
+
+# Global graph pool instance
+agent_graph_pool = AgentGraphPool()
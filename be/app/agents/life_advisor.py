@@ -1,16 +1,12 @@
 from strands import Agent
-from strands.models import BedrockModel
 from strands.types.content import Messages
 from app.core.config import config
 from app.core.prompt_manager import prompt_manager
+from app.agents.model import get_model
 
-model = BedrockModel(
-    model_id=config.MODEL_ID,
-    region_name=config.AWS_REGION
-)
-
-# Get prompt config with version
-prompt_config = prompt_manager.get_prompt_config(
+# Prompt config with version, fetched on first use or during startup warm-up
+prompt = prompt_manager.lazy_prompt(
+    "life_advisor",
     config.LIFE_ADVISOR_PROMPT_ID,
     config.LIFE_ADVISOR_PROMPT_VERSION
 )
@@ -19,10 +15,14 @@ def create_life_advisor_agent(messages: Messages = None):
     """Create life advisor agent with optional conversation history"""
     return Agent(
         name="life_advisor",
-        system_prompt=prompt_config.text,
-        model=model,
+        system_prompt=prompt.get().text,
+        model=get_model(),
         messages=messages or []
     )
 
-# Default agent without history
-life_advisor_agent = create_life_advisor_agent()
+def __getattr__(attr: str):
+    # Default agent without history, created on first access
+    if attr == "life_advisor_agent":
+        agent = globals()["life_advisor_agent"] = create_life_advisor_agent()
+        return agent
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
@@ -0,0 +1,29 @@
+"""
+Bedrock model shared by all agents
+"""
+import threading
+from strands.models import BedrockModel, Model
+from app.core.cassette import CassetteModel, cassette
+from app.core.config import config
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model() -> Model:
+    """
+    Return the shared BedrockModel, creating its client on first use
+
+    With CASSETTE_MODE=record it is wrapped to record every call; with
+    CASSETTE_MODE=replay no client is created and calls are served from the cassette.
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                model = None if cassette.replaying else BedrockModel(
+                    model_id=config.MODEL_ID,
+                    region_name=config.AWS_REGION
+                )
+                _model = CassetteModel(model, cassette) if cassette.enabled else model
+    return _model
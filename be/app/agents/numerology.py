@@ -1,40 +1,192 @@
+import threading
+from typing import Any, Dict, List
 from mcp.client.sse import sse_client
+from mcp.types import Tool
 from strands import Agent
-from strands.models import BedrockModel
-from strands.tools.mcp import MCPClient
+from strands.tools.mcp import MCPAgentTool
+from strands.tools.registry import ToolRegistry
 from strands.types.content import Messages
 from app.core.config import config
+from app.core.mcp_pool import MCPSessionPool
 from app.core.prompt_manager import prompt_manager
+from app.core.cassette import cassette
+from app.core.tool_cache import mcp_tool_cache
+from app.agents.model import get_model
+from app.tools.numerology_tools import NUMEROLOGY_TOOLS
 
-# Connect to MCP server using SSE transport
-sse_mcp_client = MCPClient(lambda: sse_client(config.MCP_SERVER_URI))
+# Pooled SSE sessions to the MCP server (opened on first use or during warm-up)
+mcp_pool = MCPSessionPool(lambda: sse_client(config.MCP_SERVER_URI, timeout=config.MCP_CONNECT_TIMEOUT))
 
-model = BedrockModel(
-    model_id=config.MODEL_ID,
-    region_name=config.AWS_REGION
-)
-
-# Start the MCP client session
-sse_mcp_client.__enter__()
-
-# Get tools from MCP server
-mcp_tools = sse_mcp_client.list_tools_sync()
+_mcp_tools = None
+_mcp_lock = threading.Lock()
+# (listed MCP tools, the same wrapped for the cassette and tool cache)
+_wrapped_tools = None
+_listing = False
+# Provider picked for the last agent: "mcp", "local" or "none"
+_provider = None
 
-# Get prompt config with version
-prompt_config = prompt_manager.get_prompt_config(
+# Prompt config with version, fetched on first use or during startup warm-up
+prompt = prompt_manager.lazy_prompt(
+    "numerology",
     config.NUMEROLOGY_PROMPT_ID,
     config.NUMEROLOGY_PROMPT_VERSION
 )
 
+def mcp_enabled() -> bool:
+    """Whether numerology may use the remote MCP server at all"""
+    return config.NUMEROLOGY_TOOLS != "local" and bool(config.MCP_SERVER_URI)
+
+def get_mcp_tools():
+    """
+    List the MCP server's tools (once per process, or restored from a snapshot)
+
+    Tools are bound to the session pool, so calls are spread over its sessions
+
+    Raises:
+        Exception: If the MCP server cannot be reached; the next call retries
+    """
+    global _mcp_tools
+    if _mcp_tools is None:
+        refresh_mcp_tools()
+    return _mcp_tools
+
+def refresh_mcp_tools() -> bool:
+    """
+    Re-list tools from the MCP server
+
+    Returns:
+        True if the tool specs differ from the ones in use
+    """
+    global _mcp_tools
+    tools = mcp_pool.list_tools_sync()
+    with _mcp_lock:
+        changed = _mcp_tools is None or _specs(tools) != _specs(_mcp_tools)
+        _mcp_tools = tools
+    return changed
+
+def _specs(tools) -> List[Dict[str, Any]]:
+    return [tool.mcp_tool.model_dump(mode="json", exclude_none=True) for tool in tools]
+
+def mcp_tool_specs() -> List[Dict[str, Any]]:
+    """Specs of the tools in use, for the warm-start snapshot"""
+    return _specs(_mcp_tools) if _mcp_tools is not None else []
+
+def restore_mcp_tools(specs: List[Dict[str, Any]]):
+    """Use tool specs from the warm-start snapshot until the live list arrives"""
+    global _mcp_tools
+    with _mcp_lock:
+        if _mcp_tools is None and specs:
+            # The pool opens its sessions on the first call
+            _mcp_tools = [MCPAgentTool(Tool.model_validate(spec), mcp_pool) for spec in specs]
+
+def close_mcp_client():
+    """Close the pooled MCP sessions"""
+    global _mcp_tools
+    with _mcp_lock:
+        mcp_pool.stop()
+        _mcp_tools = None
+
+def _list_tools_in_background():
+    """List the MCP tools on a worker thread, once at a time, for requests that cannot wait"""
+    global _listing
+    with _mcp_lock:
+        if _listing:
+            return
+        _listing = True
+
+    def run():
+        global _listing
+        try:
+            refresh_mcp_tools()
+        except Exception as e:
+            print(f"⚠️  Could not list MCP tools: {e}")
+        finally:
+            _listing = False
+
+    threading.Thread(target=run, daemon=True).start()
+
+def _wrapped(tools: List[Any]) -> List[Any]:
+    # Wrapped once per tool list, so bind_tools can tell when an agent's tools are current
+    global _wrapped_tools
+    with _mcp_lock:
+        if _wrapped_tools is None or _wrapped_tools[0] is not tools:
+            # Repeated questions about the same name and birth date skip the round trip
+            _wrapped_tools = (tools, mcp_tool_cache.wrap(cassette.wrap_tools(tools)))
+        return _wrapped_tools[1]
+
+def _use(provider: str, tools: List[Any], reason: str = "") -> List[Any]:
+    global _provider
+    if provider != _provider:
+        _provider = provider
+        print(f"🔢 Numerology agents use {provider} tools{f' ({reason})' if reason else ''}")
+    return tools
+
+def select_tools(wait: bool = True) -> List[Any]:
+    """
+    Tools for a numerology agent, per NUMEROLOGY_TOOLS
+
+    In auto mode the in-process calculators stand in for MCP while the server
+    is unreachable, or its recent calls are slower than MCP_SLOW_CALL_SECONDS
+    (until MCP_SLOW_RETRY_SECONDS pass without an MCP call).
+
+    Args:
+        wait: List the MCP tools now if they are not listed yet (blocking);
+            otherwise list them in the background once a session is
+            connected, and fall back meanwhile
+    """
+    if not mcp_enabled():
+        return NUMEROLOGY_TOOLS
+    fallback = NUMEROLOGY_TOOLS if config.NUMEROLOGY_TOOLS == "auto" else []
+    fallback_provider = "local" if fallback else "none"
+    if _mcp_tools is None and not wait:
+        # While every session is down, health checks reconnect them first
+        if not mcp_pool.unreachable:
+            _list_tools_in_background()
+        return _use(fallback_provider, fallback, "MCP tools not listed yet")
+    try:
+        tools = get_mcp_tools()
+    except Exception as e:
+        return _use(fallback_provider, fallback, f"MCP tools unavailable: {e}")
+    if fallback and mcp_pool.unreachable:
+        return _use(fallback_provider, fallback, "MCP server unreachable")
+    if fallback and mcp_pool.is_slow(config.MCP_SLOW_CALL_SECONDS, config.MCP_SLOW_RETRY_SECONDS):
+        return _use(fallback_provider, fallback, f"MCP calls are slow, {mcp_pool.recent_latency:.1f}s")
+    return _use("mcp", _wrapped(tools))
+
+def bind_tools(agent: Agent):
+    """
+    Give a pooled numerology agent the tools select_tools picks for this request
+
+    Pooled graphs outlive MCP outages and slow spells, so the provider is
+    chosen per request rather than when the agent was built. The agent's tool
+    registry is only rebuilt when the choice changed. Never blocks on MCP.
+    """
+    tools = select_tools(wait=False)
+    registry = agent.tool_registry.registry
+    if len(registry) == len(tools) and all(registry.get(tool.tool_name) is tool for tool in tools):
+        return
+    tool_registry = ToolRegistry()
+    tool_registry.process_tools(tools)
+    agent.tool_registry = tool_registry
+
 def create_numerology_agent(messages: Messages = None):
-    """Create numerology agent with optional conversation history"""
+    """
+    Create numerology agent with optional conversation history
+
+    Graphs are built on the event loop, so the tools are picked without
+    waiting for MCP; bind_tools swaps in the MCP tools once they are listed.
+    """
     return Agent(
         name="numerology",
-        system_prompt=prompt_config.text,
-        model=model,
-        tools=mcp_tools,
+        system_prompt=prompt.get().text,
+        model=get_model(),
+        tools=select_tools(wait=False),
         messages=messages or []
     )
 
-# Default agent without history
-numerology_agent = create_numerology_agent()
+def __getattr__(attr: str):
+    # Default agent without history, created on first access
+    if attr == "numerology_agent":
+        agent = globals()["numerology_agent"] = create_numerology_agent()
+        return agent
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
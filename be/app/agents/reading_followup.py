@@ -0,0 +1,61 @@
+from typing import List
+from strands import Agent
+from strands.types.content import Messages
+from app.agents import card_interpreter
+from app.agents.model import get_model
+from app.core.history_window import history_window
+from app.core.reading_store import SessionReading
+from app.tools.card_meanings import card_meanings
+from app.tools.tarot_deck import SPREADS
+
+# Appended to the card interpreter prompt: this agent answers on its own
+FOLLOW_UP_INSTRUCTIONS = """
+
+**Follow-up mode:** The user is asking about a reading that was already drawn.
+Its cards, positions and standard meanings are given with the question. Do not
+draw new cards, do not repeat the CARDS: [...] line and do not hand off; there
+are no other agents in this conversation. Answer the question directly and
+completely, relating the cards to the original question."""
+
+def reading_context(entry: SessionReading, focus: List[int] = None) -> str:
+    """
+    Describe a stored reading for the model: spread, question and every card
+
+    Cards in `focus` (indices) get their full meaning and position note; the
+    rest are listed by name and position only.
+    """
+    reading = entry.reading
+    spread = SPREADS[reading.spread].title if reading.spread else f"{len(reading.ids)} card draw"
+    lines = [f"Current reading: {spread}"]
+    if entry.question:
+        lines.append(f"Asked for: {entry.question}")
+    focus = set(focus or range(len(reading.ids)))
+    meanings = card_meanings.lookup(reading.labels, reading.spread)
+    for i, (label, item) in enumerate(zip(reading.labels, meanings)):
+        where = f" ({item['position']})" if item.get("position") else ""
+        lines.append(f"{i + 1}. {label}{where}")
+        if i in focus and "error" not in item:
+            lines.append(f"   Keywords: {', '.join(item['keywords'])}")
+            lines.append(f"   Meaning: {item['meaning']}")
+            if item["position_note"]:
+                lines.append(f"   Position: {item['position_note']}")
+    return "\n".join(lines)
+
+def follow_up_prompt(question: str, entry: SessionReading, focus: List[int] = None) -> str:
+    """The user's question with the reading it refers to"""
+    return f"{reading_context(entry, focus)}\n\nFollow-up question: {question}"
+
+def create_reading_followup_agent(messages: Messages = None):
+    """Create a standalone card interpreter for follow-up questions, with optional history"""
+    # Named like the swarm member so streaming reports it as the tarot agent
+    return Agent(
+        name="card_interpreter",
+        system_prompt=card_interpreter.prompt.get().text + FOLLOW_UP_INSTRUCTIONS,
+        model=get_model(),
+        messages=history_window.slice_for("card_interpreter", messages or [])
+    )
+
+async def create_reading_followup_agent_async(messages: Messages = None):
+    """Like create_reading_followup_agent(), but a cold prompt cache is filled on a worker thread"""
+    await card_interpreter.prompt.get_async()
+    return create_reading_followup_agent(messages)
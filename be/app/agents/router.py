@@ -1,21 +1,28 @@
 from strands import Agent
-from strands.models import BedrockModel
+from strands.types.content import Messages
 from app.core.config import config
 from app.core.prompt_manager import prompt_manager
+from app.agents.model import get_model
 
-model = BedrockModel(
-    model_id=config.MODEL_ID,
-    region_name=config.AWS_REGION
-)
-
-# Get prompt config with version
-prompt_config = prompt_manager.get_prompt_config(
+# Prompt config with version, fetched on first use or during startup warm-up
+prompt = prompt_manager.lazy_prompt(
+    "router",
     config.ROUTER_PROMPT_ID,
     config.ROUTER_PROMPT_VERSION
 )
 
-router_agent = Agent(
-    name="router",
-    system_prompt=prompt_config.text,
-    model=model
-)
+def create_router_agent(messages: Messages = None):
+    """Create router agent with optional conversation history"""
+    return Agent(
+        name="router",
+        system_prompt=prompt.get().text,
+        model=get_model(),
+        messages=messages or []
+    )
+
+def __getattr__(attr: str):
+    # Default agent without history, created on first access
+    if attr == "router_agent":
+        agent = globals()["router_agent"] = create_router_agent()
+        return agent
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
@@ -1,30 +1,40 @@
 from strands import Agent
-from strands.models import BedrockModel
 from strands.types.content import Messages
 from app.core.config import config
 from app.core.prompt_manager import prompt_manager
-from app.tools.tarot_tools import draw_tarot_cards
+from app.agents.model import get_model
+from app.tools.tarot_tools import draw_tarot_cards, lookup_card_meanings
 
-model = BedrockModel(
-    model_id=config.MODEL_ID,
-    region_name=config.AWS_REGION
-)
+# Appended to the managed prompt, which predates lookup_card_meanings
+LOOKUP_INSTRUCTIONS = """
+
+**Card meanings:** After drawing, call lookup_card_meanings ONCE with all drawn
+cards and the same spread to get their keywords, meanings and position notes.
+Only consult card_interpreter when the user asks about deeper symbolism or
+imagery that the looked-up meanings do not cover."""
 
-# Get prompt config with version
-prompt_config = prompt_manager.get_prompt_config(
+# Prompt config with version, fetched on first use or during startup warm-up
+prompt = prompt_manager.lazy_prompt(
+    "spread_reader",
     config.SPREAD_READER_PROMPT_ID,
-    config.SPREAD_READER_PROMPT_VERSION
+    config.SPREAD_READER_PROMPT_VERSION,
+    instructions=LOOKUP_INSTRUCTIONS
 )
 
 def create_spread_reader_agent(messages: Messages = None):
     """Create spread reader agent with optional conversation history"""
     return Agent(
         name="spread_reader",
-        system_prompt=prompt_config.text,
-        model=model,
-        tools=[draw_tarot_cards],  # Add tarot card drawing tool
+        system_prompt=prompt.text,
+        model=get_model(),
+        # Standard meanings come from the local index instead of a card_interpreter handoff
+        tools=[draw_tarot_cards, lookup_card_meanings],
         messages=messages or []
     )
 
-# Default agent without history
-spread_reader_agent = create_spread_reader_agent()
+def __getattr__(attr: str):
+    # Default agent without history, created on first access
+    if attr == "spread_reader_agent":
+        agent = globals()["spread_reader_agent"] = create_spread_reader_agent()
+        return agent
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
@@ -0,0 +1,287 @@
+import asyncio
+import re
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+from strands import Agent
+from strands.agent import AgentResult
+from strands.multiagent import Swarm
+from strands.multiagent.base import MultiAgentBase, MultiAgentResult, NodeResult, Status
+from strands.types.content import ContentBlock, Message, Messages
+from app.core.config import config
+from app.agents import card_interpreter, life_advisor
+from app.agents.model import get_model
+from app.agents.tarot_swarm import create_tarot_swarm_with_history
+from app.tools.card_meanings import card_meanings
+from app.tools.tarot_deck import SPREADS, Reading, SpreadRequest
+from app.tools.tarot_tools import draw_for_session
+
+# Appended to the member prompts: in the pipeline every agent answers once, without handoffs
+INTERPRETER_INSTRUCTIONS = """
+
+**Pipeline mode:** You are interpreting ONE card of a reading that has already been
+drawn; other interpreters handle the other cards. Do not draw cards, do not call
+tools and do not hand off. In 3-5 sentences, interpret this card in its position
+for the user's question, adding symbolism beyond the standard meaning given."""
+
+ADVISOR_INSTRUCTIONS = """
+
+**Pipeline mode:** The cards have been drawn and interpreted for you. Write the
+complete final answer to the user: present each card in its position with its
+interpretation, then the overall message and your practical guidance. Do not
+hand off, do not draw cards and do not include a CARDS: [...] line; there are
+no other agents in this conversation."""
+
+# Requests the pipeline does not cover: learning about tarot rather than getting a reading
+_NOT_A_READING = re.compile(
+    r"\b(what (does|do|is)\b.{0,40}\bmean|meaning of|symbolism|history|origins?|how (does|do) tarot"
+    r"|learn|teach|difference between|compare|which deck|explain tarot)\b",
+    re.IGNORECASE
+)
+_DRAW_REQUEST = re.compile(r"\b(draw|pull|deal|lay out|reading|spread|card of the day)\b", re.IGNORECASE)
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12
+}
+_CARD_COUNT = re.compile(r"\b(\d{1,2}|" + "|".join(_NUMBER_WORDS) + r")[- ]cards?\b", re.IGNORECASE)
+_COUNT_SPREADS = {1: "single", 3: "three_card", 5: "five_card", 10: "celtic_cross"}
+_SPREAD_CUES = [
+    (re.compile(r"\bceltic cross\b", re.IGNORECASE), "celtic_cross"),
+    (re.compile(r"\b(single card|one card|a card|card of the day)\b", re.IGNORECASE), "single"),
+    (re.compile(r"\b(relationship|partner|boyfriend|girlfriend|husband|wife|crush|my ex)\b", re.IGNORECASE), "relationship")
+]
+# Largest plain draw the pipeline fans out; bigger ones go to the swarm
+MAX_PIPELINE_CARDS = 10
+
+# Global count of readings by how they were executed, for /ping
+tarot_runs: Counter = Counter()
+
+# Stands in for the spread reader when the draw is reported to a stream
+_DRAW_NODE = SimpleNamespace(name="spread_reader")
+
+
+def plan_spread(question: str) -> Optional[SpreadRequest]:
+    """
+    The spread a standard reading request needs, if the pipeline can serve it
+
+    Args:
+        question: The user prompt
+
+    Returns:
+        A spread name or card count, or None when the request is better left
+        to the open-ended swarm (questions about tarot itself, large draws)
+    """
+    if _NOT_A_READING.search(question) and not _DRAW_REQUEST.search(question):
+        return None
+    for pattern, spread in _SPREAD_CUES:
+        if pattern.search(question):
+            return spread
+    match = _CARD_COUNT.search(question)
+    if match:
+        word = match.group(1).lower()
+        count = _NUMBER_WORDS.get(word) or int(word)
+        if not 1 <= count <= MAX_PIPELINE_CARDS:
+            return None
+        return _COUNT_SPREADS.get(count, count)
+    return "three_card"
+
+
+def _task_text(task: Any) -> str:
+    if isinstance(task, str):
+        return task
+    return " ".join(block.get("text", "") for block in task if isinstance(block, dict))
+
+
+def _result_text(result: AgentResult) -> str:
+    return "".join(block.get("text", "") for block in result.message.get("content", [])).strip()
+
+
+def _card_prompt(question: str, reading: Reading, index: int, meaning: Dict[str, Any]) -> str:
+    spread = SPREADS[reading.spread].title if reading.spread else f"{len(reading.ids)} card draw"
+    lines = [
+        f"Question: {question}",
+        f"Reading: {spread}, card {index + 1} of {len(reading.ids)}",
+        f"Card: {reading.labels[index]}"
+    ]
+    if meaning.get("position"):
+        lines.append(f"Position: {meaning['position']} - {meaning['position_note']}")
+    if "error" not in meaning:
+        lines.append(f"Keywords: {', '.join(meaning['keywords'])}")
+        lines.append(f"Standard meaning: {meaning['meaning']}")
+    return "\n".join(lines)
+
+
+def _advisor_prompt(question: str, reading: Reading, interpretations: List[str]) -> str:
+    spread = SPREADS[reading.spread].title if reading.spread else f"{len(reading.ids)} card draw"
+    lines = [f"Question: {question}", f"Reading: {spread}", ""]
+    for i, (label, position, text) in enumerate(zip(reading.labels, reading.positions, interpretations)):
+        lines.append(f"{i + 1}. {label}" + (f" ({position})" if position else ""))
+        lines.append(text)
+        lines.append("")
+    lines.append("Write the final reading for the user.")
+    return "\n".join(lines)
+
+
+def _add_usage(total: Dict[str, int], result: AgentResult):
+    usage = result.metrics.accumulated_usage
+    for key in ("inputTokens", "outputTokens", "totalTokens"):
+        total[key] = total.get(key, 0) + usage.get(key, 0)
+
+
+def _node_result(result: AgentResult, elapsed_ms: int) -> NodeResult:
+    return NodeResult(
+        result=result,
+        execution_time=elapsed_ms,
+        status=Status.COMPLETED,
+        accumulated_usage=dict(result.metrics.accumulated_usage),
+        accumulated_metrics=dict(result.metrics.accumulated_metrics),
+        execution_count=1
+    )
+
+
+@dataclass
+class PipelineResult(MultiAgentResult):
+    """Result of a pipeline run: node ids in run order and the reading drawn"""
+    node_history: List[str] = field(default_factory=list)
+    reading: Optional[Reading] = None
+
+
+class TarotPipeline(MultiAgentBase):
+    """
+    Fixed draw -> interpret -> advise execution of standard tarot readings
+
+    The swarm needs a model call for every handoff and serialises them, so a
+    three card reading costs around ten calls in sequence. The pipeline draws
+    the spread in code, interprets every card with its own card_interpreter
+    call concurrently and has life_advisor write the final answer: N + 1
+    calls, two in sequence. Requests plan_spread() does not recognise as a
+    reading go to the wrapped swarm unchanged, and so does a reading whose
+    card interpretation fails.
+    """
+
+    def __init__(self, swarm: Swarm, messages: Messages = None, concurrency: int = None):
+        self.swarm = swarm
+        self.messages = messages or []
+        self.concurrency = concurrency or config.TAROT_PIPELINE_CONCURRENCY
+
+    def _interpreter(self) -> Agent:
+        # Interpreters see only their card; their text reaches the user through the advisor
+        return Agent(
+            name="card_interpreter",
+            system_prompt=card_interpreter.prompt.get().text + INTERPRETER_INSTRUCTIONS,
+            model=get_model(),
+            callback_handler=None
+        )
+
+    def _advisor(self) -> Agent:
+        return Agent(
+            name="life_advisor",
+            system_prompt=life_advisor.prompt.get().text + ADVISOR_INSTRUCTIONS,
+            model=get_model(),
+            messages=[Message(role=m["role"], content=list(m["content"])) for m in self.messages]
+        )
+
+    def _report_draw(self, callback, reading: Reading):
+        """Show the draw to a stream the way a draw_tarot_cards call would appear"""
+        tool_use_id = f"pipeline-{uuid.uuid4().hex[:8]}"
+        callback(agent=_DRAW_NODE, message={"role": "assistant", "content": [{"toolUse": {
+            "toolUseId": tool_use_id, "name": "draw_tarot_cards", "input": {"spread": reading.spread or ""}
+        }}]})
+        callback(agent=_DRAW_NODE, message={"role": "user", "content": [{"toolResult": {
+            "toolUseId": tool_use_id, "status": "success",
+            "content": [{"text": reading.formatted}, {"json": reading.to_dict()}]
+        }}]})
+
+    async def invoke_async(self, task, invocation_state: Dict[str, Any] = None, **kwargs) -> MultiAgentResult:
+        """
+        Run a reading through the pipeline, or the swarm if it is not a standard reading
+
+        Args:
+            task: The user prompt
+            invocation_state: actor_id, session_id, question and optionally a
+                callback_handler for streaming, as routes pass to the graph
+        """
+        invocation_state = invocation_state or {}
+        question = invocation_state.get("question") or _task_text(task)
+        spread = plan_spread(question)
+        if spread is None:
+            tarot_runs["swarm_fallback"] += 1
+            return await self.swarm.invoke_async(task, invocation_state, **kwargs)
+        tarot_runs["pipeline"] += 1
+        start = time.time()
+
+        reading = await asyncio.to_thread(draw_for_session, invocation_state, spread)
+
+        meanings = card_meanings.lookup(reading.labels, reading.spread)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def interpret(index: int) -> Tuple[AgentResult, int]:
+            async with semaphore:
+                started = time.time()
+                agent_result = await self._interpreter().invoke_async(
+                    _card_prompt(question, reading, index, meanings[index])
+                )
+                return agent_result, round((time.time() - started) * 1000)
+
+        interpreted = await asyncio.gather(
+            *(interpret(i) for i in range(len(reading.ids))), return_exceptions=True
+        )
+        failures = [error for error in interpreted if isinstance(error, BaseException)]
+        if failures:
+            # Nothing has been streamed yet, so the swarm can still give the whole reading
+            print(f"⚠️ Card interpretation failed ({failures[0]!r}), falling back to the tarot swarm")
+            tarot_runs["interpreter_failed"] += 1
+            return await self.swarm.invoke_async(task, invocation_state, **kwargs)
+
+        callback = invocation_state.get("callback_handler")
+        if callback is not None:
+            self._report_draw(callback, reading)
+        advice_started = time.time()
+        advice = await self._advisor().invoke_async(
+            _advisor_prompt(question, reading, [_result_text(r) for r, _ in interpreted]),
+            **invocation_state
+        )
+        advice_ms = round((time.time() - advice_started) * 1000)
+
+        # The card line leads the answer, as the spread reader would write it
+        final = AgentResult(
+            stop_reason=advice.stop_reason,
+            message=Message(role="assistant", content=[
+                ContentBlock(text=f"{reading.formatted}\n\n{_result_text(advice)}")
+            ]),
+            metrics=advice.metrics,
+            state=advice.state
+        )
+        result = PipelineResult(status=Status.COMPLETED, execution_count=len(interpreted) + 1, reading=reading)
+        for i, (agent_result, elapsed_ms) in enumerate(interpreted):
+            node_id = f"card_interpreter_{i + 1}"
+            result.results[node_id] = _node_result(agent_result, elapsed_ms)
+            result.node_history.append(node_id)
+            _add_usage(result.accumulated_usage, agent_result)
+        result.results["life_advisor"] = _node_result(final, advice_ms)
+        result.node_history.append("life_advisor")
+        _add_usage(result.accumulated_usage, advice)
+        result.execution_time = round((time.time() - start) * 1000)
+        result.accumulated_metrics["latencyMs"] = result.execution_time
+        return result
+
+def create_tarot_pipeline(messages: Messages = None, fresh: bool = False):
+    """
+    Create a tarot pipeline with conversation history, falling back to a tarot swarm
+
+    Args:
+        messages: Conversation history; the advisor and the fallback swarm start from it
+        fresh: Build new agents instead of sharing the module-level defaults
+    """
+    return TarotPipeline(create_tarot_swarm_with_history(messages, fresh), messages)
+
+
+def __getattr__(attr: str):
+    # Default pipeline instance without history, created on first access
+    if attr == "tarot_pipeline":
+        pipeline = globals()["tarot_pipeline"] = create_tarot_pipeline()
+        return pipeline
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
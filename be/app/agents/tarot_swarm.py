@@ -1,10 +1,11 @@
 from strands.multiagent import Swarm
 from strands.types.content import Messages
-from .card_interpreter import create_card_interpreter_agent, card_interpreter_agent
-from .spread_reader import create_spread_reader_agent, spread_reader_agent
-from .life_advisor import create_life_advisor_agent, life_advisor_agent
+from . import card_interpreter, spread_reader, life_advisor
+from .card_interpreter import create_card_interpreter_agent
+from .spread_reader import create_spread_reader_agent
+from .life_advisor import create_life_advisor_agent
 
-def create_tarot_swarm_with_history(messages: Messages = None):
+def create_tarot_swarm_with_history(messages: Messages = None, fresh: bool = False):
     """
     Create a Tarot Swarm with conversation history
     
@@ -15,16 +16,18 @@ def create_tarot_swarm_with_history(messages: Messages = None):
     
     Args:
         messages: Conversation history to provide context to agents
+        fresh: Build new agents instead of sharing the module-level defaults
     """
     # Create agents (with or without history)
-    card_interpreter = create_card_interpreter_agent(messages) if messages else card_interpreter_agent
-    spread_reader = create_spread_reader_agent(messages) if messages else spread_reader_agent
-    life_advisor = create_life_advisor_agent(messages) if messages else life_advisor_agent
+    new = bool(messages) or fresh
+    interpreter = create_card_interpreter_agent(messages) if new else card_interpreter.card_interpreter_agent
+    reader = create_spread_reader_agent(messages) if new else spread_reader.spread_reader_agent
+    advisor = create_life_advisor_agent(messages) if new else life_advisor.life_advisor_agent
     
     # Create swarm with spread_reader as entry point (most common use case)
     swarm = Swarm(
-        [spread_reader, card_interpreter, life_advisor],
-        entry_point=spread_reader,  # Start with spread reader for most queries
+        [reader, interpreter, advisor],
+        entry_point=reader,  # Start with spread reader for most queries
         max_handoffs=15,  # Allow agents to collaborate
         max_iterations=15,
         execution_timeout=120.0,  # 2 minutes
@@ -35,5 +38,9 @@ def create_tarot_swarm_with_history(messages: Messages = None):
     
     return swarm
 
-# Create default swarm instance without history
-tarot_swarm = create_tarot_swarm_with_history()
+def __getattr__(attr: str):
+    # Default swarm instance without history, created on first access
+    if attr == "tarot_swarm":
+        swarm = globals()["tarot_swarm"] = create_tarot_swarm_with_history()
+        return swarm
+    raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
@@ -0,0 +1,165 @@
+"""
+Application startup and shutdown hooks
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from app.agents.graph import agent_graph_pool
+from app.agents.model import get_model
+from app.agents.numerology import (
+    close_mcp_client, get_mcp_tools, mcp_enabled, mcp_pool, mcp_tool_specs, refresh_mcp_tools, restore_mcp_tools
+)
+from app.auth import close_http_client, google_key_set
+from app.core.cassette import cassette
+from app.core.config import config
+from app.core.memory import short_term_memory
+from app.core.prompt_manager import prompt_manager
+from app.core.readiness import readiness
+from app.core.tool_cache import mcp_tool_cache
+from app.core.warm_snapshot import warm_snapshot
+from app.core.write_behind import memory_writer
+from app.tools.card_meanings import card_meanings
+from app.tools.tarot_deck import session_decks
+
+# Background warm-up task (kept referenced until it finishes)
+_warm_up_task = None
+# Periodic MCP session health checks
+_mcp_health_task = None
+
+
+async def _prefetch_prompts():
+    sources = await readiness.run("prompts", prompt_manager.prefetch)
+    # Prompts without a prompt ID are meant to come from prompts/; only failed fetches degrade readiness
+    local = sorted(
+        name for name, source in (sources or {}).items()
+        if source == "local" and prompt_manager.registered(name).prompt_identifier
+    )
+    if local:
+        readiness.warn("prompts", f"serving bundled prompts for: {', '.join(local)}")
+
+
+def _restore_snapshot() -> bool:
+    """Seed prompts and MCP tool specs from the warm-start snapshot"""
+    data = warm_snapshot.load()
+    if data is None:
+        return False
+    prompts = prompt_manager.restore_entries(data.get("prompts", {}))
+    restore_mcp_tools(data.get("mcp_tools", []))
+    print(f"⚡ Restored warm snapshot: {prompts} prompts, {len(data.get('mcp_tools', []))} MCP tools")
+    return True
+
+
+def _save_snapshot():
+    warm_snapshot.save(prompt_manager.export_entries(), mcp_tool_specs())
+
+
+def _restore_cassette():
+    """Serve the prompts, MCP tool specs and tarot seed a replayed cassette was recorded with"""
+    data = cassette.load_meta()
+    # Pinned: a refreshed prompt would change every request hash
+    prompts = prompt_manager.restore_entries(data.get("prompts", {}), ttl=float("inf"))
+    restore_mcp_tools(data.get("mcp_tools", []))
+    session_decks.base_seed = data["tarot_seed"]
+    print(f"📼 Replaying cassette {cassette.directory}: {prompts} prompts, "
+          f"{len(data.get('mcp_tools', []))} MCP tools, tarot seed {data['tarot_seed']}")
+
+
+def _save_cassette():
+    cassette.save_meta(prompt_manager.export_entries(), mcp_tool_specs(), session_decks.base_seed)
+
+
+async def _revalidate_snapshot():
+    """Check restored prompts and MCP tools against their sources, then re-save"""
+    checks = [asyncio.to_thread(prompt_manager.revalidate)]
+    if mcp_enabled():
+        checks.append(asyncio.to_thread(refresh_mcp_tools))
+    # Without MCP (local numerology tools) there is no tool list to change
+    sources, tools_changed = (await asyncio.gather(*checks, return_exceptions=True) + [False])[:2]
+    if isinstance(tools_changed, Exception):
+        print(f"⚠️  Could not revalidate MCP tools: {tools_changed}")
+    elif tools_changed:
+        # Pooled graphs were built with the snapshot's tool list, and cached
+        # results may come from the old tools
+        mcp_tool_cache.clear()
+        agent_graph_pool.clear()
+        await asyncio.to_thread(agent_graph_pool.warm)
+    if not isinstance(sources, Exception) and not isinstance(tools_changed, Exception):
+        await asyncio.to_thread(_save_snapshot)
+
+
+async def warm_up():
+    """
+    Load everything the first request needs, concurrently
+
+    Prompts, the MCP session, signing keys and AWS clients are independent,
+    so they are fetched in parallel; the graph pool is built once they are in
+    place. With a warm-start snapshot, prompts and MCP tool specs come from
+    disk, the service reports ready as soon as the graphs are built, and both
+    are revalidated against their sources afterwards. A replayed cassette
+    stands in for the snapshot and is never revalidated.
+    """
+    readiness.begin()
+    # Replays restore from the cassette before warm-up starts
+    restored = cassette.replaying or (
+        config.WARM_SNAPSHOT and await readiness.run("snapshot", _restore_snapshot, optional=True)
+    )
+
+    stages = [
+        readiness.run("bedrock_client", get_model),
+        readiness.run("memory_backend", lambda: short_term_memory.backend, optional=True),
+        readiness.run("card_meanings", card_meanings.load)
+    ]
+    if not restored:
+        stages.append(_prefetch_prompts())
+        if mcp_enabled():
+            stages.append(readiness.run("mcp_tools", get_mcp_tools, optional=True))
+    if config.AUTH_MODE == "jwks":
+        # Load signing keys up front so the first request verifies locally
+        stages.append(readiness.run("google_keys", google_key_set.refresh, optional=True))
+    await asyncio.gather(*stages)
+    # Compile one graph per route so the first requests only bind history
+    await readiness.run("graph_pool", agent_graph_pool.warm)
+    readiness.finish()
+
+    if cassette.recording:
+        await asyncio.to_thread(_save_cassette)
+    if not config.WARM_SNAPSHOT or cassette.replaying:
+        return
+    if restored:
+        await _revalidate_snapshot()
+    elif not readiness.errors:
+        await asyncio.to_thread(_save_snapshot)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Manage resources that live for the whole application lifetime"""
+    if cassette.replaying:
+        _restore_cassette()
+    if config.MEMORY_WRITE_BEHIND:
+        # Replays turns a previous process acknowledged but never flushed
+        await memory_writer.start()
+
+    global _warm_up_task, _mcp_health_task
+    if config.STARTUP_WARMUP:
+        # Serve /ping (not ready yet) while warming; early requests load lazily
+        _warm_up_task = asyncio.create_task(warm_up())
+    if config.MCP_HEALTH_INTERVAL > 0:
+        _mcp_health_task = asyncio.create_task(mcp_pool.run_health_checks())
+
+    yield
+
+    for task in (_warm_up_task, _mcp_health_task):
+        if task is not None and not task.done():
+            task.cancel()
+
+    await memory_writer.drain()
+    short_term_memory.shutdown()
+    await google_key_set.close()
+    # Release pooled connections held by the auth client
+    await close_http_client()
+    if cassette.recording:
+        # Prompts loaded after warm-up are only known now; MCP tool specs are gone once the client closes
+        await asyncio.to_thread(_save_cassette)
+        cassette.close()
+    await asyncio.to_thread(close_mcp_client)
@@ -0,0 +1,217 @@
+"""
+Typed extraction of the answer, responder, cards and usage from agent results
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from strands.agent import AgentResult
+from strands.multiagent.base import MultiAgentResult, NodeResult
+from strands.multiagent.graph import GraphResult
+from strands.multiagent.swarm import SwarmResult
+from app.tools.tarot_deck import Reading
+
+_THINKING = re.compile(r"<thinking>.*?</thinking>\s*", re.DOTALL)
+_CARDS_LINE = re.compile(r"CARDS:\s*\[([^\]]*)\]\s*")
+# Numbered instances of one agent (the pipeline's card_interpreter_1, _2, ...)
+_INSTANCE_SUFFIX = re.compile(r"_\d+$")
+
+
+class ResultExtractionError(RuntimeError):
+    """A graph, swarm or agent result held no answer to return"""
+
+
+@dataclass
+class ExtractedResult:
+    """What a turn produced, in the shape routes need it"""
+    text: str
+    # Graph node that answered ("welcome", "numerology", "tarot")
+    agent: str
+    # Agent that wrote the final text; differs from `agent` inside a swarm or pipeline
+    node: str
+    cards: List[str] = field(default_factory=list)
+    reading: Optional[Reading] = None
+    usage: Dict[str, int] = field(default_factory=dict)
+    # Per-agent breakdown of `usage` (for /metrics)
+    usages: List["NodeUsage"] = field(default_factory=list)
+
+
+def _split_cards(cards: str) -> List[str]:
+    return [card.strip() for card in cards.split(",") if card.strip()]
+
+
+def parse_cards(text: str) -> List[str]:
+    """Card names from a `CARDS: [A, B, C]` line, if present"""
+    match = _CARDS_LINE.search(text)
+    return _split_cards(match.group(1)) if match else []
+
+
+def clean_text(text: str, strip_cards: bool = False) -> Tuple[str, List[str]]:
+    """
+    Remove hidden spans from answer text
+
+    <thinking> blocks are removed only when present, and the CARDS: [...]
+    match that yields the card list is also the span cut out, so long
+    answers are scanned once per pattern.
+
+    Args:
+        text: Raw model text
+        strip_cards: Also remove the first CARDS: [...] line (tarot answers)
+
+    Returns:
+        (clean text, cards named on the removed line)
+    """
+    if "<thinking>" in text:
+        text = _THINKING.sub("", text)
+    cards: List[str] = []
+    if strip_cards:
+        match = _CARDS_LINE.search(text)
+        if match:
+            cards = _split_cards(match.group(1))
+            text = text[:match.start()] + text[match.end():]
+    return text.strip(), cards
+
+
+def message_text(result: AgentResult) -> str:
+    """Text of an agent's final message"""
+    content = result.message.get("content", []) if result.message else []
+    return "\n".join(block["text"] for block in content if "text" in block)
+
+
+def _last_node(result: MultiAgentResult) -> Optional[str]:
+    """Id of the node that ran last in a multi-agent result"""
+    if isinstance(result, GraphResult):
+        order = [node.node_id for node in result.execution_order if node.node_id in result.results]
+        return order[-1] if order else None
+    if isinstance(result, SwarmResult):
+        return result.node_history[-1].node_id if result.node_history else None
+    # Other executors (the tarot pipeline) list node ids in run order
+    history = getattr(result, "node_history", None)
+    if history:
+        return history[-1]
+    return next(reversed(result.results), None)
+
+
+def _final_agent_result(node_id: str, node_result: NodeResult) -> Tuple[str, AgentResult]:
+    """The agent result that answered for a node, descending into swarms and pipelines"""
+    inner = node_result.result
+    if isinstance(inner, Exception):
+        raise ResultExtractionError(f"Agent '{node_id}' failed: {inner}") from inner
+    if isinstance(inner, AgentResult):
+        return node_id, inner
+    if isinstance(inner, MultiAgentResult):
+        last = _last_node(inner)
+        if last is None or last not in inner.results:
+            raise ResultExtractionError(f"Agent '{node_id}' finished without a responder (status: {inner.status.value})")
+        return _final_agent_result(last, inner.results[last])
+    raise ResultExtractionError(f"Agent '{node_id}' returned an unexpected {type(inner).__name__}")
+
+
+@dataclass
+class NodeUsage:
+    """Work done by one agent during a run"""
+    # Graph node the agent ran under, and the agent itself
+    agent: str
+    node: str
+    usage: Dict[str, int]
+    # Time spent in the agent's event loop cycles (model and tool calls)
+    seconds: float
+    model_calls: int
+    # tool -> (calls, seconds)
+    tools: Dict[str, Tuple[int, float]]
+
+
+def agent_usage(agent: str, node: str, result: AgentResult) -> NodeUsage:
+    """Usage of one agent run, reported under graph node `agent`"""
+    metrics = result.metrics
+    return NodeUsage(
+        agent=agent,
+        node=_INSTANCE_SUFFIX.sub("", node),
+        usage=dict(metrics.accumulated_usage),
+        seconds=sum(metrics.cycle_durations),
+        model_calls=metrics.cycle_count,
+        tools={name: (tool.call_count, tool.total_time) for name, tool in metrics.tool_metrics.items()}
+    )
+
+
+def node_usages(result: MultiAgentResult, agent: str = None) -> List[NodeUsage]:
+    """
+    Per-agent usage of a graph run, descending into swarms and pipelines
+
+    An agent's event loop metrics cover every visit in the run (pooled agents
+    start each request with fresh metrics), so each agent is counted once.
+    Swarms add those cumulative metrics up again on every visit, which makes
+    their accumulated_usage overcount agents that were visited twice.
+    """
+    usages = []
+    for node_id, node_result in result.results.items():
+        inner = node_result.result
+        if isinstance(inner, AgentResult):
+            usages.append(agent_usage(agent or node_id, node_id, inner))
+        elif isinstance(inner, MultiAgentResult):
+            usages.extend(node_usages(inner, agent or node_id))
+    return usages
+
+
+def total_usage(usages: List[NodeUsage]) -> Dict[str, int]:
+    total = {"inputTokens": 0, "outputTokens": 0, "totalTokens": 0}
+    for item in usages:
+        for key in total:
+            total[key] += item.usage.get(key, 0)
+    return total
+
+
+def extract_graph_result(result: GraphResult, reading: Optional[Reading] = None) -> ExtractedResult:
+    """
+    The answer of a graph run: final text, answering node, drawn cards and usage
+
+    Args:
+        result: Result of graph.invoke_async
+        reading: Reading drawn during the turn (from the reading store), if
+            any; a reading on the tarot pipeline's own result is preferred,
+            and without either the cards come from the CARDS: [...] line
+
+    Raises:
+        ResultExtractionError: The graph failed or produced no text
+    """
+    answered = [
+        node.node_id for node in result.execution_order
+        if node.node_id != "router" and node.node_id in result.results
+    ]
+    if not answered:
+        raise ResultExtractionError(f"No agent answered (graph status: {result.status.value})")
+    agent = answered[-1]
+    node_result = result.results[agent]
+    node, agent_result = _final_agent_result(agent, node_result)
+    reading = getattr(node_result.result, "reading", None) or reading
+    usages = node_usages(result)
+    extracted = _extracted(agent, node, agent_result, reading, total_usage(usages))
+    extracted.usages = usages
+    return extracted
+
+
+def extract_agent_result(result: AgentResult, agent: str, strip_cards: bool = False) -> ExtractedResult:
+    """The answer of a single agent run, reported as `agent`"""
+    usage = dict(result.metrics.accumulated_usage) if result.metrics else {}
+    extracted = _extracted(agent, agent, result, None, usage, strip_cards)
+    # Cards were not drawn in this turn
+    extracted.cards = []
+    return extracted
+
+
+def _extracted(
+    agent: str, node: str, result: AgentResult, reading: Optional[Reading],
+    usage: Dict[str, int], strip_cards: bool = None
+) -> ExtractedResult:
+    strip = agent == "tarot" if strip_cards is None else strip_cards
+    text, cards = clean_text(message_text(result), strip_cards=strip)
+    if not text:
+        raise ResultExtractionError(f"Agent '{node}' returned no text (stop reason: {result.stop_reason})")
+    return ExtractedResult(
+        text=text,
+        agent=agent,
+        node=node,
+        cards=list(reading.labels) if reading is not None else cards,
+        reading=reading,
+        usage=usage
+    )
+
@@ -1,12 +1,37 @@
 """
 API routes for the multi-agent system
 """
+import asyncio
+import random
+import time
+from typing import List, Optional, Tuple
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from app.agents.graph import create_agent_graph_with_history
+from strands.multiagent.graph import Graph
+from strands.types.content import Messages
+from app.agents.graph import agent_graph_pool, routed_intents
+from app.agents.numerology import mcp_pool
+from app.agents.reading_followup import create_reading_followup_agent_async, follow_up_prompt
+from app.agents.tarot_pipeline import tarot_runs
+from app.core.cassette import cassette
+from app.core.config import config
+from app.core.history_window import history_window
+from app.core.intent_classifier import intent_classifier, IntentPrediction
 from app.core.memory import short_term_memory
-from strands.types.content import Message, ContentBlock
-import re
+from app.core.metrics import metrics
+from app.core.prompt_manager import prompt_manager
+from app.core.readiness import readiness
+from app.core.reading_store import reading_store, SessionReading
+from app.core.write_behind import memory_writer
+from app.core.session_tracker import session_tracker
+from app.core.speculation import speculation
+from app.core.tool_cache import mcp_tool_cache
+from app.api.results import (
+    ResultExtractionError, agent_usage, extract_agent_result, extract_graph_result
+)
+from app.api.streaming import StreamRelay, format_sse
+from app.auth import token_cache
 
 router = APIRouter()
 
@@ -24,105 +49,199 @@ class ChatResponse(BaseModel):
     card_list: list[str] = []
 
 
-@router.post("/invocations", response_model=ChatResponse)
-async def invocations(request: ChatRequest):
+async def _load_history(request: ChatRequest) -> Messages:
     """
-    Main invocation endpoint for Bedrock Agent Runtime
+    Load conversation history (cached per session, memory read only on a miss)
+
+    The result is compacted to the history window's token budget; the
+    session cache keeps the full history.
     """
+    with metrics.stage("history"):
+        messages = session_tracker.get(request.actor_id, request.session_id)
+        if messages is None:
+            events = await short_term_memory.alist_events(
+                actor_id=request.actor_id,
+                session_id=request.session_id,
+                max_results=config.SESSION_HISTORY_EVENTS
+            )
+            # Include this session's turns that are still waiting to be flushed
+            events = list(events) + memory_writer.pending_events(request.actor_id, request.session_id)
+            messages = session_tracker.put(request.actor_id, request.session_id, events)
+        return history_window.compact(request.actor_id, request.session_id, messages).messages
+
+
+def _classify(prompt: str) -> IntentPrediction:
+    with metrics.stage("classify"):
+        return intent_classifier.classify(prompt)
+
+
+# Shadow router calls in flight (kept referenced until they finish)
+_shadow_tasks = set()
+
+
+async def _create_graph(
+    request: ChatRequest, messages: Messages, prediction: IntentPrediction
+) -> Tuple[Graph, Optional[str]]:
+    """
+    Check out a pooled graph, skipping the LLM router when the local classifier is confident
+
+    Returns:
+        (graph, fast-path intent or None); hand the graph back with
+        agent_graph_pool.release(graph, intent) once it has run successfully
+    """
+    intent = None
+    if config.INTENT_FAST_PATH and intent_classifier.is_confident(prediction):
+        intent = prediction.intent
+        intent_classifier.record_fast_path(prediction)
+        if random.random() < config.INTENT_SHADOW_RATE:
+            task = asyncio.create_task(_shadow_route(request.prompt, prediction))
+            _shadow_tasks.add(task)
+            task.add_done_callback(_shadow_tasks.discard)
+    return await agent_graph_pool.acquire_async(messages, intent=intent), intent
+
+
+async def _speculate(
+    request: ChatRequest, messages: Messages, prediction: IntentPrediction, relay: Optional[StreamRelay] = None
+) -> Optional[Tuple[Graph, Optional[str], asyncio.Task, Optional[StreamRelay]]]:
+    """
+    Run the router alone while the session's likely specialist already answers
+
+    Only for turns that need the router (see _create_graph) when
+    SPECULATIVE_ROUTING predicts a specialist. The specialist runs in its
+    fast-path graph, reporting to a relay of its own; once the router
+    agrees, its run and its queued stream events are kept. Otherwise it is
+    cancelled and the specialists the router chose start in a fast-path
+    graph, without asking the router again: several at once when it named
+    several, welcome when it named none.
+
+    Args:
+        relay: The stream's relay, for /invocations/stream
+
+    Returns:
+        None when not speculating; else (graph, fast-path intent, the running
+        graph task, the relay its events go to)
+    """
+    if config.INTENT_FAST_PATH and intent_classifier.is_confident(prediction):
+        return None
+    predicted = speculation.predict(request.actor_id, request.session_id, prediction.intent)
+    if predicted is None:
+        return None
+
+    def start(graph: Graph, relay: Optional[StreamRelay]) -> asyncio.Task:
+        extra = {"callback_handler": relay} if relay is not None else {}
+        return asyncio.create_task(graph.invoke_async(request.prompt, invocation_state=_invocation_state(request, **extra)))
+
+    speculative_graph = await agent_graph_pool.acquire_async(messages, intent=predicted)
+    speculative_relay = StreamRelay() if relay is not None else None
+    speculative_task = start(speculative_graph, speculative_relay)
+    finished_at = []
+    speculative_task.add_done_callback(lambda _: finished_at.append(time.perf_counter()))
+    start_time = time.perf_counter()
+    router_agent = await agent_graph_pool.acquire_router_async()
     try:
-        # Load conversation history
-        events = short_term_memory.list_events(
-            actor_id=request.actor_id,
-            session_id=request.session_id,
-            max_results=10
-        )
-        # Convert events to Strands Messages format
-        messages = []
-        for event in events:
-            payload = event.get("payload", [])
-            for item in payload:
-                if "conversational" in item:
-                    conv = item["conversational"]
-                    role = conv.get("role", "").lower()
-                    text = conv.get("content", {}).get("text", "")
-                    if text:
-                        messages.append(
-                            Message(
-                                role="user" if role == "user" else "assistant",
-                                content=[ContentBlock(text=text)]
-                            )
-                        )
-        
-        # Create and execute graph
-        graph = create_agent_graph_with_history(messages)
-        result = await graph.invoke_async(request.prompt)
-        
-        # Extract response
-        response_text = ""
-        selected_agent = ""
-        card_list = []
-        
-        for node_id, node_result in result.results.items():
-            if node_id == "router":
-                continue
-                
-            selected_agent = node_id
-            
-            if not hasattr(node_result, 'result'):
-                continue
-                
-            inner = node_result.result
-            
-            # Handle Swarm result (tarot agent)
-            if hasattr(inner, 'results') and hasattr(inner, 'node_history'):
-                if inner.node_history:
-                    # Get the last agent in the swarm (final responder)
-                    last_node = inner.node_history[-1]
-                    last_node_id = last_node.node_id if hasattr(last_node, 'node_id') else str(last_node)
-                    
-                    if last_node_id in inner.results:
-                        swarm_node_result = inner.results[last_node_id]
-                        if hasattr(swarm_node_result, 'result'):
-                            agent_res = swarm_node_result.result
-                            if hasattr(agent_res, 'message'):
-                                msg = agent_res.message
-                                if isinstance(msg, dict) and 'content' in msg:
-                                    for block in msg['content']:
-                                        if isinstance(block, dict) and 'text' in block:
-                                            response_text = block['text']
-                                            break
-            
-            # Handle regular agent result (numerology, welcome)
-            elif hasattr(inner, 'message'):
-                msg = inner.message
-                if isinstance(msg, dict) and 'content' in msg:
-                    for block in msg['content']:
-                        if isinstance(block, dict) and 'text' in block:
-                            response_text = block['text']
-                            break
-            
-            break
-        
-        # Fallback if extraction failed
-        if not response_text or 'SwarmResult' in response_text or 'NodeResult' in response_text:
-            response_text = "I apologize, but I couldn't generate a proper response. Please try again."
-        
-        # Clean up response
-        response_text = re.sub(r'<thinking>[\s\S]*?</thinking>\s*', '', response_text).strip()
-        
-        # Extract card list for tarot readings
-        if selected_agent == "tarot":
-            card_match = re.search(r'CARDS:\s*\[(.*?)\]', response_text)
-            if card_match:
-                cards_str = card_match.group(1)
-                card_list = [card.strip() for card in cards_str.split(',') if card.strip()]
-            
-            # Remove CARDS: line from response
-            response_text = re.sub(r'CARDS:\s*\[.*?\]\s*\n*', '', response_text, count=1).strip()
-        
-        # Store conversation in memory
-        if response_text and response_text.strip():
-            short_term_memory.create_event(
+        router_result = await router_agent.invoke_async(request.prompt)
+    except BaseException:
+        # The router failed or the client went away
+        speculative_task.cancel()
+        raise
+    agent_graph_pool.release_router(router_agent)
+    router_seconds = time.perf_counter() - start_time
+    metrics.observe_stage("node", router_seconds, "router", "router")
+    metrics.record_usages([agent_usage("router", "router", router_result)])
+    intent_classifier.record_router(prediction, str(router_result))
+
+    routed = routed_intents(str(router_result))
+    if routed == [predicted]:
+        # A run that finished first hid only its own duration
+        speculation.record_hit(predicted, finished_at[0] - start_time if finished_at else router_seconds)
+        return speculative_graph, predicted, speculative_task, speculative_relay
+
+    speculative_task.cancel()
+    await asyncio.gather(speculative_task, return_exceptions=True)
+    # The cancelled graph is not returned to the pool
+    speculation.record_miss(predicted, speculative_graph.nodes[predicted].executor)
+    # The routed graph starts no specialist for an answer naming none; welcome at least answers
+    intent = "+".join(routed) or "welcome"
+    graph = await agent_graph_pool.acquire_async(messages, intent=intent)
+    return graph, intent, start(graph, relay), relay
+
+
+def _follow_up(request: ChatRequest, prediction: IntentPrediction) -> Optional[Tuple[SessionReading, List[int]]]:
+    """
+    The session's last reading when the prompt is a follow-up question about it
+
+    Prompts that only fit a reading with tarot in mind ("what about the
+    future?", "tell me more") count when the classifier leans towards tarot.
+    """
+    match = reading_store.follow_up(
+        request.actor_id, request.session_id, request.prompt, tarot_leaning=prediction.intent == "tarot"
+    )
+    if match is None:
+        return None
+    reading_store.record_follow_up()
+    return match
+
+
+async def _shadow_route(prompt: str, prediction: IntentPrediction):
+    """Ask the LLM router about a fast-path prompt, only to measure agreement"""
+    try:
+        router_agent = await agent_graph_pool.acquire_router_async()
+        result = await router_agent.invoke_async(prompt)
+        agent_graph_pool.release_router(router_agent)
+        intent_classifier.record_router(prediction, str(result), shadow=True)
+    except Exception as e:
+        print(f"⚠️  Shadow routing failed: {e}")
+
+
+def _record_routing(prediction: IntentPrediction, result):
+    """Compare the router's choice with the local prediction when the router ran"""
+    router_result = result.results.get("router")
+    if router_result is not None and router_result.result is not None:
+        intent_classifier.record_router(prediction, str(router_result.result))
+
+
+def _build_chat_response(request: ChatRequest, result, drawn: Optional[SessionReading] = None) -> ChatResponse:
+    """
+    The API response for a graph result
+
+    Args:
+        drawn: The reading stored during this turn, if any; see extract_graph_result
+
+    Raises:
+        ResultExtractionError: The graph produced no answer
+    """
+    extracted = extract_graph_result(result, drawn.reading if drawn is not None else None)
+    metrics.record_graph(result, extracted.usages)
+    return ChatResponse(
+        response=extracted.text,
+        agent=extracted.agent,
+        session_id=request.session_id,
+        card_list=extracted.cards
+    )
+
+
+def _invocation_state(request: ChatRequest, **extra) -> dict:
+    """State every agent and tool in the graph can read (e.g. per-session tarot seeds)"""
+    # "question", not "prompt": agents take the state as keyword arguments next to their prompt
+    return {"actor_id": request.actor_id, "session_id": request.session_id, "question": request.prompt, **extra}
+
+
+def _build_follow_up_response(request: ChatRequest, result) -> ChatResponse:
+    """Answer to a follow-up question; no cards were drawn, so the card list stays empty"""
+    # The cards were already shown with the reading
+    extracted = extract_agent_result(result, "tarot", strip_cards=True)
+    metrics.record_usages([agent_usage("tarot", "card_interpreter", result)])
+    return ChatResponse(response=extracted.text, agent=extracted.agent, session_id=request.session_id)
+
+
+async def _store_turn(request: ChatRequest, response_text: str, agent: str = ""):
+    """Store the completed turn in memory and the session cache, and which agent answered it"""
+    speculation.remember(request.actor_id, request.session_id, agent)
+    # Flushed in the background when write-behind is on
+    if response_text and response_text.strip():
+        store_event = memory_writer.enqueue if config.MEMORY_WRITE_BEHIND else short_term_memory.acreate_event
+        with metrics.stage("memory_write"):
+            await store_event(
                 messages=[
                     (request.prompt, "USER"),
                     (response_text, "ASSISTANT")
@@ -130,19 +249,147 @@ async def invocations(request: ChatRequest):
                 actor_id=request.actor_id,
                 session_id=request.session_id
             )
+        session_tracker.append_turn(request.actor_id, request.session_id, request.prompt, response_text)
+
+
+@router.post("/invocations", response_model=ChatResponse)
+async def invocations(request: ChatRequest):
+    """
+    Main invocation endpoint for Bedrock Agent Runtime
+    """
+    cassette.record_request("invocations", request.actor_id, request.session_id, request.prompt)
+    with metrics.track_request("invocations") as tracked:
+        try:
+            messages = await _load_history(request)
+            prediction = _classify(request.prompt)
+        
+            # Questions about the session's last reading: one interpreter call with the reading attached
+            follow_up = _follow_up(request, prediction)
+            if follow_up is not None:
+                agent = await create_reading_followup_agent_async(messages)
+                result = await agent.invoke_async(follow_up_prompt(request.prompt, *follow_up))
+                response = _build_follow_up_response(request, result)
+                tracked.agent = response.agent
+                await _store_turn(request, response.response, response.agent)
+                return response
+        
+            # Create and execute graph
+            started = time.time()
+            speculated = await _speculate(request, messages, prediction)
+            if speculated is not None:
+                graph, intent, task, _ = speculated
+                result = await task
+            else:
+                graph, intent = await _create_graph(request, messages, prediction)
+                result = await graph.invoke_async(request.prompt, invocation_state=_invocation_state(request))
+            agent_graph_pool.release(graph, intent)
+            _record_routing(prediction, result)
         
-        return ChatResponse(
-            response=response_text,
-            agent=selected_agent,
-            session_id=request.session_id,
-            card_list=card_list
-        )
+            drawn = reading_store.get(request.actor_id, request.session_id, since=started)
+            response = _build_chat_response(request, result, drawn)
+            tracked.agent = response.agent
+            await _store_turn(request, response.response, response.agent)
+            return response
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        except ResultExtractionError as e:
+            raise HTTPException(status_code=502, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/invocations/stream")
+async def invocations_stream(request: ChatRequest):
+    """
+    Streaming variant of /invocations using server-sent events
+
+    Emits `agent` when a specialist starts, `tool_call` / `tool_result` for
+    tool use (tool results include drawn `cards`), `delta` for answer text
+    with <thinking> blocks removed, and finally `done` with the same payload
+    /invocations returns (or `error`).
+    """
+    cassette.record_request("invocations_stream", request.actor_id, request.session_id, request.prompt)
+
+    async def event_stream():
+        relay = StreamRelay()
+        task = None
+        with metrics.track_request("invocations_stream") as tracked:
+            try:
+                messages = await _load_history(request)
+                prediction = _classify(request.prompt)
+                follow_up = _follow_up(request, prediction)
+                if follow_up is not None:
+                    agent = await create_reading_followup_agent_async(messages)
+                    task = asyncio.create_task(
+                        agent.invoke_async(follow_up_prompt(request.prompt, *follow_up), callback_handler=relay)
+                    )
+                    async for event in relay.stream(task):
+                        yield event
+                    response = _build_follow_up_response(request, task.result())
+                    tracked.agent = response.agent
+                    await _store_turn(request, response.response, response.agent)
+                    yield format_sse("done", response.model_dump())
+                    return
+            
+                started = time.time()
+                speculated = await _speculate(request, messages, prediction, relay)
+                if speculated is not None:
+                    graph, intent, task, relay = speculated
+                else:
+                    graph, intent = await _create_graph(request, messages, prediction)
+                    # Agents pick up callback_handler from the invocation state
+                    task = asyncio.create_task(
+                        graph.invoke_async(request.prompt, invocation_state=_invocation_state(request, callback_handler=relay))
+                    )
+                async for event in relay.stream(task):
+                    yield event
+            
+                result = task.result()
+                agent_graph_pool.release(graph, intent)
+                _record_routing(prediction, result)
+                drawn = reading_store.get(request.actor_id, request.session_id, since=started)
+                response = _build_chat_response(request, result, drawn)
+                tracked.agent = response.agent
+                await _store_turn(request, response.response, response.agent)
+                yield format_sse("done", response.model_dump())
+            except Exception as e:
+                tracked.status = "error"
+                yield format_sse("error", {"detail": str(e)})
+            finally:
+                # Client went away: stop spending model calls on this turn
+                if task is not None and not task.done():
+                    task.cancel()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/ping")
 async def ping():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "bedrock-agent-runtime"}
+    return {
+        "status": "healthy",
+        "service": "bedrock-agent-runtime",
+        "readiness": readiness.stats(),
+        "auth_cache": token_cache.stats(),
+        "session_cache": session_tracker.stats(),
+        "memory_writes": memory_writer.stats(),
+        "intent": intent_classifier.stats(),
+        "graph_pool": agent_graph_pool.stats(),
+        "prompts": prompt_manager.stats(),
+        "mcp_pool": mcp_pool.stats(),
+        "mcp_tool_cache": mcp_tool_cache.stats(),
+        "readings": reading_store.stats(),
+        "history": history_window.stats(),
+        "speculation": speculation.stats(),
+        "cassette": cassette.stats(),
+        "tarot": {"mode": config.TAROT_MODE, **tarot_runs}
+    }
+
+
+@router.get("/metrics")
+async def prometheus_metrics():
+    """Per-stage latency, token, handoff and cost metrics in the Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -6,6 +6,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import router
 from app.core.config import config
 from app.auth import google_auth_middleware
+from app.api.lifespan import lifespan
 import uvicorn
 
 def create_app() -> FastAPI:
@@ -13,7 +14,8 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title="Multi-Agent Graph API",
         description="Multi-agent system with router, welcome, and numerology agents",
-        version="1.0.0"
+        version="1.0.0",
+        lifespan=lifespan
     )
 
     app.middleware("http")(google_auth_middleware)
@@ -0,0 +1,214 @@
+"""
+Server-sent event streaming of graph executions
+"""
+import asyncio
+import json
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional
+from app.api.results import parse_cards
+
+# Swarm members report their own agent name; the graph knows them as "tarot"
+TAROT_SWARM_AGENTS = {"spread_reader", "card_interpreter", "life_advisor"}
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+class StreamTextFilter:
+    """
+    Incrementally remove <thinking>...</thinking> blocks (and, for tarot, the
+    CARDS: [...] line) from streamed text.
+
+    Mirrors the clean-up /invocations applies to the final text, but works on
+    deltas: anything that could be the start of a hidden span is held back
+    until enough text has arrived to decide.
+    """
+
+    OPEN = "<thinking>"
+    CLOSE = "</thinking>"
+    CARDS = "CARDS:"
+
+    def __init__(self, strip_cards: bool = False):
+        self.strip_cards = strip_cards
+        self._buffer = ""
+        self._in_thinking = False
+        self._skip_whitespace = True
+
+    def _markers(self) -> List[str]:
+        return [self.OPEN, self.CARDS] if self.strip_cards else [self.OPEN]
+
+    def _held_back(self, text: str) -> int:
+        """Length of the longest text suffix that is a prefix of a marker"""
+        longest = 0
+        for marker in self._markers():
+            for size in range(1, min(len(marker), len(text) + 1)):
+                if text.endswith(marker[:size]):
+                    longest = max(longest, size)
+        return longest
+
+    def feed(self, text: str) -> str:
+        """Add a delta and return the text that is safe to emit"""
+        self._buffer += text
+        out = []
+        while self._buffer:
+            if self._in_thinking:
+                end = self._buffer.find(self.CLOSE)
+                if end < 0:
+                    # Keep only what could still be the start of the close tag
+                    self._buffer = self._buffer[-(len(self.CLOSE) - 1):]
+                    break
+                self._buffer = self._buffer[end + len(self.CLOSE):]
+                self._in_thinking = False
+                self._skip_whitespace = True
+                continue
+
+            if self._skip_whitespace:
+                self._buffer = self._buffer.lstrip()
+                if not self._buffer:
+                    break
+                self._skip_whitespace = False
+
+            start = self._buffer.find(self.OPEN)
+            cards = self._buffer.find(self.CARDS) if self.strip_cards else -1
+            if cards >= 0 and (start < 0 or cards < start):
+                close = self._buffer.find("]", cards)
+                if close < 0:
+                    out.append(self._buffer[:cards])
+                    self._buffer = self._buffer[cards:]
+                    break
+                out.append(self._buffer[:cards])
+                self._buffer = self._buffer[close + 1:]
+                self.strip_cards = False  # only the first CARDS line is hidden
+                self._skip_whitespace = True
+                continue
+            if start >= 0:
+                out.append(self._buffer[:start])
+                self._buffer = self._buffer[start + len(self.OPEN):]
+                self._in_thinking = True
+                continue
+
+            keep = self._held_back(self._buffer)
+            out.append(self._buffer[:len(self._buffer) - keep])
+            self._buffer = self._buffer[len(self._buffer) - keep:]
+            break
+        return "".join(out)
+
+    def flush(self) -> str:
+        """Release held-back text once the agent has finished"""
+        text = "" if self._in_thinking else self._buffer
+        self._buffer = ""
+        return text.rstrip()
+
+
+class StreamRelay:
+    """
+    Strands callback handler that turns agent events into SSE frames.
+
+    Pass it as `invocation_state={"callback_handler": relay}` so every agent in
+    the graph (including swarm members) reports to it, then iterate
+    `relay.stream(task)` to receive frames until the graph finishes.
+
+    Events:
+        agent: a specialist started answering ({"agent", "node"})
+        tool_call: an agent called a tool ({"agent", "node", "tool", "input"})
+        tool_result: a tool returned ({"agent", "node", "tool", "status", "cards", "reading"})
+        delta: answer text with hidden spans removed ({"agent", "node", "text"})
+    """
+
+    def __init__(self, hidden_agents: Optional[set] = None):
+        self.hidden_agents = hidden_agents if hidden_agents is not None else {"router"}
+        self._queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._node: Optional[str] = None
+        self._selected: Optional[str] = None
+        self._filter: Optional[StreamTextFilter] = None
+        self._tool_names: Dict[str, str] = {}
+
+    @staticmethod
+    def graph_node(node: str) -> str:
+        return "tarot" if node in TAROT_SWARM_AGENTS else node
+
+    def _emit(self, event: str, data: Dict[str, Any]):
+        frame = format_sse(event, data)
+        if threading.get_ident() == self._loop_thread:
+            self._queue.put_nowait(frame)
+        else:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, frame)
+
+    def _flush_text(self):
+        if self._filter is not None:
+            tail = self._filter.flush()
+            if tail:
+                self._emit("delta", {"agent": self._selected, "node": self._node, "text": tail})
+            self._filter = None
+
+    def _switch_to(self, node: str):
+        """Track which agent is producing events"""
+        if node == self._node:
+            return
+        self._flush_text()
+        self._node = node
+        if node in self.hidden_agents:
+            return
+        agent = self.graph_node(node)
+        if self._selected is None:
+            self._selected = agent
+            self._emit("agent", {"agent": agent, "node": node})
+        self._filter = StreamTextFilter(strip_cards=(agent == "tarot"))
+
+    def __call__(self, **kwargs: Any):
+        agent = kwargs.get("agent")
+        if agent is not None and getattr(agent, "name", None):
+            self._switch_to(agent.name)
+        if self._node is None or self._node in self.hidden_agents:
+            return
+
+        if "data" in kwargs and self._filter is not None:
+            text = self._filter.feed(kwargs["data"])
+            if text:
+                self._emit("delta", {"agent": self._selected, "node": self._node, "text": text})
+        elif "message" in kwargs:
+            self._on_message(kwargs["message"])
+
+    def _on_message(self, message: Dict[str, Any]):
+        for block in message.get("content", []):
+            if "toolUse" in block:
+                tool_use = block["toolUse"]
+                self._tool_names[tool_use.get("toolUseId")] = tool_use.get("name")
+                self._emit("tool_call", {
+                    "agent": self._selected,
+                    "node": self._node,
+                    "tool": tool_use.get("name"),
+                    "input": tool_use.get("input")
+                })
+            elif "toolResult" in block:
+                tool_result = block["toolResult"]
+                content = tool_result.get("content", [])
+                text = "".join(c.get("text", "") for c in content)
+                self._emit("tool_result", {
+                    "agent": self._selected,
+                    "node": self._node,
+                    "tool": self._tool_names.get(tool_result.get("toolUseId")),
+                    "status": tool_result.get("status"),
+                    "cards": parse_cards(text),
+                    # Structured card data from draw_tarot_cards
+                    "reading": next((c["json"] for c in content if "json" in c), None)
+                })
+
+    async def stream(self, task: "asyncio.Task") -> AsyncIterator[str]:
+        """Yield frames as they arrive until the graph task completes"""
+        # Callbacks run before the task resolves, so the sentinel lands last
+        task.add_done_callback(lambda _: self._queue.put_nowait(None))
+        while True:
+            frame = await self._queue.get()
+            if frame is None:
+                break
+            yield frame
+        self._flush_text()
+        while not self._queue.empty():
+            frame = self._queue.get_nowait()
+            if frame is not None:
+                yield frame
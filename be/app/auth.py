@@ -2,50 +2,235 @@
 Google OAuth token verification middleware
 """
 import os
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
 import httpx
 from fastapi import HTTPException, Request, status
-from typing import Optional, Dict, Any
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
 import json
 import logging
+import re
+import jwt
+
+from app.core.config import config
+from app.core.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
 GOOGLE_TOKEN_INFO_URL = "https://oauth2.googleapis.com/tokeninfo"
+GOOGLE_ISSUERS = {"accounts.google.com", "https://accounts.google.com"}
 
-async def verify_google_token(token: str) -> Dict[str, Any]:
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class TokenCache:
     """
-    Verify Google OAuth token with Google's tokeninfo endpoint
+    Bounded in-process cache of verified Google tokens.
 
-    Args:
-        token: The access token to verify
+    Entries are keyed by a SHA-256 hash of the token so raw tokens are never
+    kept in memory longer than the request. Valid tokens expire at their `exp`
+    claim, tokens Google rejected (401) are remembered for a short negative
+    TTL; upstream failures (503) are never cached. Concurrent checks of the
+    same token share a single verification request.
+    """
 
-    Returns:
-        Dict containing token information if valid
+    def __init__(
+        self,
+        max_size: int = None,
+        max_ttl: float = None,
+        negative_ttl: float = None
+    ):
+        self.max_size = max_size or config.AUTH_CACHE_MAX_SIZE
+        self.max_ttl = max_ttl or config.AUTH_CACHE_MAX_TTL
+        self.negative_ttl = negative_ttl if negative_ttl is not None else config.AUTH_NEGATIVE_CACHE_TTL
+        # key -> (expires_at, token_info, error)
+        self._entries: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]], Optional[HTTPException]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def key_for(token: str) -> str:
+        """Hash a token into its cache key"""
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[float, Optional[Dict[str, Any]], Optional[HTTPException]]]:
+        """Return a live cache entry, dropping it if expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put_valid(self, key: str, token_info: Dict[str, Any]):
+        """Cache a verified token until its expiry (capped at max_ttl)"""
+        now = time.time()
+        expires_at = now + self.max_ttl
+        try:
+            if token_info.get("exp"):
+                expires_at = min(expires_at, float(token_info["exp"]))
+            elif token_info.get("expires_in"):
+                expires_at = min(expires_at, now + float(token_info["expires_in"]))
+        except (TypeError, ValueError):
+            pass
+        if expires_at > now:
+            self._store(key, (expires_at, token_info, None))
+
+    def put_invalid(self, key: str, error: HTTPException):
+        """Cache a rejected token for the negative TTL"""
+        if self.negative_ttl > 0:
+            self._store(key, (time.time() + self.negative_ttl, None, error))
+
+    def _store(self, key: str, entry: Tuple[float, Optional[Dict[str, Any]], Optional[HTTPException]]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def verify(self, token: str, verifier: Callable[[str], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Serve a token from the cache or verify it, one verification per token at a time
+
+        Args:
+            token: The bearer token
+            verifier: Coroutine function checking the token with Google
+
+        Returns:
+            The token information of a valid token
+
+        Raises:
+            HTTPException: The cached or new rejection, or an upstream failure
+        """
+        key = self.key_for(token)
+
+        entry = self.get(key)
+        if entry is not None:
+            _, token_info, error = entry
+            if error is not None:
+                self.negative_hits += 1
+                raise HTTPException(
+                    status_code=error.status_code,
+                    detail=error.detail,
+                    headers=error.headers,
+                )
+            self.hits += 1
+            return token_info
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._verify_and_store(key, token, verifier))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shield so one cancelled request does not cancel the shared verification
+        return await asyncio.shield(task)
+
+    async def _verify_and_store(
+        self, key: str, token: str, verifier: Callable[[str], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Run one verification and record the outcome"""
+        try:
+            token_info = await verifier(token)
+        except HTTPException as e:
+            # Only cache definitive rejections, never transient upstream failures
+            if e.status_code == status.HTTP_401_UNAUTHORIZED:
+                self.put_invalid(key, e)
+            raise
+        self.put_valid(key, token_info)
+        return token_info
+
+    def clear(self):
+        """Drop all cached entries"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0
+        }
+
+
+# Global token cache instance
+token_cache = TokenCache()
+
+# Shared connection-pooled client, created lazily inside the running event loop
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the long-lived HTTP client used for token verification"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(
+                max_connections=config.AUTH_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=config.AUTH_HTTP_MAX_CONNECTIONS
+            )
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client (called on application shutdown)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def _fetch_token_info(token: str) -> Dict[str, Any]:
+    """
+    Verify a token against Google's tokeninfo endpoint (no caching)
 
     Raises:
-        HTTPException: If token is invalid or verification fails
+        HTTPException: 401 if Google rejects the token (400/401), 503 if
+            Google cannot answer (5xx, 429, other statuses, network errors)
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                GOOGLE_TOKEN_INFO_URL,
-                params={"access_token": token},
-                timeout=10.0
-            )
+        response = await get_http_client().get(
+            GOOGLE_TOKEN_INFO_URL,
+            params={"access_token": token}
+        )
 
-            if response.status_code != 200:
-                logger.warning(f"Google token verification failed with status {response.status_code}")
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid or expired Google access token",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
+        if response.status_code in (400, 401):
+            logger.warning(f"Google token verification failed with status {response.status_code}")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired Google access token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        if response.status_code != 200:
+            # Rate limiting or an outage says nothing about the token
+            logger.error(f"Google token verification unavailable (status {response.status_code})")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Token verification service unavailable"
+            )
 
-            token_info = response.json()
+        token_info = response.json()
 
-            logger.info(f"Successfully verified Google token for user: {token_info.get('email', 'unknown')}")
-            return token_info
+        logger.info(f"Successfully verified Google token for user: {token_info.get('email', 'unknown')}")
+        return token_info
 
+    except HTTPException:
+        raise
     except httpx.TimeoutException:
         logger.error("Timeout while verifying Google token")
         raise HTTPException(
@@ -61,9 +246,8 @@ async def verify_google_token(token: str) -> Dict[str, Any]:
     except json.JSONDecodeError:
         logger.error("Invalid JSON response from Google token verification")
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token verification response",
-            headers={"WWW-Authenticate": "Bearer"},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Token verification service unavailable"
         )
     except Exception as e:
         logger.error(f"Unexpected error during token verification: {e}")
@@ -72,17 +256,236 @@ async def verify_google_token(token: str) -> Dict[str, Any]:
             detail="Internal server error during authentication"
         )
 
+
+async def verify_google_token(token: str) -> Dict[str, Any]:
+    """
+    Verify Google OAuth token with Google's tokeninfo endpoint
+
+    Results are cached per token until the token expires; concurrent
+    verifications of the same token are collapsed into one request.
+
+    Args:
+        token: The access token to verify
+
+    Returns:
+        Dict containing token information if valid
+
+    Raises:
+        HTTPException: If token is invalid or verification fails
+    """
+    return await token_cache.verify(token, _fetch_token_info)
+
+class GoogleKeySet:
+    """
+    Google's public signing keys (JWKS) cached in-process.
+
+    Keys are fetched once, kept for the lifetime advertised by the
+    Cache-Control header and refreshed in the background shortly before
+    they expire, so ID token verification normally needs no network I/O.
+    Concurrent refreshes share one fetch, so a cold start, an expiry or a
+    burst of unknown key ids costs a single request to Google. A failed
+    background refresh is retried with exponential backoff.
+    """
+
+    # Refresh this many seconds before the advertised expiry
+    REFRESH_MARGIN = 60.0
+    # Lifetime used when the response carries no max-age
+    DEFAULT_TTL = 3600.0
+    # Minimum interval between refreshes triggered by an unknown key id
+    MIN_FORCED_REFRESH_INTERVAL = 30.0
+    # A failed background refresh is retried after this long, doubling up to the maximum
+    RETRY_INTERVAL = 30.0
+    MAX_RETRY_INTERVAL = 600.0
+
+    def __init__(self, certs_url: str = None):
+        self.certs_url = certs_url or config.GOOGLE_CERTS_URL
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        # When the last fetch started, successful or not
+        self._attempted_at = 0.0
+        self._fetch_task: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+
+    @staticmethod
+    def _parse_ttl(response: httpx.Response) -> float:
+        """Derive the key set lifetime from Cache-Control and Age headers"""
+        match = _MAX_AGE_RE.search(response.headers.get("cache-control", ""))
+        if not match:
+            return GoogleKeySet.DEFAULT_TTL
+        ttl = float(match.group(1))
+        try:
+            ttl -= float(response.headers.get("age", 0))
+        except ValueError:
+            pass
+        return max(ttl, 0.0)
+
+    async def refresh(self):
+        """Fetch the current key set, or wait for the fetch already running"""
+        task = self._fetch_task
+        if task is None or task.done():
+            task = self._fetch_task = asyncio.ensure_future(self._fetch())
+        # Shield so one cancelled request does not cancel the shared fetch
+        await asyncio.shield(task)
+
+    async def _fetch(self):
+        """Fetch the current key set and schedule the next background refresh"""
+        self._attempted_at = time.time()
+        response = await get_http_client().get(self.certs_url)
+        response.raise_for_status()
+        keys = {}
+        for jwk in response.json().get("keys", []):
+            try:
+                keys[jwk["kid"]] = jwt.PyJWK(jwk)
+            except (KeyError, jwt.PyJWTError) as e:
+                logger.warning(f"Skipping unusable Google signing key: {e}")
+        ttl = self._parse_ttl(response)
+        self._keys = keys
+        self._fetched_at = time.time()
+        self._expires_at = self._fetched_at + ttl
+        self.refreshes += 1
+        logger.info(f"Loaded {len(keys)} Google signing keys (ttl {ttl:.0f}s)")
+        self._schedule_refresh(ttl)
+
+    def _schedule_refresh(self, ttl: float):
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        delay = max(ttl - self.REFRESH_MARGIN, self.MIN_FORCED_REFRESH_INTERVAL)
+        self._refresh_task = asyncio.ensure_future(self._refresh_later(delay))
+
+    async def _refresh_later(self, delay: float):
+        failures = 0
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                # A successful fetch schedules the next refresh and cancels this one
+                await self.refresh()
+                return
+            except Exception as e:
+                # Keep serving the current keys (a lookup past expiry also retries inline) and try again
+                delay = min(self.RETRY_INTERVAL * 2 ** failures, self.MAX_RETRY_INTERVAL)
+                failures += 1
+                logger.error(f"Background refresh of Google signing keys failed: {e}; retrying in {delay:.0f}s")
+
+    async def get_key(self, kid: str) -> jwt.PyJWK:
+        """
+        Get the signing key for a key id, refreshing the key set if needed
+
+        Raises:
+            KeyError: If the key id is not in Google's current key set
+        """
+        if not self._keys or time.time() >= self._expires_at:
+            await self.refresh()
+        elif kid not in self._keys and time.time() - self._attempted_at > self.MIN_FORCED_REFRESH_INTERVAL:
+            # Google may have rotated keys before our cached copy expired; tokens
+            # with made-up key ids join the running fetch or wait out the interval
+            await self.refresh()
+        return self._keys[kid]
+
+    async def close(self):
+        """Cancel the background refresh task"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        if self._fetch_task is not None:
+            self._fetch_task.cancel()
+            self._fetch_task = None
+
+
+# Global Google key set instance
+google_key_set = GoogleKeySet()
+
+
+def _invalid_id_token(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def verify_google_id_token(token: str) -> Dict[str, Any]:
+    """
+    Verify a Google-signed ID token locally against the cached JWKS
+
+    Checks the RS256 signature, `exp`, `aud` (GOOGLE_CLIENT_ID) and `iss`.
+
+    Args:
+        token: The Google ID token (JWT) to verify
+
+    Returns:
+        Dict containing the token claims if valid
+
+    Raises:
+        HTTPException: If token is invalid or the key set cannot be loaded
+    """
+    if not config.GOOGLE_CLIENT_ID:
+        logger.error("AUTH_MODE=jwks requires GOOGLE_CLIENT_ID")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error during authentication"
+        )
+
+    try:
+        kid = jwt.get_unverified_header(token).get("kid")
+    except jwt.PyJWTError:
+        raise _invalid_id_token("Malformed Google ID token")
+    if not kid:
+        raise _invalid_id_token("Malformed Google ID token")
+
+    try:
+        signing_key = await google_key_set.get_key(kid)
+    except KeyError:
+        logger.warning(f"Google ID token signed with unknown key id: {kid}")
+        raise _invalid_id_token("Invalid or expired Google ID token")
+    except (httpx.HTTPError, json.JSONDecodeError) as e:
+        logger.error(f"Could not load Google signing keys: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Token verification service unavailable"
+        )
+
+    try:
+        claims = jwt.decode(
+            token,
+            signing_key.key,
+            algorithms=["RS256"],
+            audience=[aud.strip() for aud in config.GOOGLE_CLIENT_ID.split(",")],
+            options={"require": ["exp", "iat", "iss", "aud", "sub"]},
+            leeway=30,
+        )
+    except jwt.PyJWTError as e:
+        logger.warning(f"Google ID token verification failed: {e}")
+        raise _invalid_id_token("Invalid or expired Google ID token")
+
+    if claims.get("iss") not in GOOGLE_ISSUERS:
+        logger.warning(f"Google ID token has unexpected issuer: {claims.get('iss')}")
+        raise _invalid_id_token("Invalid or expired Google ID token")
+
+    return claims
+
+
+async def authenticate_token(token: str) -> Dict[str, Any]:
+    """Verify a bearer token using the configured AUTH_MODE"""
+    if config.AUTH_MODE == "jwks":
+        return await verify_google_id_token(token)
+    return await verify_google_token(token)
+
+
 async def google_auth_middleware(request: Request, call_next):
     """
     Middleware to verify Google OAuth tokens for ALL endpoints
 
     This middleware:
     1. Extracts the Bearer token from Authorization header
-    2. Verifies it with Google's OAuth2 tokeninfo endpoint
+    2. Verifies it with Google's tokeninfo endpoint (cached per token),
+       or locally against Google's signing keys when AUTH_MODE=jwks
     3. Adds user info to request state for use in endpoints
     4. Blocks access if token is invalid or missing
     """
-    if "/ping" in str(request.url.path):
+    path = str(request.url.path)
+    if "/ping" in path or "/metrics" in path:
         return await call_next(request)
 
     logger.info(f"headers: {request.headers}")
@@ -106,12 +509,13 @@ async def google_auth_middleware(request: Request, call_next):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    token_info = await verify_google_token(token)
+    with metrics.stage("auth"):
+        token_info = await authenticate_token(token)
 
     request.state.user_info = token_info
     request.state.user_email = token_info.get("email")
-    request.state.user_id = token_info.get("sub") 
+    request.state.user_id = token_info.get("sub")
 
     response = await call_next(request)
     return response
-    
+
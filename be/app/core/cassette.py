@@ -0,0 +1,377 @@
+"""
+Record/replay cassettes for model and MCP tool calls
+"""
+import asyncio
+import base64
+import copy
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, List, Optional
+from strands.models.model import Model
+from strands.types._events import ToolResultEvent
+from strands.types.tools import AgentTool, ToolSpec, ToolUse
+from app.core.config import config
+from app.core.tool_cache import _with_tool_use_id, cache_key
+
+# Bump when the cassette layout changes; older cassettes are refused
+CASSETTE_VERSION = 1
+
+META_FILE = "cassette.json"
+REQUESTS_FILE = "requests.jsonl"
+
+
+class CassetteMissError(RuntimeError):
+    """A replayed request has no recording in the cassette"""
+
+
+def _json_default(value: Any) -> Any:
+    # Stream events carry bytes for redacted reasoning and documents
+    if isinstance(value, (bytes, bytearray)):
+        return {"$bytes": base64.b64encode(bytes(value)).decode("ascii")}
+    return str(value)
+
+
+def _json_object(value: Dict[str, Any]) -> Any:
+    if len(value) == 1 and "$bytes" in value:
+        return base64.b64decode(value["$bytes"])
+    return value
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_json_default)
+
+
+def request_key(messages: List[Any], tool_specs: Optional[List[ToolSpec]],
+                system_prompt: Optional[str], tool_choice: Any = None) -> str:
+    """
+    Hash of everything a model response depends on besides the model itself
+
+    Two requests share a key when the system prompt, conversation and tool
+    specs are identical, so a replay matches its recording as long as the
+    same prompts, history and tarot draws lead up to each call. All agents
+    share one model; its id is kept once per cassette, in cassette.json.
+    """
+    payload = _dumps({
+        "system_prompt": system_prompt,
+        "messages": messages,
+        "tool_specs": tool_specs or [],
+        "tool_choice": tool_choice
+    })
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def tool_key(tool_name: str, arguments: Optional[Dict[str, Any]]) -> str:
+    """Hash of a tool call, from the same canonical arguments the tool cache uses"""
+    return hashlib.sha256("\n".join(cache_key(tool_name, arguments)).encode("utf-8")).hexdigest()[:32]
+
+
+def _preview(messages: List[Any]) -> str:
+    """Start of the last text block, so a cassette file says what it answers"""
+    for message in reversed(messages or []):
+        for block in message.get("content", []):
+            if "text" in block:
+                return block["text"][:120]
+    return ""
+
+
+class Cassette:
+    """
+    Directory of recorded model streams, tool results and incoming requests.
+
+    In record mode every model call made through CassetteModel and every MCP
+    tool call made through CassetteTool is written to a gzipped JSON file
+    named after its request hash (`model/<key>.json.gz`, `tools/<key>.json.gz`),
+    with the offset of each stream event so replays keep the original timing.
+    Calls repeating a request are appended to the same file and replayed in
+    order, the last one answering any further repeats. `cassette.json` holds
+    what else a replay needs to send the same requests: the tarot base seed,
+    prompts from Prompt Management and the MCP tool specs; `requests.jsonl`
+    lists the incoming /invocations requests for benchmarks/load_test.py.
+
+    Replay serves the recordings without a model client or MCP server,
+    waiting `time_scale` times the recorded gaps between stream events
+    (0 replays as fast as possible).
+    """
+
+    def __init__(self, directory: str = None, mode: str = None, time_scale: float = None):
+        self.directory = Path(directory or config.CASSETTE_DIR)
+        self.mode = (mode or config.CASSETTE_MODE).lower()
+        if self.mode not in ("off", "record", "replay"):
+            raise ValueError(f"CASSETTE_MODE must be off, record or replay, not {self.mode!r}")
+        self.time_scale = config.CASSETTE_TIME_SCALE if time_scale is None else time_scale
+        self._lock = threading.Lock()
+        # (kind, key) -> interactions, as recorded by this process or loaded for replay
+        self._interactions: Dict[tuple, List[Dict[str, Any]]] = {}
+        # (kind, key) -> interactions replayed so far
+        self._served: Dict[tuple, int] = {}
+        self._requests_file = None
+        self._started = time.time()
+        # Id of the recorded model, set by CassetteModel or read from cassette.json
+        self.model_id: Optional[str] = None
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _path(self, kind: str, key: str) -> Path:
+        return self.directory / kind / f"{key}.json.gz"
+
+    def _read(self, path: Path) -> Optional[Dict[str, Any]]:
+        if not path.is_file():
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f, object_hook=_json_object)
+
+    def _write(self, path: Path, data: Dict[str, Any]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        # mtime=0 keeps re-recorded files byte-identical when nothing changed
+        with open(tmp_path, "wb") as raw, gzip.GzipFile(filename="", fileobj=raw, mode="wb", mtime=0) as f:
+            f.write(_dumps(data).encode("utf-8"))
+        os.replace(tmp_path, path)
+
+    def append(self, kind: str, key: str, request: Dict[str, Any], interaction: Dict[str, Any]):
+        """
+        Record one call; blocking file I/O, run it in a thread from async code
+
+        The first call for a key in this process replaces any older file, so
+        recording into an existing cassette does not mix two sessions' calls.
+        """
+        with self._lock:
+            interactions = self._interactions.setdefault((kind, key), [])
+            interactions.append(interaction)
+            self._write(self._path(kind, key), {
+                "version": CASSETTE_VERSION, "key": key, "request": request, "interactions": interactions
+            })
+            self.recorded += 1
+
+    def next_interaction(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        """
+        The next recorded answer to a request, or None if it was never recorded
+
+        Blocking file I/O on the first lookup of a key; run it in a thread from async code.
+        """
+        with self._lock:
+            interactions = self._interactions.get((kind, key))
+            if interactions is None:
+                data = self._read(self._path(kind, key))
+                interactions = self._interactions[(kind, key)] = data["interactions"] if data else []
+            if not interactions:
+                self.misses += 1
+                return None
+            index = self._served.get((kind, key), 0)
+            self._served[(kind, key)] = index + 1
+            self.replayed += 1
+            return copy.deepcopy(interactions[min(index, len(interactions) - 1)])
+
+    async def wait(self, seconds: float):
+        """Sleep for a recorded gap, scaled by time_scale"""
+        if seconds > 0 and self.time_scale > 0:
+            await asyncio.sleep(seconds * self.time_scale)
+
+    def record_request(self, endpoint: str, actor_id: str, session_id: str, prompt: str):
+        """Append an incoming request to requests.jsonl (record mode only)"""
+        if not self.recording:
+            return
+        line = _dumps({
+            "offset": round(time.time() - self._started, 3), "endpoint": endpoint,
+            "actor_id": actor_id, "session_id": session_id, "prompt": prompt
+        })
+        with self._lock:
+            if self._requests_file is None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._requests_file = open(self.directory / REQUESTS_FILE, "w", encoding="utf-8")
+            self._requests_file.write(line + "\n")
+            self._requests_file.flush()
+
+    def load_requests(self) -> List[Dict[str, Any]]:
+        """Incoming requests of the recording, in arrival order"""
+        path = self.directory / REQUESTS_FILE
+        if not path.is_file():
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def save_meta(self, prompts: Dict[str, Dict[str, Any]], mcp_tools: List[Dict[str, Any]], tarot_seed: int):
+        """
+        Write what a replay needs besides the recorded calls
+
+        Args:
+            prompts: PromptManager.export_entries()
+            mcp_tools: MCP tool specs (mcp.types.Tool as JSON)
+            tarot_seed: Base seed of the per-session tarot draws
+        """
+        data = {
+            "version": CASSETTE_VERSION,
+            "created_at": time.time(),
+            "model_id": self.model_id,
+            "tarot_seed": tarot_seed,
+            "prompts": prompts,
+            "mcp_tools": mcp_tools
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.directory / (META_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.directory / META_FILE)
+
+    def load_meta(self) -> Dict[str, Any]:
+        """
+        Read cassette.json
+
+        Raises:
+            CassetteMissError: The directory holds no cassette of this version
+        """
+        path = self.directory / META_FILE
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CassetteMissError(f"No readable cassette at {self.directory}: {e}")
+        if data.get("version") != CASSETTE_VERSION:
+            raise CassetteMissError(f"Cassette {self.directory} has version {data.get('version')}, expected {CASSETTE_VERSION}")
+        self.model_id = data.get("model_id")
+        return data
+
+    def close(self):
+        with self._lock:
+            if self._requests_file is not None:
+                self._requests_file.close()
+                self._requests_file = None
+
+    def wrap_tools(self, tools: List[Any]) -> List[Any]:
+        """Record or replay calls to these tools; unchanged when the cassette is off"""
+        if not self.enabled:
+            return tools
+        return [CassetteTool(tool, self) if isinstance(tool, AgentTool) else tool for tool in tools]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "directory": str(self.directory) if self.enabled else None,
+                "recorded": self.recorded,
+                "replayed": self.replayed,
+                "misses": self.misses
+            }
+
+
+class CassetteModel(Model):
+    """
+    Model wrapper that records the wrapped model's streams, or replays them
+
+    In replay mode there is no wrapped model: every request must have been
+    recorded, or the call raises CassetteMissError.
+    """
+
+    def __init__(self, model: Optional[Model], cassette: "Cassette"):
+        self.model = model
+        self.cassette = cassette
+        if model is not None:
+            cassette.model_id = model.get_config().get("model_id")
+        self.config: Dict[str, Any] = {"model_id": cassette.model_id or config.MODEL_ID}
+
+    def update_config(self, **model_config: Any) -> None:
+        if self.model is not None:
+            self.model.update_config(**model_config)
+        else:
+            self.config.update(model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config() if self.model is not None else self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs) -> AsyncGenerator[Dict[str, Any], None]:
+        if self.model is None:
+            raise CassetteMissError("Structured output calls are not recorded")
+        async for event in self.model.structured_output(output_model, prompt, system_prompt=system_prompt, **kwargs):
+            yield event
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, *, tool_choice=None, **kwargs):
+        key = request_key(messages, tool_specs, system_prompt, tool_choice)
+
+        if self.cassette.replaying:
+            interaction = await asyncio.to_thread(self.cassette.next_interaction, "model", key)
+            if interaction is None:
+                raise CassetteMissError(f"No recorded model response for request {key} in {self.cassette.directory}")
+            previous = 0.0
+            for offset, event in interaction["events"]:
+                await self.cassette.wait(offset - previous)
+                previous = offset
+                yield event
+            return
+
+        if tool_choice is not None:
+            kwargs["tool_choice"] = tool_choice
+        events = []
+        start = time.perf_counter()
+        async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+            events.append([round(time.perf_counter() - start, 4), copy.deepcopy(event)])
+            yield event
+        # Only complete streams are recorded; failed or abandoned calls raise past this point
+        request = {
+            "system_prompt": (system_prompt or "")[:120],
+            "last_message": _preview(messages),
+            "tools": [spec.get("name", "") for spec in tool_specs or []]
+        }
+        interaction = {"elapsed": round(time.perf_counter() - start, 4), "events": events}
+        await asyncio.to_thread(self.cassette.append, "model", key, request, interaction)
+
+
+class CassetteTool(AgentTool):
+    """Tool wrapper that records results, or replays them without calling the tool"""
+
+    def __init__(self, tool: AgentTool, cassette: Cassette):
+        super().__init__()
+        self.tool = tool
+        self.cassette = cassette
+
+    @property
+    def tool_name(self) -> str:
+        return self.tool.tool_name
+
+    @property
+    def tool_spec(self) -> ToolSpec:
+        return self.tool.tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return self.tool.tool_type
+
+    async def stream(self, tool_use: ToolUse, invocation_state: Dict[str, Any], **kwargs: Any):
+        key = tool_key(self.tool_name, tool_use.get("input"))
+        if self.cassette.replaying:
+            interaction = await asyncio.to_thread(self.cassette.next_interaction, "tools", key)
+            if interaction is None:
+                raise CassetteMissError(f"No recorded result for {self.tool_name} call {key} in {self.cassette.directory}")
+            await self.cassette.wait(interaction["elapsed"])
+            yield ToolResultEvent(_with_tool_use_id(interaction["result"], tool_use["toolUseId"]))
+            return
+
+        start = time.perf_counter()
+        async for event in self.tool.stream(tool_use, invocation_state, **kwargs):
+            if isinstance(event, ToolResultEvent):
+                # Recorded before yielding: the caller may stop iterating at the result
+                request = {"tool": self.tool_name, "input": tool_use.get("input")}
+                interaction = {"elapsed": round(time.perf_counter() - start, 4), "result": copy.deepcopy(event.tool_result)}
+                await asyncio.to_thread(self.cassette.append, "tools", key, request, interaction)
+            yield event
+
+
+# Global cassette instance (CASSETTE_MODE=off leaves model and tools unwrapped)
+cassette = Cassette()
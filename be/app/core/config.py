@@ -18,12 +18,124 @@ class Config:
     
     # Model Configuration
     MODEL_ID = os.getenv("MODEL_ID", "amazon.nova-micro-v1:0")
+    # USD per 1000 tokens, for the cost estimate on /metrics (defaults: Nova Micro on-demand)
+    MODEL_INPUT_PRICE_PER_1K = float(os.getenv("MODEL_INPUT_PRICE_PER_1K", "0.000035"))
+    MODEL_OUTPUT_PRICE_PER_1K = float(os.getenv("MODEL_OUTPUT_PRICE_PER_1K", "0.00014"))
+    # Record/replay of model and MCP tool calls (app/core/cassette.py): "off", "record" or "replay"
+    CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off").lower()
+    CASSETTE_DIR = os.getenv("CASSETTE_DIR") or str(Path(__file__).parent.parent.parent / "data" / "cassettes")
+    # Replay speed: 1 keeps the recorded timing, 0.1 is ten times faster, 0 does not wait
+    CASSETTE_TIME_SCALE = float(os.getenv("CASSETTE_TIME_SCALE", "1"))
     
     # Memory Configuration
+    # MEMORY_BACKEND: agentcore (Bedrock AgentCore Memory), memory, sqlite or redis
+    MEMORY_BACKEND = os.getenv("MEMORY_BACKEND", "agentcore").lower()
     MEMORY_ID = os.getenv("MEMORY_ID")
+    MEMORY_SQLITE_PATH = os.getenv("MEMORY_SQLITE_PATH") or str(
+        Path(__file__).parent.parent.parent / "data" / "memory.db"
+    )
+    MEMORY_REDIS_URL = os.getenv("MEMORY_REDIS_URL", "redis://localhost:6379/0")
+    # Retention for self-hosted backends (AgentCore applies its own policy)
+    MEMORY_SESSION_MAX_EVENTS = int(os.getenv("MEMORY_SESSION_MAX_EVENTS", "200"))
+    MEMORY_SESSION_TTL = int(os.getenv("MEMORY_SESSION_TTL", str(7 * 24 * 3600)))
+    # Keep MEMORY_MAX_WORKERS <= 10, the default boto3 connection pool size
+    MEMORY_MAX_WORKERS = int(os.getenv("MEMORY_MAX_WORKERS", "8"))
+    MEMORY_CALL_TIMEOUT = float(os.getenv("MEMORY_CALL_TIMEOUT", "5"))
     
-    # MCP Configuration
+    # Session history cache (app/core/session_tracker.py)
+    SESSION_HISTORY_EVENTS = int(os.getenv("SESSION_HISTORY_EVENTS", "10"))
+    SESSION_CACHE_MAX_SESSIONS = int(os.getenv("SESSION_CACHE_MAX_SESSIONS", "1000"))
+    SESSION_CACHE_MAX_BYTES = int(os.getenv("SESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "900"))
+    # History window (app/core/history_window.py): newest turns verbatim within a token budget
+    # (0 disables), older turns folded into a rolling summary
+    HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "1500"))
+    HISTORY_SUMMARY_TOKENS = int(os.getenv("HISTORY_SUMMARY_TOKENS", "300"))
+    # Agents that only need their last N turns, as agent:turns pairs
+    HISTORY_AGENT_TURNS = {
+        name.strip(): int(turns)
+        for name, _, turns in (
+            item.partition(":") for item in
+            os.getenv("HISTORY_AGENT_TURNS", "welcome:1,card_interpreter:1,life_advisor:2").split(",")
+        )
+        if name.strip() and turns.strip()
+    }
+    
+    # Write-behind persistence of conversation turns (opt-in: a turn is acknowledged before it is stored)
+    MEMORY_WRITE_BEHIND = os.getenv("MEMORY_WRITE_BEHIND", "false").lower() == "true"
+    MEMORY_WRITE_QUEUE_SIZE = int(os.getenv("MEMORY_WRITE_QUEUE_SIZE", "1000"))
+    MEMORY_WRITE_RETRIES = int(os.getenv("MEMORY_WRITE_RETRIES", "3"))
+    MEMORY_WRITE_FLUSH_INTERVAL = float(os.getenv("MEMORY_WRITE_FLUSH_INTERVAL", "0.05"))
+    MEMORY_DRAIN_TIMEOUT = float(os.getenv("MEMORY_DRAIN_TIMEOUT", "10"))
+    # Turns whose writes failed are retried with backoff; the oldest are dropped past the cap
+    MEMORY_PARKED_MAX_MESSAGES = int(os.getenv("MEMORY_PARKED_MAX_MESSAGES", "1000"))
+    MEMORY_PARKED_RETRY_INTERVAL = float(os.getenv("MEMORY_PARKED_RETRY_INTERVAL", "5"))
+    MEMORY_PARKED_RETRY_MAX = float(os.getenv("MEMORY_PARKED_RETRY_MAX", "300"))
+    MEMORY_SPILL_PATH = os.getenv("MEMORY_SPILL_PATH") or str(
+        Path(__file__).parent.parent.parent / "data" / "memory_spill.jsonl"
+    )
+    
+    # Load prompts, MCP tools and graphs in the background at startup
+    STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "true").lower() == "true"
+    # Prompts and MCP tool specs saved after warm-up and restored at boot
+    WARM_SNAPSHOT = os.getenv("WARM_SNAPSHOT", "true").lower() == "true"
+    WARM_SNAPSHOT_PATH = os.getenv("WARM_SNAPSHOT_PATH") or str(
+        Path(__file__).parent.parent.parent / "data" / "warm_snapshot.json"
+    )
+    WARM_SNAPSHOT_MAX_AGE = float(os.getenv("WARM_SNAPSHOT_MAX_AGE", str(7 * 24 * 3600)))
+    
+    # Prebuilt graphs kept per route for reuse (app/agents/graph.py)
+    GRAPH_POOL_MAX_IDLE = int(os.getenv("GRAPH_POOL_MAX_IDLE", "8"))
+    
+    # Local intent classifier ahead of the LLM router (app/core/intent_classifier.py), opt-in
+    INTENT_FAST_PATH = os.getenv("INTENT_FAST_PATH", "false").lower() == "true"
+    INTENT_FAST_PATH_THRESHOLD = float(os.getenv("INTENT_FAST_PATH_THRESHOLD", "0.75"))
+    # Fraction of fast-path turns also sent to the router to measure agreement
+    INTENT_SHADOW_RATE = float(os.getenv("INTENT_SHADOW_RATE", "0"))
+    # Start the session's likely specialist while the LLM router runs (app/core/speculation.py)
+    SPECULATIVE_ROUTING = os.getenv("SPECULATIVE_ROUTING", "false").lower() == "true"
+    SPECULATION_MAX_SESSIONS = int(os.getenv("SPECULATION_MAX_SESSIONS", "10000"))
+    
+    # Numerology tools: "auto" (MCP, or the local ones when MCP is down or slow), "mcp" or "local"
+    NUMEROLOGY_TOOLS = os.getenv("NUMEROLOGY_TOOLS", "auto").lower()
+    # In auto mode, recent MCP calls averaging more than this many seconds switch to local tools
+    MCP_SLOW_CALL_SECONDS = float(os.getenv("MCP_SLOW_CALL_SECONDS", "2"))
+    # ...until no MCP call has completed for this many seconds; then MCP is tried again
+    MCP_SLOW_RETRY_SECONDS = float(os.getenv("MCP_SLOW_RETRY_SECONDS", "60"))
+    
+    # MCP Configuration (an empty MCP_SERVER_URI disables the remote server)
     MCP_SERVER_URI = os.getenv("MCP_SERVER_URI", "http://152.42.161.137:8001/sse")
+    # Pooled MCP sessions (app/core/mcp_pool.py)
+    MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "4"))
+    MCP_CALL_TIMEOUT = float(os.getenv("MCP_CALL_TIMEOUT", "30"))
+    MCP_CONNECT_TIMEOUT = int(os.getenv("MCP_CONNECT_TIMEOUT", "10"))
+    MCP_BACKOFF_BASE = float(os.getenv("MCP_BACKOFF_BASE", "1"))
+    MCP_BACKOFF_MAX = float(os.getenv("MCP_BACKOFF_MAX", "60"))
+    MCP_HEALTH_INTERVAL = float(os.getenv("MCP_HEALTH_INTERVAL", "30"))
+    # Memoized MCP tool results (app/core/tool_cache.py): opt-in, list only the server's deterministic tools
+    MCP_CACHE_TOOLS = [
+        name.strip() for name in os.getenv("MCP_CACHE_TOOLS", "").split(",") if name.strip()
+    ]
+    MCP_CACHE_MAX_ENTRIES = int(os.getenv("MCP_CACHE_MAX_ENTRIES", "2048"))
+    MCP_CACHE_TTL = float(os.getenv("MCP_CACHE_TTL", "86400"))
+    
+    # Tarot draws (app/tools/tarot_deck.py): a fixed TAROT_SEED makes every session's readings reproducible
+    TAROT_SEED = int(os.getenv("TAROT_SEED")) if os.getenv("TAROT_SEED") else None
+    TAROT_MAX_SESSIONS = int(os.getenv("TAROT_MAX_SESSIONS", "10000"))
+    # Last reading per session (app/core/reading_store.py); opt-in, follow-ups about it skip the router and swarm
+    READING_FOLLOW_UP = os.getenv("READING_FOLLOW_UP", "false").lower() == "true"
+    READING_STORE_MAX_SESSIONS = int(os.getenv("READING_STORE_MAX_SESSIONS", "10000"))
+    READING_STORE_TTL = float(os.getenv("READING_STORE_TTL", "3600"))
+    # Tarot execution (app/agents/tarot_pipeline.py): "swarm" always runs the open-ended swarm; opt-in
+    # "pipeline" draws once, interprets every card concurrently and lets life_advisor write the answer
+    TAROT_MODE = os.getenv("TAROT_MODE", "swarm").lower()
+    TAROT_PIPELINE_CONCURRENCY = int(os.getenv("TAROT_PIPELINE_CONCURRENCY", "10"))
+    
+    # Prompt cache: DRAFT prompts are refreshed in the background after the TTL
+    PROMPT_CACHE_TTL = float(os.getenv("PROMPT_CACHE_TTL", "300"))
+    PROMPT_REFRESH_RETRY = float(os.getenv("PROMPT_REFRESH_RETRY", "30"))
+    # Bundled prompts served when Prompt Management is unreachable
+    PROMPTS_DIR = os.getenv("PROMPTS_DIR") or str(Path(__file__).parent.parent.parent / "prompts")
     
     # Prompt Management Configuration (Required)
     ROUTER_PROMPT_ID = os.getenv("ROUTER_PROMPT_ID")
@@ -45,6 +157,16 @@ class Config:
     SPREAD_READER_PROMPT_VERSION = os.getenv("SPREAD_READER_PROMPT_VERSION")
     LIFE_ADVISOR_PROMPT_VERSION = os.getenv("LIFE_ADVISOR_PROMPT_VERSION")
     
+    # Auth Configuration
+    # AUTH_MODE: "tokeninfo" (remote check of access tokens) or "jwks" (local ID token verification)
+    AUTH_MODE = os.getenv("AUTH_MODE", "tokeninfo").lower()
+    GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
+    GOOGLE_CERTS_URL = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v3/certs")
+    AUTH_CACHE_MAX_SIZE = int(os.getenv("AUTH_CACHE_MAX_SIZE", "10000"))
+    AUTH_CACHE_MAX_TTL = float(os.getenv("AUTH_CACHE_MAX_TTL", "3600"))
+    AUTH_NEGATIVE_CACHE_TTL = float(os.getenv("AUTH_NEGATIVE_CACHE_TTL", "30"))
+    AUTH_HTTP_MAX_CONNECTIONS = int(os.getenv("AUTH_HTTP_MAX_CONNECTIONS", "20"))
+    
     # Server Configuration
     HOST = os.getenv("HOST", "0.0.0.0")
     PORT = int(os.getenv("PORT", "8000"))
@@ -52,8 +174,8 @@ class Config:
     @classmethod
     def validate(cls):
         """Validate required configuration"""
-        if not cls.MCP_SERVER_URI:
-            raise ValueError("MCP_SERVER_URI is required")
+        if cls.NUMEROLOGY_TOOLS == "mcp" and not cls.MCP_SERVER_URI:
+            raise ValueError("MCP_SERVER_URI is required when NUMEROLOGY_TOOLS=mcp")
         if not cls.ROUTER_PROMPT_ID:
             raise ValueError("ROUTER_PROMPT_ID is required")
         if not cls.WELCOME_PROMPT_ID:
@@ -0,0 +1,234 @@
+"""
+Token-budgeted conversation history with a rolling summary of older turns
+"""
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+from strands.types.content import ContentBlock, Message, Messages
+from app.core.config import config
+
+SessionKey = Tuple[str, str]
+
+# Words kept from each side of a folded turn
+_DIGEST_WORDS = 25
+# Folded turns remembered per session (the summary itself is capped by tokens)
+_MAX_DIGESTS = 64
+_DIGEST_CHARS = 600
+_MARKUP = re.compile(r"[*_#>`]+|<thinking>.*?</thinking>", re.DOTALL)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+SUMMARY_HEADER = "Summary of earlier conversation:"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token), no tokenizer needed"""
+    return (len(text) + 3) // 4
+
+
+def _message_text(message: Message) -> str:
+    return "\n".join(block["text"] for block in message["content"] if "text" in block)
+
+
+def messages_tokens(messages: Messages) -> int:
+    return sum(estimate_tokens(_message_text(m)) for m in messages)
+
+
+def split_turns(messages: Messages) -> List[Messages]:
+    """Group messages into turns, each starting at a user message"""
+    turns: List[Messages] = []
+    for message in messages:
+        if message["role"] == "user" or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def _shorten(text: str, words: int = _DIGEST_WORDS) -> str:
+    parts = " ".join(_MARKUP.sub(" ", text).split()).split(" ")
+    return " ".join(parts[:words]) + (" ..." if len(parts) > words else "")
+
+
+def digest_turn(turn: Messages) -> str:
+    """One summary line for a turn: the question and the gist of the answer"""
+    question = " ".join(_message_text(m) for m in turn if m["role"] == "user")
+    # The first sentence is all that is kept, so long answers are not scanned in full
+    answer = " ".join(_message_text(m) for m in turn if m["role"] != "user")[:_DIGEST_CHARS]
+    first_sentence = _SENTENCE_END.split(" ".join(_MARKUP.sub(" ", answer).split()), maxsplit=1)[0]
+    line = f"- User: {_shorten(question)}"
+    if first_sentence:
+        line += f" / Answer: {_shorten(first_sentence)}"
+    return line
+
+
+@dataclass
+class CompactedHistory:
+    """History as agents receive it, with the token accounting of the compaction"""
+    messages: Messages
+    summary: str
+    kept_turns: int
+    folded_turns: int
+    raw_tokens: int
+    tokens: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.raw_tokens - self.tokens
+
+
+class HistoryWindow:
+    """
+    Fit a session's history into a token budget before it reaches the agents.
+
+    The newest turns are kept verbatim while they fit in `budget` tokens (the
+    latest turn always is). Older turns are folded into a summary of one line
+    per turn that leads the first kept user message, so roles still
+    alternate. Digests are cached per session and a folded turn is digested
+    once, so when the window shifts only the turns that just left it are
+    processed; turns that later drop out of the loaded history stay in the
+    summary until it exceeds `summary_budget`. Every model call of every
+    agent re-sends the history, so each token saved here is saved per call.
+    """
+
+    def __init__(self, budget: int = None, summary_budget: int = None, agent_turns: Dict[str, int] = None,
+                 max_sessions: int = None):
+        self.budget = config.HISTORY_TOKEN_BUDGET if budget is None else budget
+        self.summary_budget = summary_budget or config.HISTORY_SUMMARY_TOKENS
+        self.agent_turns = config.HISTORY_AGENT_TURNS if agent_turns is None else agent_turns
+        self.max_sessions = max_sessions or config.SESSION_CACHE_MAX_SESSIONS
+        # session -> (digests by turn key in conversation order, folded keys of the last summary, summary)
+        self._sessions: "OrderedDict[SessionKey, Tuple[OrderedDict, Tuple, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.compacted = 0
+        self.raw_tokens = 0
+        self.tokens = 0
+        self.last_saved = 0
+        self.digests_built = 0
+        self.summaries_reused = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget > 0
+
+    def compact(self, actor_id: str, session_id: str, messages: Messages) -> CompactedHistory:
+        """
+        Keep the newest turns within the budget and summarise the rest
+
+        Args:
+            actor_id: Actor the history belongs to
+            session_id: Session the history belongs to
+            messages: Full history as loaded for the request (not modified)
+
+        Returns:
+            The compacted history and its token accounting
+        """
+        raw_tokens = messages_tokens(messages)
+        turns = split_turns(messages)
+        kept, used = 0, 0
+        if self.enabled:
+            for turn in reversed(turns):
+                cost = messages_tokens(turn)
+                if kept and used + cost > self.budget:
+                    break
+                kept += 1
+                used += cost
+        else:
+            kept = len(turns)
+        folded, recent = turns[:len(turns) - kept], turns[len(turns) - kept:]
+
+        summary = self._summary((actor_id, session_id), folded) if folded else ""
+        result_messages = [m for turn in recent for m in turn]
+        if summary and result_messages:
+            first = result_messages[0]
+            result_messages[0] = Message(
+                role=first["role"],
+                content=[ContentBlock(text=f"{SUMMARY_HEADER}\n{summary}")] + list(first["content"])
+            )
+        tokens = messages_tokens(result_messages)
+
+        with self._lock:
+            self.requests += 1
+            self.compacted += bool(folded)
+            self.raw_tokens += raw_tokens
+            self.tokens += tokens
+            self.last_saved = raw_tokens - tokens
+        return CompactedHistory(result_messages, summary, len(recent), len(folded), raw_tokens, tokens)
+
+    def _summary(self, key: SessionKey, folded: List[Messages]) -> str:
+        """Rolling summary of the session's folded turns, rebuilt only when they change"""
+        turn_keys = tuple(hash(tuple(_message_text(m) for m in turn)) for turn in folded)
+        with self._lock:
+            entry = self._sessions.get(key)
+            if entry is not None:
+                self._sessions.move_to_end(key)
+                if entry[1] == turn_keys:
+                    self.summaries_reused += 1
+                    return entry[2]
+            digests = entry[0] if entry is not None else OrderedDict()
+        new = [(k, digest_turn(turn)) for k, turn in zip(turn_keys, folded) if k not in digests]
+
+        with self._lock:
+            for k, line in new:
+                digests[k] = line
+            self.digests_built += len(new)
+            while len(digests) > _MAX_DIGESTS:
+                digests.popitem(last=False)
+            lines, used = [], 0
+            for line in reversed(digests.values()):
+                cost = estimate_tokens(line)
+                if used + cost > self.summary_budget:
+                    break
+                lines.append(line)
+                used += cost
+            summary = "\n".join(reversed(lines))
+            self._sessions[key] = (digests, turn_keys, summary)
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return summary
+
+    def slice_for(self, agent: str, messages: Messages) -> Messages:
+        """
+        The part of a (compacted) history an agent needs
+
+        Agents listed in HISTORY_AGENT_TURNS get only their last N turns
+        (without the summary); others get everything.
+        """
+        turns = self.agent_turns.get(agent)
+        if turns is None or not messages:
+            return messages
+        if turns <= 0:
+            return []
+        sliced = [m for turn in split_turns(messages)[-turns:] for m in turn]
+        first = sliced[0]["content"]
+        if first and first[0].get("text", "").startswith(SUMMARY_HEADER):
+            sliced[0] = Message(role=sliced[0]["role"], content=list(first[1:]))
+        return sliced
+
+    def invalidate(self, actor_id: str, session_id: str):
+        with self._lock:
+            self._sessions.pop((actor_id, session_id), None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Input tokens saved per request, for monitoring"""
+        with self._lock:
+            return {
+                "budget": self.budget,
+                "requests": self.requests,
+                "compacted": self.compacted,
+                "raw_tokens": self.raw_tokens,
+                "tokens": self.tokens,
+                "saved_tokens": self.raw_tokens - self.tokens,
+                "saved_per_request": round((self.raw_tokens - self.tokens) / self.requests, 1) if self.requests else 0.0,
+                "last_saved": self.last_saved,
+                "digests_built": self.digests_built,
+                "summaries_reused": self.summaries_reused,
+                "sessions": len(self._sessions)
+            }
+
+
+# Global history window instance
+history_window = HistoryWindow()
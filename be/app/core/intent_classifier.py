@@ -0,0 +1,221 @@
+"""
+In-process intent classifier that runs ahead of the LLM router
+"""
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from app.core.config import config
+
+INTENTS = ("welcome", "numerology", "tarot")
+
+# (pattern, weight) per intent; weights are summed over matching patterns
+RULES: Dict[str, List[Tuple[str, float]]] = {
+    "welcome": [
+        (r"^\s*(hi|hello|hey|howdy|greetings|good (morning|afternoon|evening)|yo)\b[\s!.,]*$", 2.0),
+        (r"^\s*(hi|hello|hey|greetings|good (morning|afternoon|evening))\b", 0.6),
+        (r"\bwho are you\b|\bwhat (can|do) you (do|offer)\b|\bwhat services\b|\bhow does this work\b", 1.5),
+        (r"^\s*(help|help me|thanks|thank you|bye|goodbye)\b[\s!.,]*$", 1.5),
+    ],
+    "numerology": [
+        (r"\bnumerolog", 2.5),
+        (r"\blife ?path\b", 2.0),
+        (r"\b(expression|destiny|soul urge|personality|birthday|maturity|personal year) number\b", 2.0),
+        (r"\b(born on|birth ?date|date of birth|dob|my birthday)\b", 1.2),
+        (r"\b\d{1,4}[/.-]\d{1,2}[/.-]\d{1,4}\b", 1.0),
+        (r"\b(january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2}\b", 0.8),
+        (r"\bmaster number|\bnumbers? (mean|say)\b|\bwhat does my name mean\b", 1.2),
+    ],
+    "tarot": [
+        (r"\btarot\b", 2.5),
+        (r"\b(spread|celtic cross|three[- ]card|arcana|pentacles|cups|wands|swords)\b", 1.5),
+        (r"\b(draw|pull|read|flip)\b.{0,20}\bcards?\b", 1.5),
+        (r"\bcards?\b", 0.8),
+        (r"\bthe (fool|magician|high priestess|empress|emperor|hierophant|lovers|chariot|hermit|"
+         r"wheel of fortune|hanged man|devil|tower|star|moon|sun|world)\b", 1.2),
+        (r"\b(strength|justice|death|temperance|judgement)\b card", 1.2),
+        (r"\b(reading|divination|fortune|guidance|future|destiny)\b", 0.5),
+        (r"\b(love life|career|relationship|should i)\b", 0.4),
+    ],
+}
+
+# Small labelled set for the lexical (TF-IDF) index; mirrors the router prompt
+EXAMPLES: Dict[str, List[str]] = {
+    "welcome": [
+        "hello", "hi there", "hey", "good morning", "what can you do",
+        "what services do you offer", "help me", "who are you", "how does this work",
+        "thanks for your help", "nice to meet you",
+    ],
+    "numerology": [
+        "calculate my life path number", "what does my name mean in numerology",
+        "i was born on march 3 1990", "what is my destiny number",
+        "analyze my birth date", "what is my expression number for my full name",
+        "what does the number 7 mean for me", "my birthday is 12/05/1988 what are my numbers",
+        "soul urge number for john smith", "personal year number this year",
+    ],
+    "tarot": [
+        "do a tarot reading for me", "what does the fool card mean", "draw three cards for my career",
+        "i need guidance about my love life", "pull a card for today", "celtic cross spread please",
+        "tell my fortune", "what does the tower mean in a reading", "will my relationship last",
+        "give me a reading about my future", "what do the cards say about my job",
+    ],
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def parse_route(text: str) -> Optional[str]:
+    """
+    The intent named in a router reply, matching the graph's substring routing
+
+    Returns:
+        The first intent name found in the text, or None
+    """
+    text = text.lower()
+    found = [(text.find(intent), intent) for intent in INTENTS if intent in text]
+    return min(found)[1] if found else None
+
+
+@dataclass(frozen=True)
+class IntentPrediction:
+    """Classifier output for one prompt"""
+    intent: Optional[str]
+    confidence: float
+    scores: Dict[str, float]
+
+
+class IntentClassifier:
+    """
+    Keyword rules plus a precomputed TF-IDF nearest-example index.
+
+    `classify` scores every intent, `is_confident` decides whether the
+    prediction may skip the LLM router and `record_fast_path` counts the
+    requests that did. Whenever the router does run, its choice
+    is compared with the local prediction so the agreement rate can be watched
+    before lowering the threshold.
+    """
+
+    def __init__(self, threshold: float = None, min_evidence: float = 1.5):
+        self.threshold = threshold if threshold is not None else config.INTENT_FAST_PATH_THRESHOLD
+        self.min_evidence = min_evidence
+        self._rules = {
+            intent: [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in rules]
+            for intent, rules in RULES.items()
+        }
+        self._build_index()
+        self._lock = threading.Lock()
+        self.classified = 0
+        self.fast_path = 0
+        self.fast_path_confidence = 0.0
+        self.router_compared = 0
+        self.router_agreed = 0
+        self.shadow_compared = 0
+        self.shadow_agreed = 0
+
+    def _build_index(self):
+        documents = [(intent, Counter(_tokens(text))) for intent, texts in EXAMPLES.items() for text in texts]
+        doc_freq = Counter(token for _, counts in documents for token in counts)
+        total = len(documents)
+        self._idf = {token: math.log((1 + total) / (1 + df)) + 1 for token, df in doc_freq.items()}
+        self._index = [(intent, self._vector(counts)) for intent, counts in documents]
+
+    def _vector(self, counts: Counter) -> Dict[str, float]:
+        vector = {token: count * self._idf[token] for token, count in counts.items() if token in self._idf}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {token: v / norm for token, v in vector.items()}
+
+    def _similarities(self, text: str) -> Dict[str, float]:
+        query = self._vector(Counter(_tokens(text)))
+        best = dict.fromkeys(INTENTS, 0.0)
+        for intent, vector in self._index:
+            score = sum(weight * vector.get(token, 0.0) for token, weight in query.items())
+            if score > best[intent]:
+                best[intent] = score
+        return best
+
+    def classify(self, text: str) -> IntentPrediction:
+        """
+        Score a prompt against every intent
+
+        Args:
+            text: The user prompt
+
+        Returns:
+            IntentPrediction whose confidence is the winning share of the total
+            score, scaled down when there is little evidence overall
+        """
+        similarities = self._similarities(text)
+        scores = {}
+        for intent in INTENTS:
+            rule_score = sum(weight for pattern, weight in self._rules[intent] if pattern.search(text))
+            scores[intent] = rule_score + 2.0 * similarities[intent]
+
+        with self._lock:
+            self.classified += 1
+
+        total = sum(scores.values())
+        if total <= 0:
+            return IntentPrediction(None, 0.0, scores)
+        intent = max(scores, key=scores.get)
+        confidence = (scores[intent] / total) * min(1.0, scores[intent] / self.min_evidence)
+        return IntentPrediction(intent, round(confidence, 3), scores)
+
+    def is_confident(self, prediction: IntentPrediction) -> bool:
+        """Whether the prediction may route directly, skipping the LLM router"""
+        return prediction.intent is not None and prediction.confidence >= self.threshold
+
+    def record_fast_path(self, prediction: IntentPrediction):
+        """Count a request routed directly from its prediction; call once per request"""
+        with self._lock:
+            self.fast_path += 1
+            self.fast_path_confidence += prediction.confidence
+
+    def record_router(self, prediction: IntentPrediction, router_text: str, shadow: bool = False):
+        """
+        Compare the local prediction with the LLM router's reply
+
+        Args:
+            prediction: The local prediction for the same prompt
+            router_text: The router agent's reply
+            shadow: True when the router only ran to audit a fast-path decision
+        """
+        agreed = parse_route(router_text) == prediction.intent
+        with self._lock:
+            if shadow:
+                self.shadow_compared += 1
+                self.shadow_agreed += agreed
+            else:
+                self.router_compared += 1
+                self.router_agreed += agreed
+
+    def stats(self) -> Dict[str, float]:
+        """Fast-path and agreement counters for monitoring"""
+        with self._lock:
+            return {
+                "classified": self.classified,
+                "fast_path": self.fast_path,
+                "fast_path_rate": round(self.fast_path / self.classified, 3) if self.classified else 0.0,
+                "fast_path_mean_confidence": (
+                    round(self.fast_path_confidence / self.fast_path, 3) if self.fast_path else 0.0
+                ),
+                # Low-confidence prompts the router decided
+                "router_compared": self.router_compared,
+                "router_agreement_rate": (
+                    round(self.router_agreed / self.router_compared, 3) if self.router_compared else None
+                ),
+                # Fast-path prompts audited by a sampled router call
+                "shadow_compared": self.shadow_compared,
+                "shadow_agreement_rate": (
+                    round(self.shadow_agreed / self.shadow_compared, 3) if self.shadow_compared else None
+                ),
+            }
+
+
+# Global intent classifier instance
+intent_classifier = IntentClassifier()
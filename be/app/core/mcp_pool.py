@@ -0,0 +1,467 @@
+"""
+Pool of MCP client sessions with health checks and reconnects
+"""
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from mcp.shared.exceptions import McpError
+from typing import Any, Callable, Dict, List, Optional
+from strands.tools.mcp import MCPAgentTool, MCPClient
+from strands.tools.mcp.mcp_types import MCPToolResult, MCPTransport
+from app.core.config import config
+
+# How often a waiting call checks that its session's streams are still open
+LIVENESS_POLL_INTERVAL = 0.25
+# Weight of the newest call in the recent latency average
+LATENCY_SMOOTHING = 0.2
+
+
+def _describe(error: BaseException) -> str:
+    error = error.__cause__ or error
+    # anyio wraps transport errors in task group exception groups
+    while isinstance(error, BaseExceptionGroup) and error.exceptions:
+        error = error.exceptions[0]
+    return str(error) or type(error).__name__
+
+
+class MCPSession(MCPClient):
+    """
+    One MCP client session in the pool.
+
+    MCPClient.call_tool_async folds transport failures into an error result;
+    the pool needs to tell them apart from tool errors to reconnect and retry,
+    so calls here raise instead. MCPClient also keeps its background thread
+    alive after the SSE stream drops, so liveness is read from the transport
+    streams: the SSE reader and POST writer close their ends when they fail.
+    """
+
+    def __init__(self, index: int, transport_callable: Callable[[], MCPTransport], startup_timeout: int):
+        super().__init__(self._tracked_transport, startup_timeout=startup_timeout)
+        self._open_transport = transport_callable
+        self._streams = None
+        self.index = index
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.retry_at = 0.0
+        self.last_error: Optional[str] = None
+        # Bumped on every (re)connect so late failure reports of an old stream are ignored
+        self.generation = 0
+        self.closing = False
+        self.connect_lock = threading.Lock()
+
+    @asynccontextmanager
+    async def _tracked_transport(self):
+        async with self._open_transport() as streams:
+            self._streams = streams[:2]
+            try:
+                yield streams
+            finally:
+                self._streams = None
+
+    @property
+    def connected(self) -> bool:
+        if self.closing or not self._is_session_active() or self._background_thread_session is None:
+            return False
+        streams = self._streams
+        if streams is None:
+            return False
+        read_stream, write_stream = streams
+        return (
+            read_stream.statistics().open_send_streams > 0
+            and write_stream.statistics().open_receive_streams > 0
+        )
+
+    async def _await_reply(self, coro, timeout: float):
+        reply = asyncio.wrap_future(self._invoke_on_background_thread(coro))
+        deadline = time.monotonic() + timeout
+        while not reply.done():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                reply.cancel()
+                raise asyncio.TimeoutError()
+            await asyncio.wait({reply}, timeout=min(LIVENESS_POLL_INTERVAL, remaining))
+            if not reply.done() and not self.connected:
+                # A request sent into a dropped stream never gets a reply
+                reply.cancel()
+                raise ConnectionError("MCP session closed while the call was in flight")
+        return reply.result()
+
+    async def call(self, tool_use_id: str, name: str, arguments: Optional[Dict[str, Any]], timeout: float) -> MCPToolResult:
+        """
+        Call a tool on this session
+
+        Raises:
+            asyncio.TimeoutError: If no reply arrives within the timeout
+            Exception: If the session or its transport failed
+        """
+        result = await self._await_reply(self._background_thread_session.call_tool(name, arguments), timeout)
+        return self._handle_tool_result(tool_use_id, result)
+
+    async def ping(self, timeout: float):
+        """Round-trip an MCP ping on this session"""
+        await self._await_reply(self._background_thread_session.send_ping(), timeout)
+
+
+class MCPSessionPool:
+    """
+    Spread MCP tool calls over several client sessions.
+
+    Each SSE session is a single stream, so concurrent numerology requests
+    queue behind each other and one dropped stream used to break every caller
+    until restart. The pool:
+
+    - opens sessions on first use (or via `start`) and sends each call to the
+      connected session with the fewest calls in flight;
+    - retries a call once on another session when its transport fails;
+    - reconnects failed sessions with exponential backoff plus jitter;
+    - bounds every call with a timeout;
+    - pings idle sessions from `run_health_checks` so drops are noticed
+      before a request hits them.
+
+    `call_tool_async` and `list_tools_sync` mirror MCPClient, so MCPAgentTool
+    can use the pool as its client.
+    """
+
+    def __init__(
+        self,
+        transport_callable: Callable[[], MCPTransport],
+        size: int = None,
+        call_timeout: float = None,
+        connect_timeout: int = None,
+        backoff_base: float = None,
+        backoff_max: float = None,
+        health_interval: float = None
+    ):
+        self.size = max(1, size or config.MCP_POOL_SIZE)
+        self.call_timeout = call_timeout or config.MCP_CALL_TIMEOUT
+        self.connect_timeout = connect_timeout or config.MCP_CONNECT_TIMEOUT
+        self.backoff_base = backoff_base if backoff_base is not None else config.MCP_BACKOFF_BASE
+        self.backoff_max = backoff_max if backoff_max is not None else config.MCP_BACKOFF_MAX
+        self.health_interval = health_interval if health_interval is not None else config.MCP_HEALTH_INTERVAL
+        self.sessions = [MCPSession(i, transport_callable, self.connect_timeout) for i in range(self.size)]
+        self._lock = threading.Lock()
+        self._opened = False
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.connects = 0
+        self.reconnects = 0
+        self.connect_failures = 0
+        self.health_failures = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_latency = 0.0
+        self.recent_latency: Optional[float] = None
+        # time.monotonic() of the last completed call
+        self.last_call_at: Optional[float] = None
+
+    # Connection management
+
+    def _connect(self, session: MCPSession) -> bool:
+        """Open a session unless it is connected or backing off (blocking)"""
+        with session.connect_lock:
+            if session.connected:
+                return True
+            if time.monotonic() < session.retry_at:
+                return False
+            try:
+                if session._background_thread is not None:
+                    # Clear the dead background thread left by a dropped stream
+                    session.stop(None, None, None)
+                session.start()
+            except Exception as e:
+                self._backoff(session, e)
+                with self._lock:
+                    self.connect_failures += 1
+                return False
+            reconnect = session.calls > 0 or session.failures > 0
+            session.generation += 1
+            session.failures = 0
+            session.retry_at = 0.0
+            with self._lock:
+                self.connects += 1
+                self.reconnects += reconnect
+            if reconnect:
+                print(f"🔌 MCP session {session.index} reconnected")
+            return True
+
+    def _backoff(self, session: MCPSession, error: Exception):
+        session.failures += 1
+        session.last_error = _describe(error)
+        delay = min(self.backoff_base * 2 ** (session.failures - 1), self.backoff_max)
+        session.retry_at = time.monotonic() + delay * random.uniform(0.5, 1.0)
+
+    def _drop(self, session: MCPSession, generation: int, error: Exception):
+        """Take a failed session out of rotation and close it in the background"""
+        with self._lock:
+            if session.generation != generation or session.closing:
+                return  # already dropped, or reconnected since
+            session.closing = True
+            self._backoff(session, error)
+        print(f"⚠️  MCP session {session.index} failed: {_describe(error)}")
+        # Tearing down the transport can take seconds; callers move on to another session
+        threading.Thread(target=self._close, args=(session,), daemon=True).start()
+
+    def _close(self, session: MCPSession):
+        with session.connect_lock:
+            try:
+                session.stop(None, None, None)
+            except Exception:
+                pass
+            session.closing = False
+
+    def _connect_all(self, exclude: set = frozenset()):
+        threads = [
+            threading.Thread(target=self._connect, args=(s,), daemon=True)
+            for s in self.sessions if s.index not in exclude
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def start(self) -> int:
+        """
+        Open every session concurrently
+
+        Returns:
+            Number of connected sessions
+
+        Raises:
+            ConnectionError: If no session could be opened
+        """
+        self._opened = True
+        self._connect_all()
+        connected = sum(s.connected for s in self.sessions)
+        if not connected:
+            errors = {s.last_error for s in self.sessions if s.last_error}
+            raise ConnectionError(f"no MCP session could be opened: {'; '.join(errors) or 'unknown error'}")
+        return connected
+
+    def stop(self):
+        """Close every session"""
+        self._opened = False
+        for session in self.sessions:
+            with session.connect_lock:
+                if session._background_thread is not None:
+                    session.stop(None, None, None)
+
+    def _pick(self, exclude: set) -> Optional[MCPSession]:
+        candidates = [s for s in self.sessions if s.connected and s.index not in exclude]
+        return min(candidates, key=lambda s: s.in_flight) if candidates else None
+
+    def _checkout_sync(self, exclude: set) -> MCPSession:
+        """A connected session, opening one if none is (blocking)"""
+        self._opened = True
+        session = self._pick(exclude)
+        if session is None:
+            # First use, or every session dropped: open all that are not backing off
+            self._connect_all(exclude)
+            session = self._pick(exclude)
+        if session is None:
+            errors = {s.last_error for s in self.sessions if s.last_error and s.index not in exclude}
+            raise ConnectionError(f"no MCP session available: {'; '.join(errors) or 'all reconnecting'}")
+        return session
+
+    async def _checkout(self, exclude: set) -> MCPSession:
+        session = self._pick(exclude)
+        if session is None:
+            session = await asyncio.to_thread(self._checkout_sync, exclude)
+        return session
+
+    async def _checkout_live(self, exclude: set) -> MCPSession:
+        """
+        A session that answers a ping, for retries
+
+        When the server restarts every stream breaks at once, and the other
+        sessions only notice on their next message, so all candidates are
+        pinged together and the first to answer is used.
+        """
+        candidates = [s for s in self.sessions if s.connected and s.index not in exclude]
+
+        async def probe(session: MCPSession) -> Optional[MCPSession]:
+            generation = session.generation
+            try:
+                await session.ping(min(self.call_timeout, self.connect_timeout))
+                return session
+            except Exception as e:
+                exclude.add(session.index)
+                self._drop(session, generation, e)
+                return None
+
+        for probed in asyncio.as_completed([probe(s) for s in candidates]):
+            session = await probed
+            if session is not None:
+                return session
+        return await self._checkout(exclude)
+
+    # MCPClient interface used by MCPAgentTool
+
+    async def call_tool_async(
+        self,
+        tool_use_id: str,
+        name: str,
+        arguments: Optional[Dict[str, Any]] = None,
+        read_timeout_seconds: Optional[timedelta] = None
+    ) -> MCPToolResult:
+        """
+        Call a tool on the least busy session
+
+        Transport failures are retried once on another session; like
+        MCPClient, failures are returned as an error result, not raised.
+        """
+        timeout = read_timeout_seconds.total_seconds() if read_timeout_seconds else self.call_timeout
+        tried = set()
+        error = None
+        for attempt in range(2):
+            try:
+                session = await (self._checkout_live(tried) if attempt else self._checkout(tried))
+            except Exception as e:
+                error = error or e
+                break
+            tried.add(session.index)
+            generation = session.generation
+            if attempt:
+                with self._lock:
+                    self.retries += 1
+
+            start = time.perf_counter()
+            with self._lock:
+                self.calls += 1
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                session.in_flight += 1
+                session.calls += 1
+            try:
+                return await session.call(tool_use_id, name, arguments, timeout)
+            except McpError as e:
+                # The server answered with an error; the session itself is fine
+                error = e
+                break
+            except asyncio.TimeoutError:
+                # The tool may still be running; retrying could double the work
+                with self._lock:
+                    self.timeouts += 1
+                error = TimeoutError(f"MCP tool '{name}' timed out after {timeout:g}s")
+                break
+            except Exception as e:
+                error = e
+                self._drop(session, generation, e)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.in_flight -= 1
+                    session.in_flight -= 1
+                    self.total_latency += elapsed
+                    self.recent_latency = elapsed if self.recent_latency is None else (
+                        LATENCY_SMOOTHING * elapsed + (1 - LATENCY_SMOOTHING) * self.recent_latency
+                    )
+                    self.last_call_at = time.monotonic()
+
+        with self._lock:
+            self.errors += 1
+        return MCPToolResult(
+            status="error",
+            toolUseId=tool_use_id,
+            content=[{"text": f"Tool execution failed: {_describe(error)}"}]
+        )
+
+    def list_tools_sync(self) -> List[MCPAgentTool]:
+        """List the server's tools, bound to the pool rather than one session"""
+        tried = set()
+        error = None
+        for _ in range(2):
+            session = self._checkout_sync(tried)
+            tried.add(session.index)
+            generation = session.generation
+            try:
+                tools = session.list_tools_sync()
+            except Exception as e:
+                error = e
+                self._drop(session, generation, e)
+                continue
+            return [MCPAgentTool(tool.mcp_tool, self) for tool in tools]
+        raise ConnectionError(f"could not list MCP tools: {error}")
+
+    # Health checks
+
+    async def _check(self, session: MCPSession):
+        """Ping an idle connected session, or reopen a dropped one once its backoff expires"""
+        if not session.connected:
+            await asyncio.to_thread(self._connect, session)
+        elif not session.in_flight:
+            # Busy sessions are checked by their own calls
+            generation = session.generation
+            try:
+                await session.ping(self.call_timeout)
+            except Exception as e:
+                with self._lock:
+                    self.health_failures += 1
+                self._drop(session, generation, e)
+
+    async def check(self):
+        """Health-check every session concurrently"""
+        if self._opened:
+            await asyncio.gather(*(self._check(s) for s in self.sessions))
+
+    async def run_health_checks(self):
+        """Check sessions every health_interval seconds until cancelled (idle until first use)"""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await self.check()
+            except Exception as e:
+                print(f"⚠️  MCP health check failed: {e}")
+
+    def is_slow(self, threshold: float, max_age: float = None) -> bool:
+        """
+        Whether recent calls averaged more than `threshold` seconds
+
+        Args:
+            max_age: Ignore the average once no call has completed for this
+                many seconds, so callers that stopped using a slow server try it again
+        """
+        if self.recent_latency is None or self.recent_latency <= threshold:
+            return False
+        return max_age is None or time.monotonic() - self.last_call_at < max_age
+
+    @property
+    def unreachable(self) -> bool:
+        """Whether the pool was opened and no session is connected (health checks keep reconnecting)"""
+        return self._opened and not any(s.connected for s in self.sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        """Session and call counters for monitoring"""
+        with self._lock:
+            completed = self.calls - self.in_flight
+            return {
+                "size": self.size,
+                "connected": sum(s.connected for s in self.sessions),
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "calls": self.calls,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "retries": self.retries,
+                "connects": self.connects,
+                "reconnects": self.reconnects,
+                "connect_failures": self.connect_failures,
+                "health_failures": self.health_failures,
+                "mean_latency_ms": round(self.total_latency / completed * 1000, 1) if completed else None,
+                "recent_latency_ms": round(self.recent_latency * 1000, 1) if self.recent_latency is not None else None,
+                "sessions": [
+                    {
+                        "connected": s.connected,
+                        "in_flight": s.in_flight,
+                        "calls": s.calls,
+                        "failures": s.failures,
+                        "last_error": s.last_error
+                    }
+                    for s in self.sessions
+                ]
+            }
@@ -1,81 +1,51 @@
 """
-Short-term memory using Bedrock AgentCore Memory
+Short-term memory with pluggable storage backends
 """
-from bedrock_agentcore.memory import MemoryClient
-from typing import List, Tuple, Optional
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Optional, Callable
 from app.core.config import config
+from app.core.memory_backends import MemoryBackend, create_backend
 
 class ShortTermMemory:
     """
-    Short-term memory using Bedrock AgentCore Memory.
+    Short-term memory for conversation context.
     Stores conversation context without long-term persistence.
+
+    Storage is delegated to a MemoryBackend chosen by MEMORY_BACKEND
+    (Bedrock AgentCore Memory by default) and created on first use, so
+    importing this module does no client setup.
+
+    Backends are synchronous, so async callers should use the `a*` methods,
+    which run calls on a bounded dedicated thread pool with a per-call
+    timeout instead of blocking the event loop.
     """
     
-    def __init__(self, region_name: str = None):
-        self.region_name = region_name or config.AWS_REGION
-        self.client = MemoryClient(region_name=self.region_name)
-        self._memory_id: Optional[str] = None
-    
-    def _find_existing_memory(self) -> Optional[str]:
-        """Find existing memory by name"""
-        try:
-            memories = list(self.client.list_memories())
-            print(f"📋 Found {len(memories)} memories")
-            for memory in memories:
-                # The API might return id in different fields
-                memory_id = memory.get("id")
-                memory_name = memory.get("name")
-                print(f"  - Name: {memory_name}, ID: {memory_id}")
-                # Fallback: check if ID contains our memory name
-                if memory_id and "StrandAgentShortTermMemory" in str(memory_id):
-                    return memory_id
-        except Exception as e:
-            print(f"⚠️  Could not list memories: {e}")
-        return None
+    def __init__(
+        self,
+        backend: MemoryBackend = None,
+        max_workers: int = None,
+        timeout: float = None
+    ):
+        self._backend = backend
+        self._backend_lock = threading.Lock()
+        self.timeout = timeout or config.MEMORY_CALL_TIMEOUT
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or config.MEMORY_MAX_WORKERS,
+            thread_name_prefix="memory"
+        )
     
-    def _ensure_memory(self):
-        """Create memory resource if it doesn't exist"""
-        if self._memory_id is not None:
-            return
-        
-        # 1. Check for existing memory in config
-        if config.MEMORY_ID:
-            self._memory_id = config.MEMORY_ID
-            print(f"✅ Using memory from config: {self._memory_id}")
-            return
-        
-        # 2. Check if memory already exists by listing
-        existing_id = self._find_existing_memory()
-        if existing_id:
-            self._memory_id = existing_id
-            print(f"✅ Found existing memory: {self._memory_id}")
-            print(f"💡 Add to .env: MEMORY_ID={self._memory_id}")
-            return
-        
-        # 3. Create new memory only if not found
-        try:
-            print("📝 Creating new memory...")
-            memory = self.client.create_memory_and_wait(
-                name="StrandAgentShortTermMemory",
-                strategies=[]
-            )
-            self._memory_id = memory.get("id")
-            print(f"✅ Created short-term memory: {self._memory_id}")
-            print(f"💡 Add to .env: MEMORY_ID={self._memory_id}")
-        except Exception as e:
-            # If creation fails due to existing memory, try to find it again
-            if "already exists" in str(e):
-                print("⚠️  Memory already exists, searching again...")
-                existing_id = self._find_existing_memory()
-                if existing_id:
-                    self._memory_id = existing_id
-                    print(f"✅ Found existing memory: {self._memory_id}")
-                else:
-                    print(f"❌ Failed to find existing memory: {e}")
-                    raise
-            else:
-                print(f"❌ Failed to create memory: {e}")
-                raise
+    @property
+    def backend(self) -> MemoryBackend:
+        """The storage backend, created on first use"""
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    self._backend = create_backend()
+                    print(f"💾 Short-term memory backend: {self._backend.name}")
+        return self._backend
     
     def create_event(
         self,
@@ -91,14 +61,7 @@ class ShortTermMemory:
             actor_id: User identifier
             session_id: Session identifier
         """
-        self._ensure_memory()
-        
-        self.client.create_event(
-            memory_id=self._memory_id,
-            actor_id=actor_id,
-            session_id=session_id,
-            messages=messages
-        )
+        self.backend.create_event(actor_id, session_id, messages)
     
     def list_events(
         self,
@@ -117,20 +80,58 @@ class ShortTermMemory:
         Returns:
             List of conversation events
         """
-        self._ensure_memory()
+        return self.backend.list_events(actor_id, session_id, max_results)
+    
+    def clear_session(self, actor_id: str = "default_user", session_id: str = "default_session"):
+        """Clear conversation history for a session"""
+        self.backend.delete_session(actor_id, session_id)
+    
+    async def _run(self, func: Callable, *args, **kwargs):
+        """
+        Run a blocking memory call on the dedicated executor
         
-        return self.client.list_events(
-            memory_id=self._memory_id,
+        Raises:
+            asyncio.TimeoutError: If the call does not finish within self.timeout.
+                The worker thread is not interrupted, but the pool is bounded so
+                slow calls cannot pile up unbounded threads.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+        return await asyncio.wait_for(future, timeout=self.timeout)
+    
+    async def acreate_event(
+        self,
+        messages: List[Tuple[str, str]],
+        actor_id: str = "default_user",
+        session_id: str = "default_session"
+    ):
+        """Async variant of create_event that does not block the event loop"""
+        return await self._run(
+            self.create_event,
+            messages=messages,
+            actor_id=actor_id,
+            session_id=session_id
+        )
+    
+    async def alist_events(
+        self,
+        actor_id: str = "default_user",
+        session_id: str = "default_session",
+        max_results: int = 20
+    ):
+        """Async variant of list_events that does not block the event loop"""
+        return await self._run(
+            self.list_events,
             actor_id=actor_id,
             session_id=session_id,
             max_results=max_results
         )
     
-    def clear_session(self, actor_id: str = "default_user", session_id: str = "default_session"):
-        """Clear conversation history for a session"""
-        # Note: AgentCore Memory doesn't have a direct delete event API
-        # Events expire automatically based on retention policy
-        pass
+    def shutdown(self):
+        """Stop the memory executor and close the backend"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._backend is not None:
+            self._backend.close()
 
 # Global short-term memory instance
 short_term_memory = ShortTermMemory()
@@ -0,0 +1,340 @@
+"""
+Storage backends for short-term memory
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from app.core.config import config
+
+
+def _build_event(messages: List[Tuple[str, str]], timestamp: float = None, event_id: str = None) -> Dict[str, Any]:
+    """Build an event shaped like AgentCore Memory's list_events output"""
+    timestamp = timestamp if timestamp is not None else time.time()
+    return {
+        "eventId": event_id or uuid.uuid4().hex,
+        "eventTimestamp": datetime.fromtimestamp(timestamp, tz=timezone.utc),
+        "payload": [
+            {"conversational": {"content": {"text": text}, "role": role}}
+            for text, role in messages
+        ]
+    }
+
+
+class MemoryBackend(ABC):
+    """
+    Storage interface behind ShortTermMemory.
+
+    Implementations are synchronous; ShortTermMemory runs them on its executor.
+    `list_events` returns the most recent events of a session in chronological
+    order, in the AgentCore event shape (see `_build_event`).
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def create_event(self, actor_id: str, session_id: str, messages: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """Store one event holding a list of (message, role) tuples"""
+
+    @abstractmethod
+    def list_events(self, actor_id: str, session_id: str, max_results: int) -> List[Dict[str, Any]]:
+        """Load up to max_results events for a session"""
+
+    def delete_session(self, actor_id: str, session_id: str):
+        """Remove a session's events (no-op where the store expires them itself)"""
+
+    def close(self):
+        """Release connections"""
+
+
+class AgentCoreMemoryBackend(MemoryBackend):
+    """Bedrock AgentCore Memory (the managed cloud backend)"""
+
+    name = "agentcore"
+
+    def __init__(self, region_name: str = None, client: Any = None):
+        self.region_name = region_name or config.AWS_REGION
+        if client is None:
+            from bedrock_agentcore.memory import MemoryClient
+            client = MemoryClient(region_name=self.region_name)
+        self.client = client
+        self._memory_id: Optional[str] = None
+        self._memory_lock = threading.Lock()
+
+    def _find_existing_memory(self) -> Optional[str]:
+        """Find existing memory by name"""
+        try:
+            memories = list(self.client.list_memories())
+            print(f"📋 Found {len(memories)} memories")
+            for memory in memories:
+                # The API might return id in different fields
+                memory_id = memory.get("id")
+                memory_name = memory.get("name")
+                print(f"  - Name: {memory_name}, ID: {memory_id}")
+                # Fallback: check if ID contains our memory name
+                if memory_id and "StrandAgentShortTermMemory" in str(memory_id):
+                    return memory_id
+        except Exception as e:
+            print(f"⚠️  Could not list memories: {e}")
+        return None
+
+    def _ensure_memory(self):
+        """Create memory resource if it doesn't exist"""
+        if self._memory_id is not None:
+            return
+
+        # Several executor threads may race here on the first requests
+        with self._memory_lock:
+            if self._memory_id is None:
+                self._resolve_memory()
+
+    def _resolve_memory(self):
+        """Find or create the memory resource (caller holds the lock)"""
+        # 1. Check for existing memory in config
+        if config.MEMORY_ID:
+            self._memory_id = config.MEMORY_ID
+            print(f"✅ Using memory from config: {self._memory_id}")
+            return
+
+        # 2. Check if memory already exists by listing
+        existing_id = self._find_existing_memory()
+        if existing_id:
+            self._memory_id = existing_id
+            print(f"✅ Found existing memory: {self._memory_id}")
+            print(f"💡 Add to .env: MEMORY_ID={self._memory_id}")
+            return
+
+        # 3. Create new memory only if not found
+        try:
+            print("📝 Creating new memory...")
+            memory = self.client.create_memory_and_wait(
+                name="StrandAgentShortTermMemory",
+                strategies=[]
+            )
+            self._memory_id = memory.get("id")
+            print(f"✅ Created short-term memory: {self._memory_id}")
+            print(f"💡 Add to .env: MEMORY_ID={self._memory_id}")
+        except Exception as e:
+            # If creation fails due to existing memory, try to find it again
+            if "already exists" in str(e):
+                print("⚠️  Memory already exists, searching again...")
+                existing_id = self._find_existing_memory()
+                if existing_id:
+                    self._memory_id = existing_id
+                    print(f"✅ Found existing memory: {self._memory_id}")
+                else:
+                    print(f"❌ Failed to find existing memory: {e}")
+                    raise
+            else:
+                print(f"❌ Failed to create memory: {e}")
+                raise
+
+    def create_event(self, actor_id: str, session_id: str, messages: List[Tuple[str, str]]) -> Dict[str, Any]:
+        self._ensure_memory()
+        return self.client.create_event(
+            memory_id=self._memory_id,
+            actor_id=actor_id,
+            session_id=session_id,
+            messages=messages
+        )
+
+    def list_events(self, actor_id: str, session_id: str, max_results: int) -> List[Dict[str, Any]]:
+        self._ensure_memory()
+        return self.client.list_events(
+            memory_id=self._memory_id,
+            actor_id=actor_id,
+            session_id=session_id,
+            max_results=max_results
+        )
+
+    def delete_session(self, actor_id: str, session_id: str):
+        # Note: AgentCore Memory doesn't have a direct delete event API
+        # Events expire automatically based on retention policy
+        pass
+
+
+class InMemoryBackend(MemoryBackend):
+    """Process-local store for tests and single-node deployments"""
+
+    name = "memory"
+
+    def __init__(self, max_events_per_session: int = None):
+        self.max_events_per_session = max_events_per_session or config.MEMORY_SESSION_MAX_EVENTS
+        self._sessions: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = defaultdict(
+            lambda: deque(maxlen=self.max_events_per_session)
+        )
+        self._lock = threading.Lock()
+
+    def create_event(self, actor_id: str, session_id: str, messages: List[Tuple[str, str]]) -> Dict[str, Any]:
+        event = _build_event(messages)
+        with self._lock:
+            self._sessions[(actor_id, session_id)].append(event)
+        return event
+
+    def list_events(self, actor_id: str, session_id: str, max_results: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            events = self._sessions.get((actor_id, session_id))
+            if not events:
+                return []
+            return list(events)[-max_results:]
+
+    def delete_session(self, actor_id: str, session_id: str):
+        with self._lock:
+            self._sessions.pop((actor_id, session_id), None)
+
+
+class SQLiteMemoryBackend(MemoryBackend):
+    """Local SQLite store in WAL mode, indexed on (actor_id, session_id, timestamp)"""
+
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS events (
+            event_id TEXT PRIMARY KEY,
+            actor_id TEXT NOT NULL,
+            session_id TEXT NOT NULL,
+            timestamp REAL NOT NULL,
+            payload TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_events_session
+            ON events (actor_id, session_id, timestamp);
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or config.MEMORY_SQLITE_PATH
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per executor thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def create_event(self, actor_id: str, session_id: str, messages: List[Tuple[str, str]]) -> Dict[str, Any]:
+        timestamp = time.time()
+        event_id = uuid.uuid4().hex
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO events (event_id, actor_id, session_id, timestamp, payload) VALUES (?, ?, ?, ?, ?)",
+                (event_id, actor_id, session_id, timestamp, json.dumps(messages))
+            )
+        return _build_event(messages, timestamp, event_id)
+
+    def list_events(self, actor_id: str, session_id: str, max_results: int) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(
+            "SELECT event_id, timestamp, payload FROM events "
+            "WHERE actor_id = ? AND session_id = ? ORDER BY timestamp DESC LIMIT ?",
+            (actor_id, session_id, max_results)
+        ).fetchall()
+        return [
+            _build_event([tuple(m) for m in json.loads(payload)], timestamp, event_id)
+            for event_id, timestamp, payload in reversed(rows)
+        ]
+
+    def delete_session(self, actor_id: str, session_id: str):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM events WHERE actor_id = ? AND session_id = ?", (actor_id, session_id))
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+class RedisMemoryBackend(MemoryBackend):
+    """
+    Redis-protocol store: one capped list per session with a sliding expiry.
+
+    Works against Redis, Valkey or any RESP server implementing RPUSH,
+    LTRIM, LRANGE, EXPIRE and DEL (see stubs/redis_server.py).
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str = None, max_events_per_session: int = None, ttl: int = None):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("MEMORY_BACKEND=redis requires the 'redis' package (pip install redis)") from e
+        self.url = url or config.MEMORY_REDIS_URL
+        self.max_events_per_session = max_events_per_session or config.MEMORY_SESSION_MAX_EVENTS
+        self.ttl = ttl or config.MEMORY_SESSION_TTL
+        self.client = redis.Redis.from_url(
+            self.url,
+            protocol=2,
+            max_connections=config.MEMORY_MAX_WORKERS,
+            socket_timeout=config.MEMORY_CALL_TIMEOUT
+        )
+
+    @staticmethod
+    def _key(actor_id: str, session_id: str) -> str:
+        return f"stm:{actor_id}:{session_id}"
+
+    def create_event(self, actor_id: str, session_id: str, messages: List[Tuple[str, str]]) -> Dict[str, Any]:
+        event = _build_event(messages)
+        record = json.dumps({
+            "id": event["eventId"],
+            "ts": event["eventTimestamp"].timestamp(),
+            "messages": messages
+        })
+        key = self._key(actor_id, session_id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.rpush(key, record)
+        pipe.ltrim(key, -self.max_events_per_session, -1)
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+        return event
+
+    def list_events(self, actor_id: str, session_id: str, max_results: int) -> List[Dict[str, Any]]:
+        records = self.client.lrange(self._key(actor_id, session_id), -max_results, -1)
+        events = []
+        for raw in records:
+            record = json.loads(raw)
+            events.append(_build_event([tuple(m) for m in record["messages"]], record["ts"], record["id"]))
+        return events
+
+    def delete_session(self, actor_id: str, session_id: str):
+        self.client.delete(self._key(actor_id, session_id))
+
+    def close(self):
+        self.client.close()
+
+
+BACKENDS = {
+    AgentCoreMemoryBackend.name: AgentCoreMemoryBackend,
+    InMemoryBackend.name: InMemoryBackend,
+    SQLiteMemoryBackend.name: SQLiteMemoryBackend,
+    RedisMemoryBackend.name: RedisMemoryBackend,
+}
+
+
+def create_backend(name: str = None) -> MemoryBackend:
+    """
+    Create the memory backend selected by name (defaults to MEMORY_BACKEND)
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    name = (name or config.MEMORY_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown MEMORY_BACKEND '{name}'. Choose one of: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
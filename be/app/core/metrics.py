@@ -0,0 +1,295 @@
+"""
+In-process request metrics exported in the Prometheus text format
+"""
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from app.core.config import config
+
+LabelValues = Tuple[str, ...]
+
+# Seconds: from cache hits and local tools up to multi-agent tarot readings
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+HANDOFF_BUCKETS = (0, 1, 2, 3, 4, 6, 8, 11, 15)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    """Base for metric families: a name, help text and label names"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _labels(self, values: LabelValues, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    @abstractmethod
+    def _samples(self) -> Iterable[str]:
+        """Sample lines of the family, without the HELP and TYPE header"""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class _Value(_Metric):
+    """Base for families holding one value per label set"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: str):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{self._labels(labels)} {_format_value(value)}"
+
+
+class Counter(_Value):
+    """Monotonic total per label set"""
+
+    kind = "counter"
+
+    def totals(self) -> Dict[LabelValues, float]:
+        """Value of every label set"""
+        with self._lock:
+            return dict(self._values)
+
+
+class Gauge(_Value):
+    """Current value per label set, e.g. requests in flight"""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, *labels: str):
+        self.inc(-amount, *labels)
+
+
+class Histogram(_Metric):
+    """
+    Bucketed observations per label set
+
+    Observations go into one non-cumulative slot found by bisection; the
+    cumulative bucket counts Prometheus expects are only computed on render.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> slot counts (the last slot is +Inf), then sum and count
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: str):
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[slot] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self, *labels: str) -> Optional[Tuple[int, float]]:
+        """(count, sum) of a label set, or None if it was never observed"""
+        series = self._series.get(labels)
+        return (series[-1], series[-2]) if series is not None else None
+
+    def totals(self) -> Dict[LabelValues, Tuple[int, float]]:
+        """(count, sum) of every label set"""
+        with self._lock:
+            return {labels: (series[-1], series[-2]) for labels, series in self._series.items()}
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in items:
+            slots, total, count = series[:-2], series[-2], series[-1]
+            cumulative = 0
+            for bound, slot_count in zip(self.buckets + (float("inf"),), slots):
+                cumulative += slot_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{self._labels(labels, le)} {cumulative}"
+            yield f"{self.name}_sum{self._labels(labels)} {_format_value(total)}"
+            yield f"{self.name}_count{self._labels(labels)} {count}"
+
+
+class _StageTimer:
+    """Context manager observing the time spent in a block"""
+
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: LabelValues):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+
+class _RequestTracker:
+    """Counts a request in flight and records its outcome, latency and responding agent"""
+
+    __slots__ = ("metrics", "endpoint", "agent", "status", "start")
+
+    def __init__(self, metrics: "Metrics", endpoint: str):
+        self.metrics = metrics
+        self.endpoint = endpoint
+        # Set by the route once it knows which agent answered, or that it failed without raising
+        self.agent = ""
+        self.status = "ok"
+
+    def __enter__(self):
+        self.metrics.in_flight.inc(1.0, self.endpoint)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        self.metrics.in_flight.dec(1.0, self.endpoint)
+        self.metrics.request_seconds.observe(elapsed, self.endpoint, self.agent)
+        if exc_type is None:
+            status = self.status
+        elif issubclass(exc_type, (GeneratorExit, asyncio.CancelledError)):
+            # The client disconnected mid-stream
+            status = "cancelled"
+        else:
+            status = "error"
+        self.metrics.requests.inc(1.0, self.endpoint, self.agent, status)
+        return False
+
+
+class Metrics:
+    """
+    Latency, token, handoff and cost metrics of the request pipeline.
+
+    Stages a request passes through (auth, history, classify, memory_write)
+    are timed where they run; graph nodes, swarm members, tool calls and
+    token usage are read from the result objects after the run, so nothing
+    is added inside the agents' event loops. Labels are limited to endpoint,
+    stage, graph node (agent), agent or tool (node) and token direction.
+    """
+
+    def __init__(self, input_price: float = None, output_price: float = None):
+        self.input_price = config.MODEL_INPUT_PRICE_PER_1K if input_price is None else input_price
+        self.output_price = config.MODEL_OUTPUT_PRICE_PER_1K if output_price is None else output_price
+        self.requests = Counter(
+            "agent_requests_total", "Requests by endpoint, answering agent and outcome",
+            ("endpoint", "agent", "status")
+        )
+        self.request_seconds = Histogram(
+            "agent_request_seconds", "End-to-end request latency", ("endpoint", "agent")
+        )
+        self.in_flight = Gauge("agent_requests_in_flight", "Requests being processed", ("endpoint",))
+        self.stage_seconds = Histogram(
+            "agent_stage_seconds",
+            "Latency per stage: auth, history, classify, memory_write, graph node, agent and tool",
+            ("stage", "agent", "node")
+        )
+        self.tokens = Histogram(
+            "agent_tokens", "Model tokens per agent run", ("agent", "node", "direction"), TOKEN_BUCKETS
+        )
+        self.handoffs = Histogram(
+            "agent_swarm_handoffs", "Swarm handoffs per request", ("agent",), HANDOFF_BUCKETS
+        )
+        self.model_calls = Counter("agent_model_calls_total", "Model calls by agent", ("agent", "node"))
+        self.cost = Counter("agent_model_cost_usd_total", "Estimated model cost in USD", ("agent", "node"))
+        self._families: List[_Metric] = [
+            self.requests, self.request_seconds, self.in_flight, self.stage_seconds,
+            self.tokens, self.handoffs, self.model_calls, self.cost
+        ]
+
+    def track_request(self, endpoint: str) -> _RequestTracker:
+        return _RequestTracker(self, endpoint)
+
+    def stage(self, stage: str, agent: str = "", node: str = "") -> _StageTimer:
+        """Time a block as one stage: `with metrics.stage("history"): ...`"""
+        return _StageTimer(self.stage_seconds, (stage, agent, node))
+
+    def observe_stage(self, stage: str, seconds: float, agent: str = "", node: str = ""):
+        self.stage_seconds.observe(seconds, stage, agent, node)
+
+    def record_usages(self, usages) -> None:
+        """
+        Record per-agent work of a run
+
+        Args:
+            usages: NodeUsage entries (app/api/results.py node_usages)
+        """
+        for item in usages:
+            if item.agent != item.node:
+                self.stage_seconds.observe(item.seconds, "agent", item.agent, item.node)
+            input_tokens = item.usage.get("inputTokens", 0)
+            output_tokens = item.usage.get("outputTokens", 0)
+            self.tokens.observe(input_tokens, item.agent, item.node, "input")
+            self.tokens.observe(output_tokens, item.agent, item.node, "output")
+            self.model_calls.inc(item.model_calls, item.agent, item.node)
+            self.cost.inc(
+                (input_tokens * self.input_price + output_tokens * self.output_price) / 1000, item.agent, item.node
+            )
+            for tool, (calls, seconds) in item.tools.items():
+                # Strands keeps per-tool totals; each call is recorded at the mean
+                for _ in range(calls):
+                    self.stage_seconds.observe(seconds / calls, "tool", item.agent, tool)
+
+    def record_graph(self, result, usages) -> None:
+        """
+        Record a graph run: each graph node's latency, swarm handoffs and per-agent usage
+
+        Args:
+            result: GraphResult of the run
+            usages: node_usages(result)
+        """
+        for node_id, node_result in result.results.items():
+            self.stage_seconds.observe(node_result.execution_time / 1000, "node", node_id, node_id)
+            history = getattr(node_result.result, "node_history", None)
+            if history is not None and not hasattr(node_result.result, "reading"):
+                self.handoffs.observe(max(len(history) - 1, 0), node_id)
+        self.record_usages(usages)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)"""
+        lines: List[str] = []
+        for family in self._families:
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics instance
+metrics = Metrics()
@@ -1,8 +1,13 @@
 """
 AWS Bedrock Prompt Management integration
 """
+import asyncio
 import boto3
-from typing import Optional, Dict, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, Any, List
 from app.core.config import config
 
 class PromptConfig:
@@ -19,13 +24,120 @@ class PromptConfig:
         self.top_p = top_p
         self.max_tokens = max_tokens
 
+class LazyPrompt:
+    """
+    An agent's prompt, registered at import and fetched on first use.
+
+    Startup prefetches every registered prompt concurrently; afterwards get()
+    is served from the PromptManager cache. `instructions` are appended in
+    code to the agent's system prompt (see `text`), so they apply whichever
+    version of the prompt Prompt Management serves.
+    """
+    
+    def __init__(
+        self, manager: "PromptManager", name: str, prompt_identifier: str,
+        prompt_version: Optional[str], instructions: str = ""
+    ):
+        self.manager = manager
+        self.name = name
+        self.prompt_identifier = prompt_identifier
+        self.prompt_version = prompt_version
+        self.instructions = instructions
+    
+    @property
+    def loaded(self) -> bool:
+        return self.manager.is_cached(self.prompt_identifier, self.prompt_version, self.name)
+    
+    def get(self) -> PromptConfig:
+        """Return the prompt config (cached, refreshed in the background)"""
+        return self.manager.get_prompt_config(self.prompt_identifier, self.prompt_version, name=self.name)
+    
+    async def get_async(self) -> PromptConfig:
+        """Like get(), but a first load fetches on a worker thread instead of blocking the event loop"""
+        if self.loaded:
+            return self.get()
+        return await asyncio.to_thread(self.get)
+    
+    @property
+    def text(self) -> str:
+        """The agent's system prompt: the prompt text followed by the instructions"""
+        return self.get().text + self.instructions
+
+class _CacheEntry:
+    """A cached prompt with its expiry and where it came from ("aws" or "local")"""
+    __slots__ = ("config", "expires_at", "source")
+    
+    def __init__(self, config: PromptConfig, expires_at: float, source: str):
+        self.config = config
+        self.expires_at = expires_at
+        self.source = source
+
 class PromptManager:
-    """Manage prompts using AWS Bedrock Prompt Management"""
+    """
+    Manage prompts using AWS Bedrock Prompt Management
     
-    def __init__(self, region_name: str = None):
+    Prompts are cached in process: versioned prompts never change and are kept
+    forever, DRAFT prompts for PROMPT_CACHE_TTL seconds. An expired entry is
+    still returned while a background refresh fetches the new one
+    (stale-while-revalidate), so only the very first load of a prompt waits
+    on AWS. If Prompt Management is unreachable, the bundled
+    prompts/<name>_prompt.txt files are served as a last-known-good fallback.
+    """
+    
+    def __init__(self, region_name: str = None, prompts_dir: str = None, ttl: float = None):
         self.region_name = region_name or config.AWS_REGION
-        self.client = boto3.client(service_name='bedrock-agent', region_name="us-east-1")
-        self._prompt_cache: Dict[str, PromptConfig] = {}  # Cache by version
+        self.prompts_dir = Path(prompts_dir or config.PROMPTS_DIR)
+        self.ttl = ttl if ttl is not None else config.PROMPT_CACHE_TTL
+        self.retry_interval = config.PROMPT_REFRESH_RETRY
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._prompt_cache: Dict[str, _CacheEntry] = {}
+        self._cache_lock = threading.Lock()
+        self._fetch_locks: Dict[str, threading.Lock] = {}
+        self._refreshing: set = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.prompts: List[LazyPrompt] = []
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.fallbacks = 0
+    
+    @property
+    def client(self):
+        """bedrock-agent client, created on first use (not at import)"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = boto3.client(service_name='bedrock-agent', region_name=self.region_name)
+        return self._client
+    
+    def lazy_prompt(
+        self, name: str, prompt_identifier: str, prompt_version: Optional[str] = None, instructions: str = ""
+    ) -> LazyPrompt:
+        """
+        Register an agent prompt to be fetched on first use
+        
+        Args:
+            name: Agent name; also selects the local fallback prompts/<name>_prompt.txt
+            prompt_identifier: Prompt ARN or ID
+            prompt_version: Optional version (defaults to DRAFT)
+            instructions: Text appended to the agent's system prompt in code
+            
+        Returns:
+            LazyPrompt whose get() returns the PromptConfig
+        """
+        prompt = LazyPrompt(self, name, prompt_identifier, prompt_version, instructions)
+        self.prompts.append(prompt)
+        return prompt
+    
+    def registered(self, name: str) -> Optional[LazyPrompt]:
+        """The registered prompt for an agent name, if any"""
+        for prompt in self.prompts:
+            if prompt.name == name:
+                return prompt
+        return None
     
     def get_prompt(
         self,
@@ -45,37 +157,246 @@ class PromptManager:
         config = self.get_prompt_config(prompt_identifier, prompt_version)
         return config.text
     
+    @staticmethod
+    def _cache_key(prompt_identifier: Optional[str], prompt_version: Optional[str], name: Optional[str]) -> str:
+        if not prompt_identifier:
+            return f"local:{name}"
+        return f"{prompt_identifier}:{prompt_version or 'DRAFT'}"
+    
+    def is_cached(self, prompt_identifier: str, prompt_version: Optional[str] = None, name: str = None) -> bool:
+        return self._cache_key(prompt_identifier, prompt_version, name) in self._prompt_cache
+    
+    def _expiry(self, prompt_version: Optional[str], source: str) -> float:
+        if source == "local":
+            # Keep trying Prompt Management in the background
+            return time.time() + self.retry_interval
+        if prompt_version:
+            # Published versions are immutable
+            return float("inf")
+        return time.time() + self.ttl
+    
+    def _store(self, cache_key: str, prompt_config: PromptConfig, prompt_version: Optional[str], source: str):
+        with self._cache_lock:
+            self._prompt_cache[cache_key] = _CacheEntry(prompt_config, self._expiry(prompt_version, source), source)
+    
     def get_prompt_config(
         self,
         prompt_identifier: str,
-        prompt_version: Optional[str] = None
+        prompt_version: Optional[str] = None,
+        name: str = None
     ) -> PromptConfig:
         """
         Get prompt configuration including text and inference settings.
-        Caches by version - if version is specified, it's cached permanently.
-        If no version specified, uses DRAFT and fetches every time.
+        
+        Served from the cache when possible; an expired entry is returned as is
+        and refreshed in the background. Only the first load of a prompt
+        fetches synchronously.
         
         Args:
-            prompt_identifier: Prompt ARN or ID
+            prompt_identifier: Prompt ARN or ID (None serves the local file)
             prompt_version: Optional version (defaults to DRAFT)
+            name: Agent name used for the local prompts/ fallback
             
         Returns:
             PromptConfig with text and inference settings
             
+        Raises:
+            Exception: If the prompt cannot be retrieved and there is no local fallback
+        """
+        cache_key = self._cache_key(prompt_identifier, prompt_version, name)
+        
+        entry = self._prompt_cache.get(cache_key)
+        if entry is not None:
+            if entry.expires_at > time.time():
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._refresh_later(cache_key, prompt_identifier, prompt_version, name)
+            return entry.config
+        
+        # First load: one fetch per key even if several agents ask at once
+        with self._cache_lock:
+            fetch_lock = self._fetch_locks.setdefault(cache_key, threading.Lock())
+        with fetch_lock:
+            entry = self._prompt_cache.get(cache_key)
+            if entry is not None:
+                return entry.config
+            self.misses += 1
+            prompt_config, source = self._load(prompt_identifier, prompt_version, name)
+            self._store(cache_key, prompt_config, prompt_version, source)
+            return prompt_config
+    
+    def _load(self, prompt_identifier: Optional[str], prompt_version: Optional[str], name: Optional[str]):
+        """Fetch from AWS, falling back to the bundled prompt file"""
+        if prompt_identifier:
+            try:
+                return self._fetch_prompt_config(prompt_identifier, prompt_version), "aws"
+            except Exception as e:
+                fallback = self._load_local(name)
+                if fallback is None:
+                    raise
+                self.fallbacks += 1
+                print(f"⚠️  Prompt Management unavailable for {prompt_identifier} ({e}); using local prompt '{name}'")
+                return fallback, "local"
+        
+        # No prompt ID configured (local development)
+        fallback = self._load_local(name)
+        if fallback is None:
+            raise ValueError(f"No prompt ID configured and no local prompt file for '{name}'")
+        self.fallbacks += 1
+        return fallback, "local"
+    
+    def _load_local(self, name: Optional[str]) -> Optional[PromptConfig]:
+        """Read prompts/<name>_prompt.txt, if it exists"""
+        if not name:
+            return None
+        path = self.prompts_dir / f"{name}_prompt.txt"
+        if not path.is_file():
+            return None
+        text = path.read_text(encoding="utf-8").strip()
+        return PromptConfig(text=text) if text else None
+    
+    def _refresh_later(self, cache_key: str, prompt_identifier: str, prompt_version: Optional[str], name: Optional[str]):
+        """Start one background refresh per key"""
+        if not prompt_identifier:
+            return
+        with self._cache_lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="prompt-refresh")
+        self._executor.submit(self._refresh, cache_key, prompt_identifier, prompt_version, name)
+    
+    def _refresh(self, cache_key: str, prompt_identifier: str, prompt_version: Optional[str], name: Optional[str]):
+        try:
+            prompt_config = self._fetch_prompt_config(prompt_identifier, prompt_version)
+            self._store(cache_key, prompt_config, prompt_version, "aws")
+            self.refreshes += 1
+        except Exception as e:
+            # Keep serving the last known good prompt; try again later
+            self.refresh_failures += 1
+            print(f"⚠️  Prompt refresh failed for {cache_key}: {e}")
+            with self._cache_lock:
+                entry = self._prompt_cache.get(cache_key)
+                if entry is not None:
+                    entry.expires_at = time.time() + self.retry_interval
+        finally:
+            with self._cache_lock:
+                self._refreshing.discard(cache_key)
+    
+    def prefetch(self, prompts: List[LazyPrompt] = None) -> Dict[str, str]:
+        """
+        Load many prompts concurrently (all registered prompts by default)
+        
+        Args:
+            prompts: Prompts to load
+            
+        Returns:
+            Mapping of prompt name to where it was loaded from ("aws" or "local")
+            
+        Raises:
+            Exception: The first failure, after all fetches have finished
+        """
+        prompts = self.prompts if prompts is None else prompts
+        if not prompts:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(prompts), thread_name_prefix="prompt-prefetch") as executor:
+            futures = {prompt.name: executor.submit(prompt.get) for prompt in prompts}
+        errors = [f.exception() for f in futures.values() if f.exception() is not None]
+        if errors:
+            raise errors[0]
+        return {
+            prompt.name: self._prompt_cache[self._cache_key(prompt.prompt_identifier, prompt.prompt_version, prompt.name)].source
+            for prompt in prompts
+        }
+    
+    async def load_async(self, prompts: List[LazyPrompt] = None):
+        """
+        Load the prompts that are not cached yet on a worker thread
+        
+        Lets request handlers make sure get() will be served from the cache
+        without a blocking Prompt Management call on the event loop.
+        
+        Args:
+            prompts: Prompts to load (all registered prompts by default)
+        """
+        missing = [prompt for prompt in (self.prompts if prompts is None else prompts) if not prompt.loaded]
+        if missing:
+            await asyncio.to_thread(self.prefetch, missing)
+    
+    def revalidate(self, prompts: List[LazyPrompt] = None) -> Dict[str, str]:
+        """
+        Re-fetch prompts from AWS concurrently, replacing cached copies
+        
+        Used after a warm start to check snapshot prompts against Prompt
+        Management; prompts that cannot be fetched keep their cached copy.
+        
+        Returns:
+            Mapping of prompt name to the source now cached ("aws" or "local")
+        """
+        prompts = self.prompts if prompts is None else prompts
+        live = [prompt for prompt in prompts if prompt.prompt_identifier]
+        if live:
+            with ThreadPoolExecutor(max_workers=len(live), thread_name_prefix="prompt-revalidate") as executor:
+                for prompt in live:
+                    key = self._cache_key(prompt.prompt_identifier, prompt.prompt_version, prompt.name)
+                    executor.submit(self._refresh, key, prompt.prompt_identifier, prompt.prompt_version, prompt.name)
+        return {
+            prompt.name: entry.source
+            for prompt in prompts
+            if (entry := self._prompt_cache.get(self._cache_key(prompt.prompt_identifier, prompt.prompt_version, prompt.name)))
+        }
+    
+    def export_entries(self) -> Dict[str, Dict[str, Any]]:
+        """Prompts that came from AWS (now or in an earlier snapshot), for the warm-start snapshot"""
+        with self._cache_lock:
+            return {
+                key: {
+                    "text": entry.config.text,
+                    "temperature": entry.config.temperature,
+                    "top_p": entry.config.top_p,
+                    "max_tokens": entry.config.max_tokens
+                }
+                for key, entry in self._prompt_cache.items()
+                if entry.source in ("aws", "snapshot")
+            }
+    
+    def restore_entries(self, entries: Dict[str, Dict[str, Any]], ttl: Optional[float] = None) -> int:
+        """
+        Seed the cache from a warm-start snapshot or a replayed cassette
+        
+        Restored prompts are served immediately; revalidate() (or the first use
+        after `ttl`, PROMPT_REFRESH_RETRY by default) fetches the current version.
+        
+        Args:
+            entries: export_entries() of an earlier process
+            ttl: Seconds before the first refresh; float("inf") pins the prompts
+        
+        Returns:
+            Number of prompts restored
+        """
+        restored = 0
+        with self._cache_lock:
+            for key, values in entries.items():
+                if key not in self._prompt_cache:
+                    self._prompt_cache[key] = _CacheEntry(
+                        PromptConfig(**values), time.time() + (self.retry_interval if ttl is None else ttl), "snapshot"
+                    )
+                    restored += 1
+        return restored
+    
+    def _fetch_prompt_config(self, prompt_identifier: str, prompt_version: Optional[str]) -> PromptConfig:
+        """
+        Fetch and parse one prompt from AWS Bedrock Prompt Management
+        
         Raises:
             Exception: If prompt cannot be retrieved
         """
         # Default to DRAFT if no version specified
         version = prompt_version if prompt_version else 'DRAFT'
-        
-        # Create cache key with version
         cache_key = f"{prompt_identifier}:{version}"
         
-        # If version is specified (not DRAFT), check cache
-        if prompt_version and cache_key in self._prompt_cache:
-            print(f"📦 Using cached prompt: {cache_key}")
-            return self._prompt_cache[cache_key]
-        
         # Fetch from AWS
         print(f"🔄 Fetching prompt from AWS: {cache_key}")
         
@@ -146,13 +467,23 @@ class PromptManager:
             max_tokens=max_tokens
         )
         
-        # Cache only if version is specified (not DRAFT)
-        # DRAFT prompts are not cached so changes are reflected immediately
-        if prompt_version:
-            self._prompt_cache[cache_key] = prompt_config
-            print(f"💾 Cached prompt version: {cache_key}")
-        
         return prompt_config
     
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for monitoring"""
+        sources: Dict[str, int] = {}
+        for entry in list(self._prompt_cache.values()):
+            sources[entry.source] = sources.get(entry.source, 0) + 1
+        return {
+            "cached": len(self._prompt_cache),
+            "sources": sources,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "fallbacks": self.fallbacks
+        }
+    
 # Global prompt manager instance
 prompt_manager = PromptManager()
@@ -0,0 +1,103 @@
+"""
+Startup warm-up tracking and readiness reporting
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class Readiness:
+    """
+    Record warm-up stages and whether the service is ready.
+
+    Stages run on worker threads so independent ones (prompt fetches, the MCP
+    session) overlap. A failed required stage leaves the service not ready;
+    requests still work and retry the failed dependency lazily. A failed
+    optional stage only marks the service degraded.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.ready_at: Optional[float] = None
+        self.stages: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self._required_failed = False
+        self._ready = threading.Event()
+
+    def begin(self):
+        """Start the clock for a new warm-up"""
+        self.started_at = time.perf_counter()
+        self.ready_at = None
+        self.stages.clear()
+        self.errors.clear()
+        self._required_failed = False
+        self._ready.clear()
+
+    async def run(self, name: str, fn: Callable[..., Any], *args, optional: bool = False) -> Any:
+        """
+        Run one warm-up stage (blocking callables go to a worker thread)
+
+        Args:
+            name: Stage name reported by stats()
+            fn: Blocking callable or coroutine function
+            optional: Whether the service can be ready without this stage
+
+        Returns:
+            The callable's result, or None if it failed
+        """
+        start = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(fn):
+                return await fn(*args)
+            return await asyncio.to_thread(fn, *args)
+        except Exception as e:
+            self.errors[name] = str(e)
+            if not optional:
+                self._required_failed = True
+            print(f"⚠️  Warm-up stage '{name}' failed: {e}")
+            return None
+        finally:
+            self.stages[name] = round(time.perf_counter() - start, 3)
+
+    def warn(self, name: str, message: str):
+        """Record a problem that leaves the service usable but degraded"""
+        self.errors[name] = message
+
+    def finish(self):
+        """Mark warm-up as complete"""
+        self.ready_at = time.perf_counter()
+        if not self._required_failed:
+            self._ready.set()
+        print(f"✅ Warm-up finished in {self.ready_at - self.started_at:.2f}s ({self.status})")
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    @property
+    def status(self) -> str:
+        if self.ready_at is None:
+            return "warming"
+        if self._required_failed:
+            return "failed"
+        return "degraded" if self.errors else "ready"
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until ready (for scripts and benchmarks)"""
+        return self._ready.wait(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Readiness summary for /ping"""
+        elapsed = (self.ready_at or time.perf_counter()) - self.started_at
+        return {
+            "ready": self.ready,
+            "status": self.status,
+            "warmup_seconds": round(elapsed, 3),
+            "stages": dict(self.stages),
+            "errors": dict(self.errors)
+        }
+
+
+# Global readiness instance
+readiness = Readiness()
@@ -0,0 +1,210 @@
+"""
+Per-session store of the last tarot reading, for follow-up questions
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import config
+from app.tools.tarot_deck import Reading
+
+SessionKey = Tuple[str, str]
+
+# Asking for cards to be drawn again is never a follow-up
+_NEW_DRAW = re.compile(
+    r"\b(draw|pull|deal|shuffle|new|another|fresh|redo|again)\b[^.?!]{0,25}\b(cards?|reading|spread|one)\b"
+    r"|\b(celtic cross|three[- ]card|single card|relationship spread)\b",
+    re.IGNORECASE
+)
+_ORDINALS = {
+    "first": 0, "1st": 0, "second": 1, "2nd": 1, "third": 2, "3rd": 2, "fourth": 3, "4th": 3,
+    "fifth": 4, "5th": 4, "sixth": 5, "6th": 5, "seventh": 6, "7th": 6, "eighth": 7, "8th": 7,
+    "ninth": 8, "9th": 8, "tenth": 9, "10th": 9, "last": -1, "final": -1
+}
+_ORDINAL_CARD = re.compile(r"\b(" + "|".join(_ORDINALS) + r")\s+(card|one|position)\b", re.IGNORECASE)
+_CARD_NUMBER = re.compile(r"\bcard\s*(?:#|number\s*|no\.?\s*)?(\d{1,2})\b", re.IGNORECASE)
+# Questions naming the cards or the reading as a whole
+_CARD_REFERENCE = re.compile(
+    r"\b(th(is|at|ese|ose) cards?|the cards|my (reading|spread|cards)|the (reading|spread)|reversed|upright)\b",
+    re.IGNORECASE
+)
+# Wording that follows up on whatever was said last, whichever agent said it
+_GENERIC_REFERENCE = re.compile(
+    r"\b((it|they|that|this) means?|tell me more|elaborate|go deeper|explain (it|that|this|more))\b",
+    re.IGNORECASE
+)
+
+
+@dataclass(frozen=True)
+class SessionReading:
+    """A drawn reading and the question it was drawn for"""
+    reading: Reading
+    question: str
+    drawn_at: float
+
+    @property
+    def labels(self) -> List[str]:
+        return self.reading.labels
+
+    @property
+    def positions(self) -> Tuple[Optional[str], ...]:
+        return self.reading.positions
+
+
+def match_follow_up(prompt: str, reading: SessionReading, tarot_leaning: bool = False) -> Optional[List[int]]:
+    """
+    Whether a prompt asks about an earlier reading, and which of its cards
+
+    Ordinals ("the third card"), card numbers, card names with card context
+    ("the Tower", "Strength card", "Wheel of Fortune"), "the future card" and
+    wording about the cards or the reading always count. A bare one-word
+    name ("strength"), a bare position ("the future") and generic wording
+    ("tell me more", "what does it mean") fit numerology questions as well,
+    so on their own they count only when the prompt leans towards tarot.
+
+    Args:
+        prompt: The user prompt
+        reading: The session's last reading
+        tarot_leaning: The intent classifier's best guess for the prompt is tarot
+
+    Returns:
+        Indices of the cards the prompt refers to, [] for the reading as a
+        whole, or None when the prompt is not a follow-up
+    """
+    if _NEW_DRAW.search(prompt):
+        return None
+    text = " ".join(prompt.lower().split())
+    count = len(reading.reading.ids)
+    focus = []
+    # Positions named without "card" or "position"
+    loose = []
+
+    for match in _ORDINAL_CARD.finditer(text):
+        index = _ORDINALS[match.group(1).lower()]
+        if index < count:
+            focus.append(index % count)
+    for match in _CARD_NUMBER.finditer(text):
+        number = int(match.group(1))
+        if 1 <= number <= count:
+            focus.append(number - 1)
+    for i, drawn in enumerate(reading.reading.cards):
+        name = drawn.card.name.lower()
+        bare = name[4:] if name.startswith("the ") else name
+        short = re.escape(bare)
+        position = re.escape(drawn.position.lower()) if drawn.position else None
+        if re.search(rf"\b(the {short}|{short} card)(?![\w-])", text) or (
+            " " in bare and re.search(rf"\b{short}\b", text)
+        ) or (
+            position and re.search(rf"\b{position} (card|position)\b", text)
+        ):
+            focus.append(i)
+        elif re.search(rf"\b{short}\b", text) or (position and re.search(rf"\bthe {position}\b", text)):
+            loose.append(i)
+
+    if focus:
+        return sorted(set(focus + loose))
+    if _CARD_REFERENCE.search(text):
+        return sorted(set(loose))
+    if not tarot_leaning:
+        return None
+    if loose:
+        return sorted(set(loose))
+    return [] if _GENERIC_REFERENCE.search(text) else None
+
+
+class ReadingStore:
+    """
+    Bounded LRU/TTL map of (actor_id, session_id) to the last reading drawn
+
+    draw_tarot_cards records every reading it draws, so routes can return the
+    structured card list and answer follow-up questions about the reading
+    with one interpreter call instead of the router and the tarot swarm.
+    Like the session cache it is per process; a session served by another
+    process falls back to normal routing.
+    """
+
+    def __init__(self, max_sessions: int = None, ttl: float = None):
+        self.max_sessions = max_sessions or config.READING_STORE_MAX_SESSIONS
+        self.ttl = ttl or config.READING_STORE_TTL
+        self._entries: "OrderedDict[SessionKey, SessionReading]" = OrderedDict()
+        # Tools run on worker threads
+        self._lock = threading.Lock()
+        self.stored = 0
+        self.follow_ups = 0
+
+    def put(self, actor_id: str, session_id: str, reading: Reading, question: str = "") -> SessionReading:
+        """Record the reading just drawn for a session"""
+        entry = SessionReading(reading, question, time.time())
+        key = (actor_id, session_id)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            self.stored += 1
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get(self, actor_id: str, session_id: str, since: float = None) -> Optional[SessionReading]:
+        """
+        The session's last reading, if it has not expired
+
+        Args:
+            since: Only return a reading drawn at or after this time.time()
+        """
+        key = (actor_id, session_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.drawn_at + self.ttl <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        if since is not None and entry.drawn_at < since:
+            return None
+        return entry
+
+    def invalidate(self, actor_id: str, session_id: str):
+        with self._lock:
+            self._entries.pop((actor_id, session_id), None)
+
+    def follow_up(
+        self, actor_id: str, session_id: str, prompt: str, tarot_leaning: bool = False
+    ) -> Optional[Tuple[SessionReading, List[int]]]:
+        """
+        The reading a prompt follows up on, with the indices of the cards it asks about
+
+        Args:
+            tarot_leaning: The intent classifier's best guess for the prompt is
+                tarot; see match_follow_up
+
+        Returns:
+            (reading, focus) or None when there is no reading or the prompt
+            is not about it
+        """
+        if not config.READING_FOLLOW_UP:
+            return None
+        entry = self.get(actor_id, session_id)
+        if entry is None:
+            return None
+        focus = match_follow_up(prompt, entry, tarot_leaning)
+        return None if focus is None else (entry, focus)
+
+    def record_follow_up(self):
+        """Count a follow-up answered from the stored reading"""
+        with self._lock:
+            self.follow_ups += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": len(self._entries),
+                "stored": self.stored,
+                "follow_ups": self.follow_ups
+            }
+
+
+# Global reading store instance
+reading_store = ReadingStore()
@@ -0,0 +1,182 @@
+"""
+In-process cache of conversation history per session
+"""
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Any
+from strands.types.content import Message, ContentBlock, Messages
+from app.core.config import config
+
+SessionKey = Tuple[str, str]
+
+# Rough per-message bookkeeping overhead used for the memory cap
+_MESSAGE_OVERHEAD_BYTES = 64
+
+
+def events_to_messages(events: List[Dict[str, Any]]) -> Messages:
+    """
+    Convert short-term memory events to Strands Messages
+
+    Args:
+        events: Events as returned by ShortTermMemory.list_events
+
+    Returns:
+        Messages in event order, one per conversational payload item
+    """
+    messages = []
+    for event in events:
+        payload = event.get("payload", [])
+        for item in payload:
+            if "conversational" in item:
+                conv = item["conversational"]
+                role = conv.get("role", "").lower()
+                text = conv.get("content", {}).get("text", "")
+                if text:
+                    messages.append(
+                        Message(
+                            role="user" if role == "user" else "assistant",
+                            content=[ContentBlock(text=text)]
+                        )
+                    )
+    return messages
+
+
+def _copy_messages(messages: Messages) -> Messages:
+    # Agents append to (and may edit) the list they are given
+    return [Message(role=m["role"], content=list(m["content"])) for m in messages]
+
+
+def _size_of(messages: Messages) -> int:
+    size = 0
+    for message in messages:
+        size += _MESSAGE_OVERHEAD_BYTES
+        for block in message["content"]:
+            size += len(block.get("text", ""))
+    return size
+
+
+class SessionTracker:
+    """
+    Bounded LRU/TTL cache of already-converted history per (actor_id, session_id).
+
+    The process that answered the previous turn already knows the history, so
+    the cache is filled on a miss from `list_events` and then kept current by
+    `append_turn` when each turn completes. Entries expire a TTL after they
+    were loaded, however active the session, so turns handled by another
+    process are picked up eventually.
+
+    History is capped at the last `max_events` memory events, the window
+    `list_events` returns on a miss. Events are counted rather than
+    messages because a write-behind flush coalesces several turns into one
+    event; each appended turn counts as one event, as it is written.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = None,
+        max_bytes: int = None,
+        ttl: float = None,
+        max_events: int = None
+    ):
+        self.max_sessions = max_sessions or config.SESSION_CACHE_MAX_SESSIONS
+        self.max_bytes = max_bytes or config.SESSION_CACHE_MAX_BYTES
+        self.ttl = ttl or config.SESSION_CACHE_TTL
+        self.max_events = max_events or config.SESSION_HISTORY_EVENTS
+        # key -> (expires_at, size_bytes, messages, messages per event)
+        self._entries: "OrderedDict[SessionKey, Tuple[float, int, Messages, List[int]]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, actor_id: str, session_id: str) -> Optional[Messages]:
+        """Get a copy of the cached history, or None on a miss"""
+        key = (actor_id, session_id)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return _copy_messages(entry[2])
+
+    def put(self, actor_id: str, session_id: str, events: List[Dict[str, Any]]) -> Messages:
+        """
+        Cache the history for a session after loading it from memory
+
+        Args:
+            events: Events as returned by ShortTermMemory.list_events, oldest first
+
+        Returns:
+            A copy of the history as cached: the messages of the last
+            max_events events
+        """
+        groups = [events_to_messages([event]) for event in events[-self.max_events:]]
+        messages = [message for group in groups for message in group]
+        self._store((actor_id, session_id), messages, [len(group) for group in groups], time.time() + self.ttl)
+        return _copy_messages(messages)
+
+    def _store(self, key: SessionKey, messages: Messages, event_sizes: List[int], expires_at: float):
+        if key in self._entries:
+            self._remove(key)
+        # Only the last max_events events are kept, as list_events would return them
+        dropped = max(len(event_sizes) - self.max_events, 0)
+        messages = _copy_messages(messages[sum(event_sizes[:dropped]):])
+        event_sizes = event_sizes[dropped:]
+        size = _size_of(messages)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (expires_at, size, messages, event_sizes)
+        self._bytes += size
+        self._evict()
+
+    def append_turn(self, actor_id: str, session_id: str, user_text: str, assistant_text: str):
+        """
+        Write-through a completed turn; sessions not in the cache are left alone
+
+        The entry keeps its expiry: the TTL bounds how stale the history can
+        be, which appending this process's own turns does not change.
+        """
+        key = (actor_id, session_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        messages = entry[2] + [
+            Message(role="user", content=[ContentBlock(text=user_text)]),
+            Message(role="assistant", content=[ContentBlock(text=assistant_text)])
+        ]
+        self._store(key, messages, entry[3] + [2], entry[0])
+
+    def invalidate(self, actor_id: str, session_id: str):
+        """Drop a session's cached history"""
+        key = (actor_id, session_id)
+        if key in self._entries:
+            self._remove(key)
+
+    def _remove(self, key: SessionKey):
+        _, size, _, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_sessions or self._bytes > self.max_bytes):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate and size metrics for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "sessions": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Global session tracker instance
+session_tracker = SessionTracker()
@@ -0,0 +1,121 @@
+"""
+Speculative start of a session's likely specialist while the LLM router runs
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import config
+from app.core.history_window import estimate_tokens, messages_tokens
+
+SessionKey = Tuple[str, str]
+
+# Tarot is never speculated: a reading advances the session's seed and is
+# stored for follow-ups, which a cancelled run could not take back
+SPECULATIVE_INTENTS = ("welcome", "numerology")
+
+
+class SpeculativeRouting:
+    """
+    Predict where the router will send a turn, and count how that went.
+
+    The prediction is the agent that answered the session's previous turn,
+    or the local classifier's best guess for a session not seen yet. Routes
+    start the predicted specialist next to the router and keep its run when
+    the router agrees (`record_hit`, counting the router time hidden) or
+    cancel it (`record_miss`, counting the tokens spent on it). Like the
+    session cache, the last agents are per process and bounded LRU.
+    """
+
+    def __init__(self, enabled: bool = None, max_sessions: int = None):
+        self.enabled = config.SPECULATIVE_ROUTING if enabled is None else enabled
+        self.max_sessions = max_sessions or config.SPECULATION_MAX_SESSIONS
+        self._last_agent: "OrderedDict[SessionKey, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        # intent -> [hits, misses]
+        self._outcomes: Dict[str, List[int]] = {}
+        self.saved_seconds = 0.0
+        self.wasted_calls = 0
+        self.wasted_input_tokens = 0
+        self.wasted_output_tokens = 0
+
+    def remember(self, actor_id: str, session_id: str, agent: str):
+        """Record the agent that answered a session's turn"""
+        if not self.enabled or not agent:
+            return
+        key = (actor_id, session_id)
+        with self._lock:
+            self._last_agent.pop(key, None)
+            self._last_agent[key] = agent
+            while len(self._last_agent) > self.max_sessions:
+                self._last_agent.popitem(last=False)
+
+    def predict(self, actor_id: str, session_id: str, classified: Optional[str]) -> Optional[str]:
+        """
+        Specialist to start alongside the router, or None to wait for it
+
+        Args:
+            classified: The local classifier's intent for the prompt (not confident
+                enough for the fast path), used when the session has no last agent
+        """
+        if not self.enabled:
+            return None
+        key = (actor_id, session_id)
+        with self._lock:
+            intent = self._last_agent.get(key)
+            if intent is not None:
+                self._last_agent.move_to_end(key)
+        if intent is None:
+            intent = classified
+        return intent if intent in SPECULATIVE_INTENTS else None
+
+    def record_hit(self, intent: str, router_seconds: float):
+        """The router agreed; its latency was hidden behind the specialist's run"""
+        with self._lock:
+            self._outcomes.setdefault(intent, [0, 0])[0] += 1
+            self.saved_seconds += router_seconds
+
+    def record_miss(self, intent: str, agent: Any):
+        """
+        The router chose another route; count what the cancelled run spent
+
+        Usage of completed model calls is exact. A call cut off mid-stream
+        (the agent's last message is still the user's or a tool result) is
+        counted with its input estimated from the system prompt and messages,
+        since Bedrock bills the input it processed, and no output.
+
+        Args:
+            agent: The speculated Agent, after its run was cancelled or finished
+        """
+        metrics = agent.event_loop_metrics
+        usage = metrics.accumulated_usage
+        input_tokens = usage.get("inputTokens", 0)
+        if metrics.cycle_count and agent.messages and agent.messages[-1]["role"] == "user":
+            input_tokens += estimate_tokens(agent.system_prompt or "") + messages_tokens(agent.messages)
+        with self._lock:
+            self._outcomes.setdefault(intent, [0, 0])[1] += 1
+            # One model call per event loop cycle started
+            self.wasted_calls += metrics.cycle_count
+            self.wasted_input_tokens += input_tokens
+            self.wasted_output_tokens += usage.get("outputTokens", 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate, router time hidden and tokens wasted on cancelled runs"""
+        with self._lock:
+            hits = sum(h for h, _ in self._outcomes.values())
+            speculated = hits + sum(m for _, m in self._outcomes.values())
+            return {
+                "enabled": self.enabled,
+                "sessions": len(self._last_agent),
+                "speculated": speculated,
+                "hits": hits,
+                "hit_rate": round(hits / speculated, 3) if speculated else None,
+                "by_intent": {intent: {"hits": h, "misses": m} for intent, (h, m) in sorted(self._outcomes.items())},
+                "saved_seconds": round(self.saved_seconds, 3),
+                "wasted_calls": self.wasted_calls,
+                "wasted_input_tokens": self.wasted_input_tokens,
+                "wasted_output_tokens": self.wasted_output_tokens
+            }
+
+
+# Global speculative routing instance
+speculation = SpeculativeRouting()
@@ -0,0 +1,208 @@
+"""
+Memoizing cache for deterministic tool calls
+"""
+import asyncio
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from strands.types._events import ToolResultEvent
+from strands.types.tools import AgentTool, ToolResult, ToolSpec, ToolUse
+from app.core.config import config
+
+CacheKey = Tuple[str, str]
+
+
+def _canonical(value: Any) -> Any:
+    """Argument value with insignificant differences removed"""
+    if isinstance(value, dict):
+        return {k: _canonical(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+def cache_key(tool_name: str, arguments: Optional[Dict[str, Any]]) -> CacheKey:
+    """
+    Key for a tool call: the tool name plus canonical JSON of its arguments
+
+    Keys are sorted, None values dropped and whitespace in strings collapsed,
+    so {"b": " 1990-01-01", "a": "Ada  Lovelace"} and {"a": "Ada Lovelace",
+    "b": "1990-01-01"} share an entry. Case is kept; tools may depend on it.
+    """
+    return tool_name, json.dumps(_canonical(arguments or {}), sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _with_tool_use_id(result: ToolResult, tool_use_id: str) -> ToolResult:
+    result = copy.deepcopy(result)
+    result["toolUseId"] = tool_use_id
+    return result
+
+
+class ToolResultCache:
+    """
+    Bounded LRU/TTL cache of tool results, for tools that opt in.
+
+    Only tools named in `tools` are cached: their results must depend on the
+    arguments alone. Successful results are kept for `ttl` seconds; errors are
+    never cached. Concurrent calls with the same key share one execution.
+    Time saved counts each hit at the tool's average miss latency and each
+    shared call at the latency of the call it joined.
+    """
+
+    def __init__(self, tools: Iterable[str] = None, max_entries: int = None, ttl: float = None):
+        self.tools = set(tools if tools is not None else config.MCP_CACHE_TOOLS)
+        self.max_entries = max_entries or config.MCP_CACHE_MAX_ENTRIES
+        self.ttl = ttl or config.MCP_CACHE_TTL
+        # key -> (expires_at, result)
+        self._entries: "OrderedDict[CacheKey, Tuple[float, ToolResult]]" = OrderedDict()
+        # key -> (future, callers waiting on it)
+        self._inflight: Dict[CacheKey, Tuple[Future, int]] = {}
+        self._lock = threading.Lock()
+        # tool -> (calls executed, total seconds)
+        self._executed: Dict[str, Tuple[int, float]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.collapsed = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+
+    def cacheable(self, tool_name: str) -> bool:
+        return tool_name in self.tools
+
+    def wrap(self, tools: List[Any]) -> List[Any]:
+        """Wrap the opted-in tools of a tool list; others are returned as is"""
+        return [
+            CachedTool(tool, self) if isinstance(tool, AgentTool) and self.cacheable(tool.tool_name) else tool
+            for tool in tools
+        ]
+
+    def _mean_latency(self, tool_name: str) -> float:
+        count, total = self._executed.get(tool_name, (0, 0.0))
+        return total / count if count else 0.0
+
+    def lookup(self, key: CacheKey) -> Tuple[Optional[ToolResult], Optional[Future], bool]:
+        """
+        Find a result, a running call to wait for, or claim the call
+
+        Returns:
+            (result, None, False) on a hit, (None, future, False) if the same
+            call is already running, (None, future, True) if the caller must
+            run it and then call `complete(key, future, ...)`
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self.saved_seconds += self._mean_latency(key[0])
+                    return entry[1], None, False
+                del self._entries[key]
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                future, waiters = inflight
+                self._inflight[key] = (future, waiters + 1)
+                self.collapsed += 1
+                return None, future, False
+            self.misses += 1
+            future = Future()
+            self._inflight[key] = (future, 0)
+            return None, future, True
+
+    def complete(self, key: CacheKey, future: Future, result: Optional[ToolResult], elapsed: float):
+        """Store the result of a claimed call and release callers waiting on it"""
+        with self._lock:
+            _, waiters = self._inflight.pop(key, (None, 0))
+            if result is not None:
+                # Each waiter would otherwise have made the same call
+                self.saved_seconds += waiters * elapsed
+            count, total = self._executed.get(key[0], (0, 0.0))
+            self._executed[key[0]] = (count + 1, total + elapsed)
+            if result is not None and result.get("status") == "success":
+                self._entries[key] = (time.time() + self.ttl, copy.deepcopy(result))
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        future.set_result(result)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio and latency saved, for monitoring"""
+        with self._lock:
+            served = self.hits + self.collapsed
+            lookups = served + self.misses
+            return {
+                "tools": sorted(self.tools),
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "collapsed": self.collapsed,
+                "evictions": self.evictions,
+                "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3),
+                "mean_miss_latency_ms": {
+                    tool: round(total / count * 1000, 1) for tool, (count, total) in self._executed.items() if count
+                }
+            }
+
+
+class CachedTool(AgentTool):
+    """Tool wrapper that answers repeated calls from a ToolResultCache"""
+
+    def __init__(self, tool: AgentTool, cache: ToolResultCache):
+        super().__init__()
+        self.tool = tool
+        self.cache = cache
+
+    @property
+    def tool_name(self) -> str:
+        return self.tool.tool_name
+
+    @property
+    def tool_spec(self) -> ToolSpec:
+        return self.tool.tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return self.tool.tool_type
+
+    async def stream(self, tool_use: ToolUse, invocation_state: Dict[str, Any], **kwargs: Any):
+        tool_use_id = tool_use["toolUseId"]
+        key = cache_key(self.tool_name, tool_use.get("input"))
+        result, future, claimed = self.cache.lookup(key)
+        if result is not None:
+            yield ToolResultEvent(_with_tool_use_id(result, tool_use_id))
+            return
+        if not claimed:
+            result = await asyncio.wrap_future(future)
+            if result is not None:
+                yield ToolResultEvent(_with_tool_use_id(result, tool_use_id))
+                return
+            # The shared call failed outright; run our own
+            async for event in self.tool.stream(tool_use, invocation_state, **kwargs):
+                yield event
+            return
+
+        start = time.perf_counter()
+        result = None
+        try:
+            async for event in self.tool.stream(tool_use, invocation_state, **kwargs):
+                if isinstance(event, ToolResultEvent):
+                    result = event.tool_result
+                yield event
+        finally:
+            self.cache.complete(key, future, result, time.perf_counter() - start)
+
+
+# Global cache for MCP tool results
+mcp_tool_cache = ToolResultCache()
@@ -0,0 +1,85 @@
+"""
+On-disk warm-start snapshot of resolved prompts and MCP tool specs
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from app.core.config import config
+
+# Bump when the snapshot layout changes; older files are ignored
+SNAPSHOT_VERSION = 1
+
+
+def _fingerprint() -> str:
+    """Hash of the settings the snapshot contents depend on"""
+    parts = [config.MCP_SERVER_URI or ""]
+    for agent in ("ROUTER", "WELCOME", "NUMEROLOGY", "CARD_INTERPRETER", "SPREAD_READER", "LIFE_ADVISOR"):
+        parts.append(getattr(config, f"{agent}_PROMPT_ID") or "")
+        parts.append(getattr(config, f"{agent}_PROMPT_VERSION") or "")
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:16]
+
+
+class WarmSnapshot:
+    """
+    Versioned JSON file written after a successful warm-up and read at boot.
+
+    A snapshot only applies to the configuration that produced it: files
+    with another SNAPSHOT_VERSION or a different fingerprint (prompt IDs and
+    versions, MCP server URI) are ignored, as are files older than max_age.
+    """
+
+    def __init__(self, path: str = None, max_age: float = None):
+        self.path = Path(path or config.WARM_SNAPSHOT_PATH)
+        self.max_age = max_age if max_age is not None else config.WARM_SNAPSHOT_MAX_AGE
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the snapshot if it matches this build and configuration
+
+        Returns:
+            Dict with "prompts" and "mcp_tools", or None
+        """
+        if not self.path.is_file():
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable warm snapshot {self.path}: {e}")
+            return None
+        if data.get("version") != SNAPSHOT_VERSION or data.get("fingerprint") != _fingerprint():
+            print(f"♻️  Warm snapshot {self.path} is for another configuration; ignoring it")
+            return None
+        if self.max_age and time.time() - data.get("created_at", 0) > self.max_age:
+            print(f"♻️  Warm snapshot {self.path} is older than {self.max_age:.0f}s; ignoring it")
+            return None
+        return data
+
+    def save(self, prompts: Dict[str, Dict[str, Any]], mcp_tools: List[Dict[str, Any]]):
+        """
+        Atomically write the snapshot
+
+        Args:
+            prompts: PromptManager.export_entries()
+            mcp_tools: MCP tool specs (mcp.types.Tool as JSON)
+        """
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "fingerprint": _fingerprint(),
+            "created_at": time.time(),
+            "prompts": prompts,
+            "mcp_tools": mcp_tools
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        print(f"💾 Saved warm snapshot: {len(prompts)} prompts, {len(mcp_tools)} MCP tools -> {self.path}")
+
+
+# Global warm snapshot instance
+warm_snapshot = WarmSnapshot()
@@ -0,0 +1,346 @@
+"""
+Write-behind persistence of conversation turns to short-term memory
+"""
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple, Optional
+from app.core.config import config
+from app.core.memory import ShortTermMemory, short_term_memory
+
+SessionKey = Tuple[str, str]
+
+
+class WriteBehindQueue:
+    """
+    Acknowledge conversation writes immediately and persist them in the background.
+
+    Turns are appended to a local spill file before they are acknowledged, so a
+    crash cannot lose them; pending turns for the same (actor_id, session_id)
+    are coalesced into one `create_event` call. The spill file is truncated
+    whenever everything has been flushed and replayed on the next start. Spill
+    file I/O runs on one worker thread, in order, off the event loop. When
+    `max_pending` messages are queued, enqueue waits for the worker to make
+    room, so a session's turns are still written in order.
+
+    Turns still failing after `retries` attempts are parked: they stay in the
+    spill file and in `pending_events`, later turns of the same session queue
+    behind them so the order is kept, and they are retried with exponential
+    backoff. Past `max_parked` messages the oldest sessions' parked turns are
+    dropped.
+
+    The spill file assumes one writer process (the container runs a single
+    uvicorn worker); give each process its own MEMORY_SPILL_PATH otherwise.
+    """
+
+    def __init__(
+        self,
+        memory: ShortTermMemory,
+        spill_path: str = None,
+        max_pending: int = None,
+        retries: int = None,
+        flush_interval: float = None,
+        max_parked: int = None
+    ):
+        self.memory = memory
+        self.spill_path = Path(spill_path or config.MEMORY_SPILL_PATH)
+        self.max_pending = max_pending or config.MEMORY_WRITE_QUEUE_SIZE
+        self.retries = retries if retries is not None else config.MEMORY_WRITE_RETRIES
+        self.flush_interval = flush_interval if flush_interval is not None else config.MEMORY_WRITE_FLUSH_INTERVAL
+        self._pending: "OrderedDict[SessionKey, List[Tuple[str, str]]]" = OrderedDict()
+        self._inflight: Dict[SessionKey, List[Tuple[str, str]]] = {}
+        self.max_parked = max_parked or config.MEMORY_PARKED_MAX_MESSAGES
+        self.retry_interval = config.MEMORY_PARKED_RETRY_INTERVAL
+        self.retry_interval_max = config.MEMORY_PARKED_RETRY_MAX
+        # Failed writes waiting for their next retry, oldest session first
+        self._parked: "OrderedDict[SessionKey, List[Tuple[str, str]]]" = OrderedDict()
+        self._parked_count = 0
+        # time.monotonic() of the next retry, and retry rounds failed in a row
+        self._retry_at: Optional[float] = None
+        self._retry_round = 0
+        self._pending_count = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._spill = None
+        self._spill_executor: Optional[ThreadPoolExecutor] = None
+        self.enqueued = 0
+        self.flushed_events = 0
+        self.coalesced = 0
+        self.write_failures = 0
+        self.dropped_messages = 0
+        self.backpressure_waits = 0
+
+    async def start(self):
+        """Replay any spilled turns from a previous run and start the flush worker"""
+        if self._worker is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._space = asyncio.Event()
+        self._spill_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-spill")
+
+        recovered = self._load_spill()
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        self._spill = open(self.spill_path, "a", encoding="utf-8")
+        for record in recovered:
+            self._add_pending(record["actor_id"], record["session_id"], record["messages"])
+        if recovered:
+            print(f"♻️  Replaying {len(recovered)} unflushed memory writes from {self.spill_path}")
+            self._wakeup.set()
+
+        self._worker = asyncio.create_task(self._run())
+
+    def _load_spill(self) -> List[dict]:
+        if not self.spill_path.exists():
+            return []
+        records = []
+        with open(self.spill_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    record["messages"] = [tuple(m) for m in record["messages"]]
+                    records.append(record)
+                except (ValueError, KeyError, TypeError):
+                    # A torn last line from a crash mid-write
+                    continue
+        return records
+
+    async def _spill_io(self, fn, *args):
+        """Run a spill file operation on the spill thread, after the ones queued before it"""
+        return await asyncio.get_running_loop().run_in_executor(self._spill_executor, fn, *args)
+
+    def _append_spill(self, record: dict):
+        # flush() hands the line to the OS, which survives a process crash
+        self._spill.write(json.dumps(record) + "\n")
+        self._spill.flush()
+
+    def _rewrite_spill(self, records: List[dict]):
+        """Replace the spill file contents (called when nothing is pending)"""
+        tmp_path = self.spill_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        self._spill.close()
+        try:
+            os.replace(tmp_path, self.spill_path)
+        finally:
+            # enqueue() must always find an open spill file
+            self._spill = open(self.spill_path, "a", encoding="utf-8")
+
+    def _parked_records(self) -> List[dict]:
+        now = time.time()
+        return [
+            {"actor_id": actor_id, "session_id": session_id, "messages": [list(m) for m in messages], "ts": now}
+            for (actor_id, session_id), messages in self._parked.items()
+        ]
+
+    def _add_pending(self, actor_id: str, session_id: str, messages: List[Tuple[str, str]]):
+        key = (actor_id, session_id)
+        if key in self._pending:
+            self.coalesced += 1
+            self._pending[key].extend(messages)
+        else:
+            self._pending[key] = list(messages)
+        self._pending_count += len(messages)
+        self._idle.clear()
+
+    async def enqueue(
+        self,
+        messages: List[Tuple[str, str]],
+        actor_id: str = "default_user",
+        session_id: str = "default_session"
+    ):
+        """
+        Queue a conversation write and return without waiting for AgentCore
+
+        Args:
+            messages: List of (message, role) tuples
+            actor_id: User identifier
+            session_id: Session identifier
+        """
+        if self._worker is None:
+            await self.start()
+
+        if self._pending_count and self._pending_count + len(messages) > self.max_pending:
+            # Queue is full: wait for the worker rather than write past the session's queued turns
+            self.backpressure_waits += 1
+            while self._pending_count and self._pending_count + len(messages) > self.max_pending:
+                self._space.clear()
+                await self._space.wait()
+
+        record = {
+            "actor_id": actor_id,
+            "session_id": session_id,
+            "messages": [list(m) for m in messages],
+            "ts": time.time()
+        }
+        # Queued first, so the spill file is not rewritten without the turn until it is flushed
+        self._add_pending(actor_id, session_id, messages)
+        self.enqueued += 1
+        self._wakeup.set()
+        await self._spill_io(self._append_spill, record)
+
+    def pending_events(self, actor_id: str, session_id: str) -> List[dict]:
+        """
+        Unflushed turns for a session, shaped like `list_events` results
+
+        Lets readers see their own writes before the background flush lands.
+        """
+        key = (actor_id, session_id)
+        messages = self._parked.get(key, []) + self._inflight.get(key, []) + self._pending.get(key, [])
+        if not messages:
+            return []
+        return [{
+            "eventId": None,
+            "payload": [
+                {"conversational": {"content": {"text": text}, "role": role}}
+                for text, role in messages
+            ]
+        }]
+
+    async def _run(self):
+        while True:
+            await self._wait_for_work()
+            self._wakeup.clear()
+            # Give concurrent turns of the same session a moment to coalesce
+            if self.flush_interval > 0:
+                await asyncio.sleep(self.flush_interval)
+            try:
+                if self._retry_at is not None and time.monotonic() >= self._retry_at:
+                    self._requeue_parked()
+                await self._flush_pending()
+            except Exception as e:
+                # Keep the worker alive; whatever is still queued goes on the next pass
+                print(f"❌ Memory write worker error: {e}")
+                await asyncio.sleep(self.retry_interval)
+                if self._pending:
+                    self._wakeup.set()
+
+    async def _wait_for_work(self):
+        """Wait for new turns, or until parked turns are due for a retry"""
+        if self._retry_at is None:
+            await self._wakeup.wait()
+            return
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, self._retry_at - time.monotonic()))
+        except asyncio.TimeoutError:
+            pass
+
+    async def _flush_pending(self):
+        while self._pending:
+            key, messages = self._pending.popitem(last=False)
+            self._pending_count -= len(messages)
+            self._space.set()
+            if key in self._parked:
+                # Later turns wait behind the session's parked ones to keep their order
+                self._park(key, messages)
+                continue
+            self._inflight[key] = messages
+            try:
+                written = await self._write_with_retry(key, messages)
+            finally:
+                del self._inflight[key]
+            if not written:
+                self._park(key, messages)
+
+        if not self._pending and not self._inflight:
+            if self._parked and self._retry_at is None:
+                delay = min(self.retry_interval * 2 ** self._retry_round, self.retry_interval_max)
+                self._retry_round += 1
+                self._retry_at = time.monotonic() + delay
+                print(f"⏳ Retrying {self._parked_count} parked memory writes in {delay:g}s")
+            elif not self._parked:
+                self._retry_round = 0
+            # Everything queued so far is persisted or parked; appends of those turns run first
+            await self._spill_io(self._rewrite_spill, self._parked_records())
+            if not self._pending and not self._inflight:
+                self._idle.set()
+
+    def _park(self, key: SessionKey, messages: List[Tuple[str, str]]):
+        """Hold a session's failed turns for the next retry, within max_parked"""
+        self._parked.setdefault(key, []).extend(messages)
+        self._parked_count += len(messages)
+        while self._parked_count > self.max_parked:
+            (actor_id, session_id), dropped = self._parked.popitem(last=False)
+            self._parked_count -= len(dropped)
+            self.dropped_messages += len(dropped)
+            print(f"❌ Dropped {len(dropped)} parked memory writes for {actor_id}/{session_id}")
+
+    def _requeue_parked(self):
+        """Queue parked turns ahead of everything else, with the same sessions' newer turns behind them"""
+        if not self._parked:
+            return
+        requeued = OrderedDict()
+        for key, messages in self._parked.items():
+            requeued[key] = messages + self._pending.pop(key, [])
+            self._pending_count += len(messages)
+        requeued.update(self._pending)
+        self._pending = requeued
+        self._parked = OrderedDict()
+        self._parked_count = 0
+        self._retry_at = None
+        self._idle.clear()
+
+    async def _write_with_retry(self, key: SessionKey, messages: List[Tuple[str, str]]) -> bool:
+        """Write a session's turns, retrying; False when every attempt failed"""
+        actor_id, session_id = key
+        for attempt in range(self.retries + 1):
+            try:
+                await self.memory.acreate_event(messages=messages, actor_id=actor_id, session_id=session_id)
+                self.flushed_events += 1
+                return True
+            except Exception as e:
+                if attempt == self.retries:
+                    self.write_failures += 1
+                    print(f"❌ Memory write failed for {actor_id}/{session_id} after {attempt + 1} attempts: {e}")
+                    return False
+                await asyncio.sleep(min(0.2 * 2 ** attempt, 5.0))
+        return False
+
+    async def drain(self, timeout: float = None):
+        """Flush everything still queued, then stop the worker (called on shutdown)"""
+        if self._worker is None:
+            return
+        timeout = timeout if timeout is not None else config.MEMORY_DRAIN_TIMEOUT
+        # Parked turns get one last try; what still fails stays in the spill file
+        self._requeue_parked()
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️  Memory drain timed out; unflushed writes remain in {self.spill_path}")
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        await self._spill_io(self._spill.close)
+        self._spill_executor.shutdown()
+        self._spill_executor = None
+
+    def stats(self) -> Dict[str, int]:
+        """Queue counters for monitoring"""
+        return {
+            "pending_messages": self._pending_count,
+            "pending_sessions": len(self._pending),
+            "enqueued": self.enqueued,
+            "flushed_events": self.flushed_events,
+            "coalesced": self.coalesced,
+            "write_failures": self.write_failures,
+            "parked_messages": self._parked_count,
+            "parked_sessions": len(self._parked),
+            "dropped_messages": self.dropped_messages,
+            "backpressure_waits": self.backpressure_waits
+        }
+
+
+# Global write-behind queue instance
+memory_writer = WriteBehindQueue(short_term_memory)
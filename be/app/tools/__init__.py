@@ -1,4 +1,5 @@
 """Tools module"""
-from app.tools.tarot_deck import draw_cards
+from app.tools.tarot_deck import draw_cards, draw_reading, draw_batch, SPREADS
+from app.tools.numerology_calc import core_numbers
 
-__all__ = ["draw_cards"]
+__all__ = ["draw_cards", "draw_reading", "draw_batch", "SPREADS", "core_numbers"]
@@ -0,0 +1,146 @@
+"""
+Read-only index of standard tarot card meanings for agents
+"""
+import json
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+from app.tools.tarot_deck import DECK, DECK_SIZE, SPREADS, Card, find_card
+
+# Bundled data: both orientations of all 78 cards, suits and spread positions
+MEANINGS_PATH = Path(__file__).parent / "card_meanings.json"
+
+
+class CardMeaning(NamedTuple):
+    card: Card
+    reversed: bool
+    keywords: Tuple[str, ...]
+    meaning: str
+
+
+class CardMeaningIndex:
+    """
+    Card meanings, loaded once into an immutable table
+
+    Entries are tuples indexed by `card.id * 2 + reversed`; suit and position
+    notes are read-only mappings. The file is read on first use (or during
+    startup warm-up) and checked to cover every card in both orientations.
+    """
+
+    def __init__(self, path: Path = MEANINGS_PATH):
+        self.path = path
+        self._table: Optional[Tuple[CardMeaning, ...]] = None
+        self._suits: Mapping[str, str] = MappingProxyType({})
+        self._positions: Mapping[str, str] = MappingProxyType({})
+        self._lock = threading.Lock()
+
+    def load(self) -> int:
+        """
+        Read and validate the meanings file
+
+        Returns:
+            Number of entries (156: 78 cards x 2 orientations)
+
+        Raises:
+            ValueError: If a card or orientation is missing
+        """
+        with self._lock:
+            if self._table is not None:
+                return len(self._table)
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            cards = data["cards"]
+            missing = [
+                f"{card.name} ({orientation})" for card in DECK for orientation in ("upright", "reversed")
+                if orientation not in cards.get(card.name, {})
+            ]
+            if missing:
+                raise ValueError(f"{self.path.name} has no meaning for: {', '.join(missing)}")
+            self._table = tuple(
+                CardMeaning(card, orientation == "reversed",
+                            tuple(cards[card.name][orientation]["keywords"]), cards[card.name][orientation]["meaning"])
+                for card in DECK for orientation in ("upright", "reversed")
+            )
+            self._suits = MappingProxyType(dict(data.get("suits", {})))
+            self._positions = MappingProxyType(dict(data.get("positions", {})))
+            return len(self._table)
+
+    @property
+    def table(self) -> Tuple[CardMeaning, ...]:
+        if self._table is None:
+            self.load()
+        return self._table
+
+    @property
+    def suits(self) -> Mapping[str, str]:
+        self.table
+        return self._suits
+
+    @property
+    def positions(self) -> Mapping[str, str]:
+        self.table
+        return self._positions
+
+    def get(self, card: Card, reversed_: bool = False) -> CardMeaning:
+        return self.table[card.id * 2 + reversed_]
+
+    def lookup(self, labels: Sequence[str], spread: Optional[str] = None) -> List[Dict]:
+        """
+        Meanings for several cards in one pass
+
+        Args:
+            labels: Card labels as drawn, e.g. ["The Tower (Reversed)", "Two of Cups"]
+            spread: Optional spread name; cards take its positions in order
+
+        Returns:
+            One dict per label with card, reversed, keywords, meaning, suit
+            (minor arcana), position and position_note; unknown labels get
+            {"card": label, "error": ...}
+
+        Raises:
+            ValueError: If the spread is unknown
+        """
+        if spread and spread not in SPREADS:
+            raise ValueError(f"Unknown spread '{spread}'; choose one of {', '.join(SPREADS)}")
+        positions = SPREADS[spread].positions if spread else ()
+        results = []
+        for i, label in enumerate(labels):
+            try:
+                card, reversed_ = find_card(label)
+            except ValueError as e:
+                results.append({"card": label, "error": str(e)})
+                continue
+            entry = self.get(card, reversed_)
+            position = positions[i] if i < len(positions) else None
+            results.append({
+                "card": card.name,
+                "reversed": reversed_,
+                "keywords": list(entry.keywords),
+                "meaning": entry.meaning,
+                "suit": self.suits.get(card.suit) if card.suit else None,
+                "position": position,
+                "position_note": self.positions.get(position) if position else None
+            })
+        return results
+
+    def format(self, labels: Sequence[str], spread: Optional[str] = None) -> str:
+        """lookup() as compact text, one block per card, for tool results"""
+        blocks = []
+        for item in self.lookup(labels, spread):
+            if "error" in item:
+                blocks.append(item["error"])
+                continue
+            title = item["card"] + (" (Reversed)" if item["reversed"] else "")
+            if item["position"]:
+                title += f" | {item['position']}"
+            lines = [title, f"Keywords: {', '.join(item['keywords'])}", f"Meaning: {item['meaning']}"]
+            if item["suit"]:
+                lines.append(f"Suit: {item['suit']}")
+            if item["position_note"]:
+                lines.append(f"Position: {item['position_note']}")
+            blocks.append("\n".join(lines))
+        return "\n\n".join(blocks)
+
+
+# Global card meaning index
+card_meanings = CardMeaningIndex()
@@ -0,0 +1,190 @@
+"""
+Numerology calculations (Pythagorean system) for agents
+"""
+import re
+import unicodedata
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+MASTER_NUMBERS = (11, 22, 33)
+
+# Pythagorean chart: A-I = 1-9, J-R = 1-9, S-Z = 1-8
+LETTER_VALUES = {chr(ord("A") + i): i % 9 + 1 for i in range(26)}
+VOWELS = set("AEIOU")
+
+# Number families used for compatibility (master numbers use their root)
+FAMILIES = ({1, 5, 7}, {2, 4, 8}, {3, 6, 9})
+
+_DATE_PATTERNS = (
+    re.compile(r"^(?P<y>\d{4})[-/.](?P<m>\d{1,2})[-/.](?P<d>\d{1,2})$"),
+    re.compile(r"^(?P<d>\d{1,2})[-/.](?P<m>\d{1,2})[-/.](?P<y>\d{4})$"),
+)
+
+
+def reduce_number(number: int, keep_master: bool = True) -> int:
+    """
+    Sum digits until a single digit remains
+
+    Args:
+        number: Non-negative integer to reduce
+        keep_master: Stop at 11, 22 or 33
+
+    Returns:
+        1-9, a master number, or 0 for 0
+    """
+    while number > 9 and not (keep_master and number in MASTER_NUMBERS):
+        number = sum(int(digit) for digit in str(number))
+    return number
+
+
+def parse_birth_date(birth_date: str) -> date:
+    """
+    Parse YYYY-MM-DD (also with / or .) or DD-MM-YYYY
+
+    Raises:
+        ValueError: If the date is malformed or does not exist
+    """
+    text = birth_date.strip()
+    for pattern in _DATE_PATTERNS:
+        match = pattern.match(text)
+        if match:
+            return date(int(match["y"]), int(match["m"]), int(match["d"]))
+    raise ValueError(f"Birth date '{birth_date}' must look like YYYY-MM-DD")
+
+
+def _letters(full_name: str) -> str:
+    # Fold accents (José -> JOSE) and drop everything that is not a letter
+    ascii_name = unicodedata.normalize("NFKD", full_name).encode("ascii", "ignore").decode("ascii")
+    return "".join(c for c in ascii_name.upper() if c in LETTER_VALUES)
+
+
+def _split_vowels(letters: str) -> Tuple[str, str]:
+    """Vowels and consonants; Y is a vowel unless it sits next to another vowel"""
+    vowels, consonants = [], []
+    for i, c in enumerate(letters):
+        if c == "Y":
+            neighbours = letters[max(i - 1, 0):i] + letters[i + 1:i + 2]
+            is_vowel = not any(n in VOWELS for n in neighbours)
+        else:
+            is_vowel = c in VOWELS
+        (vowels if is_vowel else consonants).append(c)
+    return "".join(vowels), "".join(consonants)
+
+
+def _letters_number(letters: str) -> int:
+    return reduce_number(sum(LETTER_VALUES[c] for c in letters))
+
+
+def life_path_number(birth_date: str) -> int:
+    """Reduce month, day and year separately, then their sum"""
+    born = parse_birth_date(birth_date)
+    return reduce_number(reduce_number(born.month) + reduce_number(born.day) + reduce_number(born.year))
+
+
+def birthday_number(birth_date: str) -> int:
+    return reduce_number(parse_birth_date(birth_date).day)
+
+
+def personal_year_number(birth_date: str, year: Optional[int] = None) -> int:
+    """Birth month and day combined with the given (default: current) year"""
+    born = parse_birth_date(birth_date)
+    year = year or date.today().year
+    return reduce_number(reduce_number(born.month) + reduce_number(born.day) + reduce_number(year), keep_master=False)
+
+
+def name_numbers(full_name: str) -> Dict[str, int]:
+    """
+    Expression (all letters), soul urge (vowels) and personality (consonants)
+
+    Raises:
+        ValueError: If the name has no letters
+    """
+    letters = _letters(full_name)
+    if not letters:
+        raise ValueError(f"Name '{full_name}' has no letters to calculate from")
+    vowels, consonants = _split_vowels(letters)
+    return {
+        "expression": _letters_number(letters),
+        "soul_urge": _letters_number(vowels),
+        "personality": _letters_number(consonants)
+    }
+
+
+def core_numbers(full_name: str = "", birth_date: str = "", year: Optional[int] = None) -> Dict[str, object]:
+    """
+    Every core number available from a name and/or a birth date
+
+    Args:
+        full_name: Full birth name (expression, soul urge, personality)
+        birth_date: Birth date (life path, birthday, personal year)
+        year: Year for the personal year number (default: current year)
+
+    Returns:
+        Dict of numbers, plus maturity when both inputs are given and
+        `master_numbers` listing which numbers are 11, 22 or 33
+
+    Raises:
+        ValueError: If neither input is given or one is malformed
+    """
+    if not full_name and not birth_date:
+        raise ValueError("Provide a full name, a birth date, or both")
+    numbers: Dict[str, object] = {}
+    if birth_date:
+        numbers["life_path"] = life_path_number(birth_date)
+        numbers["birthday"] = birthday_number(birth_date)
+        numbers["personal_year"] = personal_year_number(birth_date, year)
+    if full_name:
+        numbers.update(name_numbers(full_name))
+    if birth_date and full_name:
+        numbers["maturity"] = reduce_number(numbers["life_path"] + numbers["expression"])
+    numbers["master_numbers"] = [name for name, value in numbers.items() if value in MASTER_NUMBERS]
+    return numbers
+
+
+def compatibility(first: int, second: int) -> Dict[str, object]:
+    """
+    Compatibility of two core numbers by number family
+
+    Returns:
+        Dict with both root numbers and a level: "same", "natural" (same
+        family) or "challenging"
+    """
+    roots = [reduce_number(n, keep_master=False) for n in (first, second)]
+    if roots[0] == roots[1]:
+        level = "same"
+    elif any(roots[0] in family and roots[1] in family for family in FAMILIES):
+        level = "natural"
+    else:
+        level = "challenging"
+    return {"numbers": [first, second], "roots": roots, "level": level}
+
+
+def core_numbers_batch(people: List[Dict[str, str]], year: Optional[int] = None) -> Dict[str, object]:
+    """
+    Core numbers for several people, plus life path compatibility for each pair
+
+    Args:
+        people: Dicts with optional "name" label, "full_name" and "birth_date"
+        year: Year for personal year numbers
+
+    Returns:
+        {"people": [...], "compatibility": [...]}; a person whose input is
+        invalid gets an "error" entry instead of numbers
+    """
+    results = []
+    for i, person in enumerate(people):
+        label = person.get("name") or person.get("full_name") or f"person {i + 1}"
+        try:
+            results.append({"name": label, **core_numbers(person.get("full_name", ""), person.get("birth_date", ""), year)})
+        except ValueError as e:
+            results.append({"name": label, "error": str(e)})
+
+    pairs = []
+    with_life_path = [r for r in results if "life_path" in r]
+    for i, first in enumerate(with_life_path):
+        for second in with_life_path[i + 1:]:
+            pairs.append({
+                "between": [first["name"], second["name"]],
+                **compatibility(first["life_path"], second["life_path"])
+            })
+    return {"people": results, "compatibility": pairs}
@@ -0,0 +1,67 @@
+"""
+Strands tools for numerology calculations (computed in-process)
+"""
+import json
+from typing import Dict, List
+from strands.tools import tool
+from app.tools.numerology_calc import compatibility, core_numbers, core_numbers_batch
+
+@tool
+def calculate_numerology(full_name: str = "", birth_date: str = "", year: int = 0) -> str:
+    """
+    Calculate every core numerology number for a person in one call.
+
+    Use this tool whenever the user gives a name and/or a birth date. One call
+    returns all numbers, so there is no need to call it once per number.
+
+    Args:
+        full_name: Full birth name, for expression, soul urge and personality numbers
+        birth_date: Birth date as YYYY-MM-DD, for life path, birthday and personal year numbers
+        year: Year for the personal year number (0 = current year)
+
+    Returns:
+        JSON with the numbers (life_path, birthday, personal_year, expression,
+        soul_urge, personality, maturity when both inputs are given) and
+        master_numbers listing any that are 11, 22 or 33
+
+    Examples:
+        - calculate_numerology(full_name="Ada Lovelace", birth_date="1815-12-10")
+        - calculate_numerology(birth_date="1990-03-03")
+    """
+    return json.dumps(core_numbers(full_name, birth_date, year or None))
+
+@tool
+def calculate_numerology_batch(people: List[Dict[str, str]], year: int = 0) -> str:
+    """
+    Calculate core numbers for several people at once and compare their life paths.
+
+    Use this tool for compatibility questions or whenever more than one person
+    is involved, instead of calling calculate_numerology repeatedly.
+
+    Args:
+        people: List of people, each {"name": label, "full_name": ..., "birth_date": "YYYY-MM-DD"};
+                full_name or birth_date may be omitted
+        year: Year for personal year numbers (0 = current year)
+
+    Returns:
+        JSON {"people": [...], "compatibility": [...]} where each pair of life
+        path numbers is rated "same", "natural" or "challenging"
+    """
+    return json.dumps(core_numbers_batch(people, year or None))
+
+@tool
+def number_compatibility(first_number: int, second_number: int) -> str:
+    """
+    Rate the compatibility of two numerology numbers (e.g. two life path numbers).
+
+    Args:
+        first_number: First number (1-9, 11, 22 or 33)
+        second_number: Second number (1-9, 11, 22 or 33)
+
+    Returns:
+        JSON with both root numbers and a level: "same", "natural" or "challenging"
+    """
+    return json.dumps(compatibility(first_number, second_number))
+
+# Registered on the numerology agent when MCP tools are disabled, unavailable or slow
+NUMEROLOGY_TOOLS = [calculate_numerology, calculate_numerology_batch, number_compatibility]
@@ -1,8 +1,15 @@
 """
-Tarot card drawing tool for agents
+Tarot deck engine: card table, spreads and reproducible draws for agents
 """
+import hashlib
 import random
-from typing import List, Dict
+import secrets
+import struct
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+from app.core.config import config
 
 # Complete 78-card tarot deck
 MAJOR_ARCANA = [
@@ -37,43 +44,327 @@ MINOR_ARCANA = {
     "Pentacles": ["Ace", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine", "Ten", "Page", "Knight", "Queen", "King"]
 }
 
+# Chance that a card is drawn reversed when reversals are allowed
+REVERSED_CHANCE = 0.3
+# Most cards one plain-count draw gives, as many as the largest spread (Celtic Cross)
+MAX_DRAW_CARDS = 10
+
+
+class Card(NamedTuple):
+    """One card of the deck; `id` is its index in DECK"""
+    id: int
+    name: str
+    arcana: str  # "major" or "minor"
+    suit: Optional[str]
+    number: int  # 0-21 for major arcana, 1-14 (Ace to King) within a suit
+
+
+def _build_deck() -> Tuple[Card, ...]:
+    cards = [Card(i, sys.intern(name), "major", None, i) for i, name in enumerate(MAJOR_ARCANA)]
+    for suit, ranks in MINOR_ARCANA.items():
+        for number, rank in enumerate(ranks, start=1):
+            cards.append(Card(len(cards), sys.intern(f"{rank} of {suit}"), "minor", suit, number))
+    return tuple(cards)
+
+
+# Card table, built once: ids 0-21 are the major arcana, then 14 cards per suit
+DECK = _build_deck()
+DECK_SIZE = len(DECK)
+CARD_NAMES = tuple(card.name for card in DECK)
+CARD_IDS = {card.name: card.id for card in DECK}
+_ALL_IDS = tuple(range(DECK_SIZE))
+# Labels for the CARDS: [...] line, indexed [reversed][card id]
+_LABELS = (CARD_NAMES, tuple(f"{name} (Reversed)" for name in CARD_NAMES))
+
+
+_RANK_DIGITS = {str(i): rank for i, rank in enumerate(MINOR_ARCANA["Wands"][:10], start=1)}
+
+
+def _aliases() -> Dict[str, int]:
+    """Lower-case spellings accepted for each card, e.g. tower, judgment, 3 of cups"""
+    aliases = {}
+    for card in DECK:
+        name = card.name.lower()
+        aliases[name] = card.id
+        if name.startswith("the "):
+            aliases[name[4:]] = card.id
+    aliases["judgment"] = CARD_IDS["Judgement"]
+    for digit, rank in _RANK_DIGITS.items():
+        for suit in MINOR_ARCANA:
+            aliases[f"{digit} of {suit.lower()}"] = CARD_IDS[f"{rank} of {suit}"]
+    return aliases
+
+
+_CARD_ALIASES = _aliases()
+
+
+def find_card(label: str) -> Tuple[Card, bool]:
+    """
+    Card and orientation for a label such as "The Tower (Reversed)"
+
+    Matching ignores case and extra whitespace, and accepts names without
+    "The", "Judgment" and digits for ranks ("3 of Cups").
+
+    Raises:
+        ValueError: If no card matches
+    """
+    name = " ".join(label.split()).lower()
+    reversed_ = False
+    for suffix in ("(reversed)", "reversed"):
+        if name.endswith(suffix):
+            name, reversed_ = name[:-len(suffix)].rstrip(" ,-"), True
+            break
+    card_id = _CARD_ALIASES.get(name)
+    if card_id is None:
+        raise ValueError(f"Unknown tarot card '{label}'")
+    return DECK[card_id], reversed_
+
+
+class Spread(NamedTuple):
+    """A named layout; one position label per card"""
+    name: str
+    title: str
+    positions: Tuple[str, ...]
+
+
+SPREADS: Dict[str, Spread] = {
+    spread.name: spread for spread in (
+        Spread("single", "Single Card", ("Insight",)),
+        Spread("three_card", "Past, Present, Future", ("Past", "Present", "Future")),
+        Spread("relationship", "Relationship", ("You", "The Other Person", "The Relationship")),
+        Spread("five_card", "Five Card Cross", ("Present", "Challenge", "Past", "Future", "Outcome")),
+        Spread("celtic_cross", "Celtic Cross", (
+            "Present", "Challenge", "Foundation", "Recent Past", "Crown", "Near Future",
+            "Self", "Environment", "Hopes and Fears", "Outcome"
+        )),
+    )
+}
+
+
+class DrawnCard(NamedTuple):
+    card: Card
+    reversed: bool = False
+    position: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        """Card name as shown in the CARDS: [...] line"""
+        return _LABELS[self.reversed][self.card.id]
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.card.id,
+            "name": self.card.name,
+            "arcana": self.card.arcana,
+            "suit": self.card.suit,
+            "number": self.card.number,
+            "reversed": self.reversed,
+            "position": self.position
+        }
+
+
+class Reading(NamedTuple):
+    """
+    Cards drawn for one reading; drawing again with `seed` gives the same cards
+
+    Stored as card ids and reversal flags; DrawnCard objects are only built
+    when `cards` is read.
+    """
+    seed: int
+    ids: Tuple[int, ...]
+    reversed: Tuple[bool, ...]
+    spread: Optional[str] = None
+
+    @property
+    def positions(self) -> Tuple[Optional[str], ...]:
+        return SPREADS[self.spread].positions if self.spread else (None,) * len(self.ids)
+
+    @property
+    def cards(self) -> Tuple[DrawnCard, ...]:
+        return tuple(
+            DrawnCard(DECK[card_id], rev, position)
+            for card_id, rev, position in zip(self.ids, self.reversed, self.positions)
+        )
+
+    @property
+    def labels(self) -> List[str]:
+        return [_LABELS[rev][card_id] for card_id, rev in zip(self.ids, self.reversed)]
+
+    @property
+    def formatted(self) -> str:
+        return f"CARDS: [{', '.join(self.labels)}]"
+
+    def to_dict(self) -> Dict:
+        return {
+            "seed": self.seed,
+            "spread": self.spread,
+            "count": len(self.ids),
+            "cards": [drawn.to_dict() for drawn in self.cards]
+        }
+
+
+# A spread name from SPREADS or a number of cards
+SpreadRequest = Union[str, int]
+
+
+def resolve_spread(spread: SpreadRequest) -> Tuple[Optional[Spread], int]:
+    """
+    Spread and card count for a spread name or a plain card count
+
+    Counts are clamped to 1..MAX_DRAW_CARDS.
+
+    Raises:
+        ValueError: If a spread name is unknown
+    """
+    if isinstance(spread, str):
+        if spread not in SPREADS:
+            raise ValueError(f"Unknown spread '{spread}'; choose one of {', '.join(SPREADS)}")
+        return SPREADS[spread], len(SPREADS[spread].positions)
+    return None, min(max(int(spread), 1), MAX_DRAW_CARDS)
+
+
+_WORDS_PER_BLOCK = 16
+_WORDS = struct.Struct(f">{_WORDS_PER_BLOCK}I")
+_REVERSED_BELOW = int(REVERSED_CHANCE * 2 ** 32)
+
+
+def _random_words(seed: int, count: int) -> List[int]:
+    """`count` 32-bit words derived from the seed (blake2b in counter mode)"""
+    key = (seed & 0xFFFFFFFFFFFFFFFF).to_bytes(8, "big")
+    words: List[int] = []
+    for block in range(-(-count // _WORDS_PER_BLOCK)):
+        words.extend(_WORDS.unpack(hashlib.blake2b(block.to_bytes(4, "big"), digest_size=64, key=key).digest()))
+    return words
+
+
+def _draw(seed: int, spread: SpreadRequest, allow_reversed: bool) -> Reading:
+    """Partial Fisher-Yates shuffle of card ids; the seed alone decides the result"""
+    layout, count = resolve_spread(spread)
+    words = _random_words(seed, count * 2 if allow_reversed else count)
+    ids = list(_ALL_IDS)
+    for i in range(count):
+        j = i + words[i] % (DECK_SIZE - i)
+        ids[i], ids[j] = ids[j], ids[i]
+    if allow_reversed:
+        flags = tuple(word < _REVERSED_BELOW for word in words[count:count * 2])
+    else:
+        flags = (False,) * count
+    return Reading(seed, tuple(ids[:count]), flags, layout.name if layout else None)
+
+
+def new_seed() -> int:
+    return secrets.randbits(64)
+
+
+def draw_reading(spread: SpreadRequest = 1, allow_reversed: bool = False, seed: Optional[int] = None) -> Reading:
+    """
+    Draw one reading
+
+    Args:
+        spread: Spread name (see SPREADS) or number of cards (1-10)
+        allow_reversed: Whether cards can be drawn in reversed position
+        seed: Seed of a previous reading to replay it; a fresh one by default
+
+    Returns:
+        Reading with the seed that reproduces it
+    """
+    return _draw(new_seed() if seed is None else seed, spread, allow_reversed)
+
+
+def draw_batch(spreads: Iterable[SpreadRequest], allow_reversed: bool = False, seed: Optional[int] = None) -> List[Reading]:
+    """
+    Draw several readings from one batch seed
+
+    Each reading gets its own seed taken from `seed`, so any single reading
+    of the batch can be replayed with draw_reading(seed=...). The readings
+    are drawn one after another, exactly as draw_reading would draw them.
+
+    Args:
+        spreads: Spread names or card counts, one per reading
+        allow_reversed: Whether cards can be drawn in reversed position
+        seed: Seed for the whole batch; the same seed gives the same readings
+
+    Returns:
+        Readings in the order of `spreads`
+    """
+    seeds = random.Random(new_seed() if seed is None else seed)
+    return [_draw(seeds.getrandbits(64), spread, allow_reversed) for spread in spreads]
+
+
+class SessionDecks:
+    """
+    Per-session seed generators
+
+    Each session's generator is seeded from the session id and a base seed
+    (TAROT_SEED, or a random one per process), so with a fixed TAROT_SEED a
+    session draws the same sequence of readings every time. Only the most
+    recent `max_sessions` generators are kept; an evicted session starts its
+    sequence over.
+    """
+
+    def __init__(self, base_seed: Optional[int] = None, max_sessions: int = None):
+        self.base_seed = base_seed if base_seed is not None else (config.TAROT_SEED if config.TAROT_SEED is not None else new_seed())
+        self.max_sessions = max_sessions or config.TAROT_MAX_SESSIONS
+        self._generators: "OrderedDict[str, random.Random]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def session_seed(self, session_id: str) -> int:
+        digest = hashlib.blake2b(f"{self.base_seed}:{session_id}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def next_seed(self, session_id: str) -> int:
+        """Seed for the session's next reading"""
+        with self._lock:
+            generator = self._generators.get(session_id)
+            if generator is None:
+                generator = self._generators[session_id] = random.Random(self.session_seed(session_id))
+                while len(self._generators) > self.max_sessions:
+                    self._generators.popitem(last=False)
+            else:
+                self._generators.move_to_end(session_id)
+            return generator.getrandbits(64)
+
+    def draw(self, session_id: Optional[str], spread: SpreadRequest = 1, allow_reversed: bool = False) -> Reading:
+        """Draw the session's next reading (a one-off seed without a session)"""
+        seed = self.next_seed(session_id) if session_id else None
+        return draw_reading(spread, allow_reversed, seed)
+
+    def reset(self, session_id: str):
+        """Start the session's sequence over"""
+        with self._lock:
+            self._generators.pop(session_id, None)
+
+
+# Global per-session seed generators
+session_decks = SessionDecks()
+
+
 def get_full_deck() -> List[str]:
     """Get the complete 78-card tarot deck"""
-    deck = MAJOR_ARCANA.copy()
-    for suit, ranks in MINOR_ARCANA.items():
-        for rank in ranks:
-            deck.append(f"{rank} of {suit}")
-    return deck
+    return list(CARD_NAMES)
+
 
-def draw_cards(num_cards: int = 1, allow_reversed: bool = False) -> Dict:
+def draw_cards(num_cards: int = 1, allow_reversed: bool = False, spread: Optional[str] = None,
+               seed: Optional[int] = None) -> Dict:
     """
     Draw random tarot cards from the deck
     
     Args:
-        num_cards: Number of cards to draw (1-10)
+        num_cards: Number of cards to draw (1-10), ignored when a spread is given
         allow_reversed: Whether cards can be drawn in reversed position
+        spread: Optional spread name (see SPREADS) giving the count and positions
+        seed: Seed of a previous draw to replay it
         
     Returns:
-        Dictionary with card names and formatted string
+        Dictionary with card names, formatted string, the seed and per-card details
     """
-    if num_cards < 1:
-        num_cards = 1
-    if num_cards > 10:
-        num_cards = 10
-    
-    deck = get_full_deck()
-    drawn = random.sample(deck, num_cards)
-    
-    # Randomly reverse some cards if allowed
-    cards = []
-    for card in drawn:
-        if allow_reversed and random.random() < 0.3:  # 30% chance of reversed
-            cards.append(f"{card} (Reversed)")
-        else:
-            cards.append(card)
-    
+    reading = draw_reading(spread or num_cards, allow_reversed, seed)
+    cards = reading.labels
     return {
         "cards": cards,
         "count": len(cards),
-        "formatted": f"CARDS: [{', '.join(cards)}]"
+        "formatted": reading.formatted,
+        "seed": reading.seed,
+        "spread": reading.spread,
+        "details": [drawn.to_dict() for drawn in reading.cards]
     }
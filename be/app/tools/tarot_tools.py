@@ -1,29 +1,84 @@
 """
 Strands tools for tarot card drawing
 """
+from typing import Any, Dict, List
+from strands import ToolContext
 from strands.tools import tool
-from app.tools.tarot_deck import draw_cards as draw_cards_func
+from app.core.reading_store import reading_store
+from app.tools.card_meanings import card_meanings
+from app.tools.tarot_deck import SPREADS, Reading, SpreadRequest, session_decks
 
-@tool
-def draw_tarot_cards(num_cards: int = 1) -> str:
+def draw_for_session(state: Dict[str, Any], spread: SpreadRequest, allow_reversed: bool = False) -> Reading:
+    """
+    Draw the next reading of the session named in an invocation state
+
+    Readings follow the session's seed sequence, so they can be replayed, and
+    are kept in the reading store for the response's card list and for
+    follow-up questions. Without a session_id the draw is a one-off.
+    """
+    session_id = state.get("session_id")
+    actor_id = state.get("actor_id", "")
+    reading = session_decks.draw(f"{actor_id}:{session_id}" if session_id else None, spread, allow_reversed)
+    if session_id:
+        reading_store.put(actor_id, session_id, reading, state.get("question", ""))
+    return reading
+
+@tool(context=True)
+def draw_tarot_cards(num_cards: int = 1, spread: str = "", tool_context: ToolContext = None) -> dict:
     """
     Draw random tarot cards from a 78-card deck.
-    
+
     Use this tool to draw cards for tarot readings. The tool will randomly select
     cards from the complete tarot deck (22 Major Arcana + 56 Minor Arcana).
     Some cards may be drawn in reversed position.
-    
+
     Args:
         num_cards: Number of cards to draw (1-10). Use 1 for single card readings,
-                  3 for past-present-future, 5 for Celtic Cross, etc.
-    
+                  3 for past-present-future, 10 for Celtic Cross, etc.
+        spread: Optional named spread instead of num_cards: single, three_card,
+                relationship, five_card or celtic_cross. The result then labels
+                each card with its position.
+
     Returns:
         A formatted string with the drawn cards in the format:
         CARDS: [Card Name 1, Card Name 2, Card Name 3]
-        
+        followed by JSON details (seed, spread, and per card: name, arcana,
+        suit, number, reversed, position)
+
     Examples:
         - draw_tarot_cards(1) -> "CARDS: [The Fool]"
-        - draw_tarot_cards(3) -> "CARDS: [The Tower (Reversed), Two of Cups, The Sun]"
+        - draw_tarot_cards(spread="three_card") -> "CARDS: [The Tower, Two of Cups, The Sun]"
+    """
+    if spread and spread not in SPREADS:
+        return {
+            "status": "error",
+            "content": [{"text": f"Unknown spread '{spread}'; choose one of {', '.join(SPREADS)}"}]
+        }
+    reading = draw_for_session(tool_context.invocation_state if tool_context else {}, spread or num_cards)
+    return {
+        "status": "success",
+        "content": [{"text": reading.formatted}, {"json": reading.to_dict()}]
+    }
+
+@tool
+def lookup_card_meanings(cards: List[str], spread: str = "") -> str:
+    """
+    Look up the standard meanings of several tarot cards in one call.
+
+    Use this tool right after drawing, with every drawn card at once, instead of
+    asking card_interpreter for standard upright or reversed meanings.
+
+    Args:
+        cards: Card names exactly as drawn, e.g. ["The Tower (Reversed)", "Two of Cups"]
+        spread: Optional spread the cards were drawn for (single, three_card,
+                relationship, five_card, celtic_cross); cards then get the
+                meaning of their position in order
+
+    Returns:
+        One block per card with keywords, meaning, suit element (minor arcana)
+        and position note
     """
-    result = draw_cards_func(num_cards=num_cards, allow_reversed=False)
-    return result["formatted"]
+    try:
+        return card_meanings.format(cards, spread or None)
+    except ValueError as e:
+        return f"Error: {e}"
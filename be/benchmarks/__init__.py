@@ -0,0 +1 @@
+"""Offline benchmarks; run from be/ with `python -m benchmarks.<name>`"""
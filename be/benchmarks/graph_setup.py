@@ -0,0 +1,139 @@
+"""
+Microbenchmark: per-request graph setup, rebuilt vs pooled
+
+Compares the original per-request setup (a new GraphBuilder graph with new
+specialist agents and a new tarot swarm for every turn that has history, as
+routes.py did before AgentGraphPool) against checking a prebuilt graph out
+of AgentGraphPool and binding the history to it. No model calls are made;
+only the setup before graph.invoke_async is measured.
+
+The run is hermetic: numerology uses the local tools and the prompts come
+from prompts/, so nothing is fetched over the network. The original setup
+gets its prompts and tools resolved once up front, as it did at import.
+
+    python -m benchmarks.graph_setup --iterations 200 --turns 10
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+# Set before app.core.config is imported (and kept over .env): no MCP server, no Prompt Management
+os.environ.update({"NUMEROLOGY_TOOLS": "local", "MCP_SERVER_URI": "", "WARM_SNAPSHOT": "false"})
+for _name in ("ROUTER", "WELCOME", "NUMEROLOGY", "CARD_INTERPRETER", "SPREAD_READER", "LIFE_ADVISOR"):
+    os.environ[f"{_name}_PROMPT_ID"] = ""
+
+from strands import Agent
+from strands.multiagent import GraphBuilder, Swarm
+from strands.types.content import ContentBlock, Message
+
+from app.agents import router
+from app.agents.graph import AgentGraphPool, route_to_numerology, route_to_tarot, route_to_welcome
+from app.agents.model import get_model
+from app.core.prompt_manager import prompt_manager
+from app.tools.numerology_tools import NUMEROLOGY_TOOLS
+from app.tools.tarot_tools import draw_tarot_cards
+
+
+def make_history(turns: int):
+    messages = []
+    for i in range(turns):
+        messages.append(Message(role="user", content=[ContentBlock(text=f"Question {i} about my reading")]))
+        messages.append(Message(role="assistant", content=[ContentBlock(text=f"Answer {i} " + "lorem ipsum " * 40)]))
+    return messages
+
+
+class OriginalSetup:
+    """The graph routes.py built for every request before pooling"""
+
+    def __init__(self):
+        # Resolved once, as the original agent modules did at import
+        self.prompts = {prompt.name: prompt.get().text for prompt in prompt_manager.prompts}
+        self.model = get_model()
+        self.router_agent = router.create_router_agent()
+
+    def _agent(self, name, messages, tools=None):
+        return Agent(
+            name=name, system_prompt=self.prompts[name], model=self.model, tools=tools, messages=messages or []
+        )
+
+    def build(self, messages):
+        swarm_members = [
+            self._agent("spread_reader", messages, [draw_tarot_cards]),
+            self._agent("card_interpreter", messages),
+            self._agent("life_advisor", messages)
+        ]
+        tarot = Swarm(
+            swarm_members,
+            entry_point=swarm_members[0],
+            max_handoffs=15,
+            max_iterations=15,
+            execution_timeout=120.0,
+            node_timeout=20.0,
+            repetitive_handoff_detection_window=6,
+            repetitive_handoff_min_unique_agents=2
+        )
+        builder = GraphBuilder()
+        builder.add_node(self.router_agent, "router")
+        builder.add_node(self._agent("welcome", messages), "welcome")
+        builder.add_node(self._agent("numerology", messages, NUMEROLOGY_TOOLS), "numerology")
+        builder.add_node(tarot, "tarot")
+        builder.add_edge("router", "welcome", condition=route_to_welcome)
+        builder.add_edge("router", "numerology", condition=route_to_numerology)
+        builder.add_edge("router", "tarot", condition=route_to_tarot)
+        builder.set_entry_point("router")
+        builder.set_execution_timeout(600)
+        builder.set_node_timeout(180)
+        return builder.build()
+
+
+def measure(setup, history, iterations: int):
+    setup(history)  # warm-up (fills the pool)
+    gc.collect()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        setup(history)
+    per_call = (time.perf_counter() - start) / iterations
+
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    graph = setup(history)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    retained_blocks = sys.getallocatedblocks() - blocks_before
+    del graph
+    return per_call, peak, retained_blocks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200, help="Setups per variant")
+    parser.add_argument("--turns", type=int, default=10, help="History turns bound to each request")
+    args = parser.parse_args()
+
+    history = make_history(args.turns)
+    original = OriginalSetup()
+    pool = AgentGraphPool(max_idle=1)
+
+    def pooled(messages):
+        graph = pool.acquire(messages)
+        pool.release(graph)
+        return graph
+
+    results = {}
+    for name, setup in (("original", original.build), ("pooled", pooled)):
+        per_call, peak, blocks = measure(setup, history, args.iterations)
+        results[name] = per_call
+        print(
+            f"{name:>8}: {per_call * 1e6:9.1f} us/request, "
+            f"peak {peak / 1024:8.1f} KiB, {blocks:6d} blocks allocated and kept"
+        )
+    print(f"speedup: {results['original'] / results['pooled']:.1f}x ({pool.stats()})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,516 @@
+"""
+Load test: /invocations throughput and latency without AWS or Google
+
+Boots the app from main.create_app with uvicorn on a local port and drives
+/invocations over HTTP at a fixed concurrency with a mix of welcome,
+numerology, tarot and tarot follow-up prompts. Every external service is a
+local stand-in:
+
+- Bedrock: the scripted model (stubs/scripted_model.py); each call takes
+  --latency seconds plus its output tokens at --tps
+- numerology MCP server: stubs/mcp_server.py, --mcp-latency per tool call
+- AgentCore Memory: the in-process backend, or --memory sqlite / redis
+  (stubs/redis_server.py)
+- Google auth: AUTH_MODE=jwks against stubs/jwks_server.py, with one ID
+  token per virtual user, so the auth middleware runs as in production
+
+Virtual users hold a session for --turns requests, so history, the reading
+store and follow-ups behave as they do for real conversations. Reported:
+requests/s, client-side p50/p95/p99 overall and per prompt kind, model calls
+and tokens per request, and the server-side per-stage breakdown from the
+/metrics registry. --output saves the run as JSON; --compare prints the
+change against an earlier run.
+
+--record DIR saves every model call, MCP tool result and request of the
+run as a cassette (app/core/cassette.py); --replay DIR sends a cassette's
+requests again, recorded sessions in order, with the model and MCP tools
+served from it (no scripted model), at --time-scale times the recorded
+timing. A cassette recorded by the service itself (CASSETTE_MODE=record)
+replays the same way, so production traffic can be replayed offline.
+
+    python -m benchmarks.load_test --requests 300 --concurrency 16
+    python -m benchmarks.load_test --output runs/after.json --compare runs/before.json
+    python -m benchmarks.load_test --replay data/cassettes --time-scale 0
+
+Other settings (TAROT_MODE, INTENT_FAST_PATH, MEMORY_WRITE_BEHIND, ...) are
+taken from the environment as usual. The client, the app and the stand-ins
+share one process, so on few cores the numbers include the client's cost.
+"""
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import logging
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Optional
+
+AUTH_HEADER = "x-amzn-bedrock-agentcore-runtime-custom-app-auth"
+CLIENT_ID = "load-test"
+
+PROMPTS = {
+    "welcome": [
+        "Hi there!",
+        "What can you help me with?",
+        "Hello, I'm new here",
+        "Thanks, that was helpful"
+    ],
+    "numerology": [
+        "My name is Ada Lovelace and I was born 1815-12-10, what is my life path number?",
+        "What does my birth date 1990-03-03 say in numerology?",
+        "Calculate my numerology numbers, my name is John Smith",
+        "I was born 1984-07-21, what is my personal year number?"
+    ],
+    "tarot": [
+        "Can you do a three card reading about my career change?",
+        "Draw one card for me today",
+        "Do a relationship reading for me and my partner",
+        "I'd like a Celtic Cross reading about the year ahead"
+    ],
+    # Only asked in a session that already had a reading
+    "followup": [
+        "What does the second card mean?",
+        "Tell me more about the first card",
+        "What does the last card say about my career?"
+    ]
+}
+DEFAULT_MIX = "welcome:0.25,numerology:0.3,tarot:0.35,followup:0.1"
+
+# Settings recorded with each run, so saved runs can be told apart
+CONFIG_KEYS = [
+    "TAROT_MODE", "INTENT_FAST_PATH", "MEMORY_BACKEND", "MEMORY_WRITE_BEHIND", "NUMEROLOGY_TOOLS",
+    "HISTORY_TOKEN_BUDGET", "READING_FOLLOW_UP", "TAROT_PIPELINE_CONCURRENCY", "MCP_POOL_SIZE",
+    "SPECULATIVE_ROUTING"
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for item in mix.split(","):
+        kind, _, weight = item.partition(":")
+        if kind.strip() not in PROMPTS:
+            raise ValueError(f"Unknown prompt kind in --mix: {kind!r} (expected {', '.join(PROMPTS)})")
+        weights[kind.strip()] = float(weight)
+    return weights
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Latency percentiles in milliseconds"""
+    if not latencies:
+        return {}
+    ms = sorted(x * 1000 for x in latencies)
+    cuts = statistics.quantiles(ms, n=100, method="inclusive") if len(ms) > 1 else ms * 99
+    return {
+        "count": len(ms),
+        "p50": round(cuts[49], 1),
+        "p95": round(cuts[94], 1),
+        "p99": round(cuts[98], 1),
+        "mean": round(statistics.fmean(ms), 1),
+        "max": round(ms[-1], 1)
+    }
+
+
+class Stack:
+    """The app on a local port plus its stand-ins, configured through the environment"""
+
+    def __init__(self, args):
+        self.args = args
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._tmp = tempfile.TemporaryDirectory(prefix="load-test-")
+        self.mcp = self.keys = self.redis = None
+        self.model = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "Stack":
+        mcp_port, keys_port = _free_port(), _free_port()
+        os.environ.update({
+            "MCP_SERVER_URI": f"http://127.0.0.1:{mcp_port}/sse",
+            "AUTH_MODE": "jwks",
+            "GOOGLE_CLIENT_ID": CLIENT_ID,
+            "GOOGLE_CERTS_URL": f"http://127.0.0.1:{keys_port}/oauth2/v3/certs",
+            "MEMORY_BACKEND": self.args.memory,
+            "MEMORY_SQLITE_PATH": os.path.join(self._tmp.name, "memory.db"),
+            "MEMORY_SPILL_PATH": os.path.join(self._tmp.name, "memory_spill.jsonl"),
+            # Never overwrite the real warm-start snapshot with stand-in tool specs
+            "WARM_SNAPSHOT": "false"
+        })
+        # The stub server's tool is deterministic; MCP_CACHE_TOOLS= measures without the cache
+        os.environ.setdefault("MCP_CACHE_TOOLS", "calculate_numerology")
+        cassette_dir = self.args.record or self.args.replay
+        if cassette_dir:
+            os.environ.update({
+                "CASSETTE_MODE": "record" if self.args.record else "replay",
+                "CASSETTE_DIR": cassette_dir,
+                "CASSETTE_TIME_SCALE": str(self.args.time_scale)
+            })
+        if self.args.memory == "redis":
+            redis_port = _free_port()
+            os.environ["MEMORY_REDIS_URL"] = f"redis://127.0.0.1:{redis_port}/0"
+
+        # Imported only now: app.core.config reads the environment on import
+        import uvicorn
+        import app.agents.model as model_module
+        import main
+        from app.core.cassette import CassetteModel, cassette
+        from stubs.jwks_server import StubKeyServer
+        from stubs.mcp_server import StubMCPServer
+        from stubs.redis_server import StubRedisServer
+        from stubs.scripted_model import ScriptedModel
+
+        if not self.args.verbose:
+            # Per-request INFO logs (auth headers, httpx) would dominate the client's output
+            logging.getLogger().setLevel(logging.WARNING)
+        self.mcp = StubMCPServer(port=mcp_port, latency=self.args.mcp_latency).start()
+        self.keys = StubKeyServer(port=keys_port).start()
+        if self.args.memory == "redis":
+            self.redis = StubRedisServer(port=redis_port).start()
+        if not cassette.replaying:
+            # Replays leave the model to get_model(), which serves the cassette
+            self.model = ScriptedModel(latency=self.args.latency, tokens_per_second=self.args.tps)
+            model_module._model = CassetteModel(self.model, cassette) if cassette.recording else self.model
+
+        self._server = uvicorn.Server(uvicorn.Config(
+            main.create_app(), host="127.0.0.1", port=self.port, log_level="warning", access_log=False
+        ))
+        loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=loop.run_until_complete, args=(self._server.serve(),), daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError(f"app could not start on port {self.port}")
+            time.sleep(0.01)
+        return self
+
+    def token(self, user: int) -> str:
+        return self.keys.mint_token(CLIENT_ID, subject=f"load-user-{user}", email=f"load-user-{user}@example.com")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=30)
+        for stub in (self.mcp, self.keys, self.redis):
+            if stub is not None:
+                stub.stop()
+        self._tmp.cleanup()
+
+
+async def wait_ready(client, timeout: float = 60.0) -> Dict[str, Any]:
+    """Poll /ping until warm-up has finished"""
+    deadline = time.perf_counter() + timeout
+    while True:
+        readiness = (await client.get("/ping")).json()["readiness"]
+        if readiness["status"] != "warming" or time.perf_counter() > deadline:
+            return readiness
+        await asyncio.sleep(0.2)
+
+
+class LoadRun:
+    """Virtual users sending prompts of a weighted mix, one session per --turns requests"""
+
+    def __init__(self, stack: Stack, mix: Dict[str, float], turns: int, seed: int):
+        self.stack = stack
+        self.kinds = list(mix)
+        self.weights = [mix[kind] for kind in self.kinds]
+        self.turns = turns
+        self.random = random.Random(seed)
+        self.results: List[Dict[str, Any]] = []
+        self.tokens: Dict[int, str] = {}
+
+    async def _send(self, client, headers: Dict[str, str], kind: str, prompt: str,
+                    actor_id: str, session_id: str, phase: str) -> Any:
+        """POST one prompt and record its latency; returns the status code or exception name"""
+        start = time.perf_counter()
+        try:
+            response = await client.post("/invocations", headers=headers, json={
+                "prompt": prompt, "actor_id": actor_id, "session_id": session_id
+            })
+            status = response.status_code
+            agent = response.json().get("agent", "") if status == 200 else ""
+        except Exception as e:
+            status, agent = type(e).__name__, ""
+        self.results.append({
+            "kind": kind, "agent": agent, "status": status, "seconds": time.perf_counter() - start, "phase": phase
+        })
+        return status
+
+    def _pick(self, had_reading: bool) -> str:
+        kind = self.random.choices(self.kinds, self.weights)[0]
+        if kind == "followup" and not had_reading:
+            return "tarot"
+        return kind
+
+    async def _user(self, client, user: int, requests: "itertools.count", total: int, phase: str):
+        headers = {AUTH_HEADER: f"Bearer {self.tokens.setdefault(user, self.stack.token(user))}"}
+        session, turn, had_reading = None, self.turns, False
+        while next(requests) < total:
+            if turn >= self.turns:
+                session, turn, had_reading = f"{phase}-{user}-{time.time_ns()}", 0, False
+            kind = self._pick(had_reading)
+            prompt = self.random.choice(PROMPTS[kind])
+            status = await self._send(client, headers, kind, prompt, f"load-user-{user}", session, phase)
+            turn += 1
+            had_reading = had_reading or (kind == "tarot" and status == 200)
+
+    async def run(self, client, total: int, concurrency: int, phase: str) -> float:
+        requests = itertools.count()
+        start = time.perf_counter()
+        await asyncio.gather(*(self._user(client, user, requests, total, phase) for user in range(concurrency)))
+        return time.perf_counter() - start
+
+
+class ReplayRun(LoadRun):
+    """
+    A cassette's recorded requests, sent again
+
+    Requests are grouped into their sessions; each virtual user takes the
+    next session and sends its requests in recorded order, so every session
+    builds the same history and draws the same cards as when it was recorded.
+    """
+
+    def __init__(self, stack: Stack, recorded: List[Dict[str, Any]]):
+        self.stack = stack
+        self.results: List[Dict[str, Any]] = []
+        self.tokens: Dict[int, str] = {}
+        self.sessions: "OrderedDict[tuple, List[Dict[str, Any]]]" = OrderedDict()
+        for item in recorded:
+            self.sessions.setdefault((item["actor_id"], item["session_id"]), []).append(item)
+        self.total = len(recorded)
+
+    @staticmethod
+    def _kind(prompt: str) -> str:
+        return next((kind for kind, prompts in PROMPTS.items() if prompt in prompts), "recorded")
+
+    async def _user(self, client, user: int, sessions, total: int, phase: str):
+        headers = {AUTH_HEADER: f"Bearer {self.tokens.setdefault(user, self.stack.token(user))}"}
+        for (actor_id, session_id), items in sessions:
+            for item in items:
+                await self._send(client, headers, self._kind(item["prompt"]), item["prompt"], actor_id, session_id, phase)
+
+    async def run(self, client, total: int, concurrency: int, phase: str) -> float:
+        # One shared iterator: each session goes to exactly one user
+        sessions = iter(list(self.sessions.items()))
+        start = time.perf_counter()
+        await asyncio.gather(*(self._user(client, user, sessions, total, phase) for user in range(concurrency)))
+        return time.perf_counter() - start
+
+
+def model_usage(before: Dict, after: Dict, calls_before: Dict, calls_after: Dict) -> Dict[str, Any]:
+    """Model calls and tokens recorded on /metrics, for replays (no scripted model to count them)"""
+    totals = {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+    for labels, (_, total) in after.items():
+        totals[f"{labels[2]}_tokens"] += total - before.get(labels, (0, 0.0))[1]
+    calls = {}
+    for labels, value in calls_after.items():
+        count = int(value - calls_before.get(labels, 0.0))
+        if count:
+            calls["/".join(labels)] = count
+            totals["calls"] += count
+    return {**totals, "calls_by_role": calls}
+
+
+def stage_breakdown(before: Dict, after: Dict, requests: int) -> List[Dict[str, Any]]:
+    """Server-side stage timings recorded during the measured phase"""
+    rows = []
+    for labels, (count, total) in after.items():
+        prev_count, prev_total = before.get(labels, (0, 0.0))
+        count, total = count - prev_count, total - prev_total
+        if count <= 0:
+            continue
+        stage, agent, node = labels
+        rows.append({
+            "stage": stage, "agent": agent, "node": node, "count": count,
+            "mean_ms": round(total / count * 1000, 2),
+            "ms_per_request": round(total / requests * 1000, 2)
+        })
+    order = ["auth", "history", "classify", "node", "agent", "tool", "memory_write"]
+    rows.sort(key=lambda r: (order.index(r["stage"]) if r["stage"] in order else len(order), r["agent"], r["node"]))
+    return rows
+
+
+async def run(stack: Stack, args) -> Dict[str, Any]:
+    import httpx
+    from app.core.cassette import cassette
+    from app.core.config import config
+    from app.core.metrics import metrics
+    from app.core.speculation import speculation
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=stack.url, timeout=args.timeout, limits=limits) as client:
+        readiness = await wait_ready(client)
+        print(
+            f"App {readiness['status']} on {stack.url} (memory={args.memory}, TAROT_MODE={config.TAROT_MODE})"
+            + "".join(f"\n  {stage}: {error}" for stage, error in readiness.get("errors", {}).items())
+        )
+        if cassette.replaying:
+            load = ReplayRun(stack, cassette.load_requests())
+            print(f"Replaying {load.total} requests in {len(load.sessions)} sessions from {cassette.directory}")
+        else:
+            load = LoadRun(stack, parse_mix(args.mix), args.turns, args.seed)
+        # Agents print their answers as they stream; the writes still happen, unread
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+            # A replay's requests are all part of the recording; extra warm-up turns would miss
+            if args.warmup and not cassette.replaying:
+                await load.run(client, args.warmup, min(args.concurrency, args.warmup), "warmup")
+
+            stages_before = metrics.stage_seconds.totals()
+            tokens_before, calls_before = metrics.tokens.totals(), metrics.model_calls.totals()
+            if stack.model is not None:
+                stack.model.reset()
+            total = load.total if cassette.replaying else args.requests
+            elapsed = await load.run(client, total, args.concurrency, "run")
+            stages_after = metrics.stage_seconds.totals()
+            if stack.model is not None:
+                model_totals, model_calls = stack.model.totals(), dict(stack.model.calls)
+            else:
+                usage = model_usage(tokens_before, metrics.tokens.totals(), calls_before, metrics.model_calls.totals())
+                model_calls = usage.pop("calls_by_role")
+                model_totals = usage
+
+    measured = [r for r in load.results if r["phase"] == "run"]
+    ok = [r for r in measured if r["status"] == 200]
+    errors = defaultdict(int)
+    for r in measured:
+        if r["status"] != 200:
+            errors[str(r["status"])] += 1
+    kinds = list(PROMPTS) + ["recorded"]
+    by_kind = {kind: summarize([r["seconds"] for r in ok if r["kind"] == kind]) for kind in kinds}
+    answered_by = defaultdict(int)
+    for r in ok:
+        answered_by[f"{r['kind']}->{r['agent']}"] += 1
+    requests = max(len(measured), 1)
+    return {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "args": vars(args),
+        "config": {key: getattr(config, key, None) for key in CONFIG_KEYS},
+        "requests": len(measured),
+        "errors": dict(errors),
+        "seconds": round(elapsed, 2),
+        "rps": round(len(ok) / elapsed, 2),
+        "latency_ms": summarize([r["seconds"] for r in ok]),
+        "by_kind": {kind: stats for kind, stats in by_kind.items() if stats},
+        "answered_by": dict(answered_by),
+        "model": {
+            "calls_per_request": round(model_totals["calls"] / requests, 2),
+            "input_tokens_per_request": round(model_totals["input_tokens"] / requests),
+            "output_tokens_per_request": round(model_totals["output_tokens"] / requests),
+            "calls_by_role": model_calls
+        },
+        "stages": stage_breakdown(stages_before, stages_after, requests),
+        "cassette": cassette.stats(),
+        "speculation": speculation.stats()
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    print(
+        f"\n{report['requests']} requests in {report['seconds']} s at concurrency {report['args']['concurrency']}: "
+        f"{report['rps']} req/s, errors {report['errors'] or 0}"
+    )
+    print(f"\n{'latency ms':<14}{'count':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'mean':>9}")
+    for name, stats in [("all", report["latency_ms"])] + list(report["by_kind"].items()):
+        if stats:
+            print(f"{name:<14}{stats['count']:>7}{stats['p50']:>9}{stats['p95']:>9}{stats['p99']:>9}{stats['mean']:>9}")
+    model = report["model"]
+    print(
+        f"\nmodel per request: {model['calls_per_request']} calls, "
+        f"{model['input_tokens_per_request']} input / {model['output_tokens_per_request']} output tokens"
+    )
+    cassette = report.get("cassette", {})
+    if cassette.get("mode", "off") != "off":
+        print(
+            f"cassette {cassette['mode']} {cassette['directory']}: {cassette['recorded']} recorded, "
+            f"{cassette['replayed']} replayed, {cassette['misses']} misses"
+        )
+    speculation = report.get("speculation", {})
+    if speculation.get("speculated"):
+        print(
+            f"speculation: {speculation['hits']}/{speculation['speculated']} hits, "
+            f"{speculation['saved_seconds']} s of router time hidden, {speculation['wasted_calls']} calls and "
+            f"{speculation['wasted_input_tokens']} input / {speculation['wasted_output_tokens']} output tokens wasted"
+        )
+    print(f"\n{'stage':<14}{'agent':<12}{'node':<22}{'count':>7}{'mean ms':>10}{'ms/req':>9}")
+    for row in report["stages"]:
+        print(
+            f"{row['stage']:<14}{row['agent']:<12}{row['node']:<22}{row['count']:>7}"
+            f"{row['mean_ms']:>10}{row['ms_per_request']:>9}"
+        )
+
+
+def print_comparison(previous: Dict[str, Any], report: Dict[str, Any]):
+    def change(old, new):
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+    print(f"\nvs {previous.get('started_at', 'previous run')}:")
+    print(f"{'':<26}{'before':>10}{'after':>10}{'change':>9}")
+    print(f"{'req/s':<26}{previous['rps']:>10}{report['rps']:>10}{change(previous['rps'], report['rps']):>9}")
+    rows = [("all", previous["latency_ms"], report["latency_ms"])]
+    rows += [(kind, previous["by_kind"].get(kind, {}), stats) for kind, stats in report["by_kind"].items()]
+    for name, old, new in rows:
+        for key in ("p50", "p95", "p99"):
+            if key in old and key in new:
+                print(f"{name + ' ' + key + ' ms':<26}{old[key]:>10}{new[key]:>10}{change(old[key], new[key]):>9}")
+    old_model, new_model = previous["model"], report["model"]
+    for key in ("calls_per_request", "input_tokens_per_request"):
+        print(f"{key:<26}{old_model[key]:>10}{new_model[key]:>10}{change(old_model[key], new_model[key]):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests")
+    parser.add_argument("--concurrency", type=int, default=16, help="Virtual users sending requests in parallel")
+    parser.add_argument("--warmup", type=int, default=10, help="Requests sent before measuring")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Prompt kinds and weights (kind:weight,...)")
+    parser.add_argument("--turns", type=int, default=4, help="Requests per session before a user starts a new one")
+    parser.add_argument("--latency", type=float, default=0.3, help="Model seconds to first token per call")
+    parser.add_argument("--tps", type=float, default=150.0, help="Model output tokens per second")
+    parser.add_argument("--mcp-latency", type=float, default=0.05, help="Seconds per MCP tool call")
+    parser.add_argument("--memory", choices=["memory", "sqlite", "redis"], default="memory",
+                        help="Memory backend standing in for AgentCore Memory")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Client timeout per request")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for the prompt mix")
+    parser.add_argument("--output", help="Save the run as JSON")
+    parser.add_argument("--compare", help="Earlier run (JSON) to compare against")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument("--record", metavar="DIR", help="Record the run's model and tool calls as a cassette")
+    cassette.add_argument("--replay", metavar="DIR", help="Replay a cassette's requests instead of the prompt mix")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="Replay speed: 1 keeps the recorded timing, 0 does not wait")
+    parser.add_argument("--verbose", action="store_true", help="Keep the app's INFO logs and agent output")
+    args = parser.parse_args()
+    parse_mix(args.mix)
+
+    # Started and stopped outside the client's event loop: the stand-ins run their own loops
+    stack = Stack(args).start()
+    try:
+        report = asyncio.run(run(stack, args))
+    finally:
+        stack.stop()
+    print_report(report)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), report)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
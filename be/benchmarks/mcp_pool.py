@@ -0,0 +1,165 @@
+"""
+MCP tool calls: one shared MCPClient session vs MCPSessionPool
+
+Runs the stub MCP server (stubs/mcp_server.py) in a subprocess and measures
+calls/s at several concurrency levels, then keeps a steady load running
+while the server is killed and restarted, counting failed calls and how long
+each client takes to succeed again. The single-session baseline is how
+app/agents/numerology.py connected before the pool.
+
+    python -m benchmarks.mcp_pool --latency 0.05 --pool-size 4
+    python -m benchmarks.mcp_pool --serial   # server answers one call per session at a time
+"""
+import argparse
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+
+from mcp.client.sse import sse_client
+from strands.tools.mcp import MCPClient
+
+from app.core.mcp_pool import MCPSessionPool
+
+ARGUMENTS = {"full_name": "Ada Lovelace", "birth_date": "1815-12-10"}
+
+
+class StubProcess:
+    """stubs.mcp_server in a child process, so a restart really drops the sockets"""
+
+    def __init__(self, latency: float, serial: bool = False):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.latency = latency
+        self.serial = serial
+        self.proc = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/sse"
+
+    def start(self):
+        command = [sys.executable, "-m", "stubs.mcp_server", "--port", str(self.port), "--latency", str(self.latency)]
+        self.proc = subprocess.Popen(
+            command + (["--serial"] if self.serial else []),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), 0.1).close()
+                return
+            except OSError:
+                time.sleep(0.05)
+        raise RuntimeError("stub MCP server did not start")
+
+    def kill(self):
+        self.proc.kill()
+        self.proc.wait()
+
+
+async def call(client, i: int) -> bool:
+    result = await client.call_tool_async(f"bench-{i}", "calculate_numerology", ARGUMENTS)
+    return result["status"] == "success"
+
+
+async def throughput(client, concurrency: int, calls: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            return await call(client, i)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(calls)))
+    if not all(results):
+        raise RuntimeError(f"{results.count(False)} calls failed")
+    return calls / (time.perf_counter() - start)
+
+
+async def blip(client, server: StubProcess, concurrency: int, downtime: float, duration: float) -> dict:
+    """Steady load across a server restart"""
+    outcomes = []
+    stop_at = time.monotonic() + duration
+
+    async def worker(w):
+        i = 0
+        while time.monotonic() < stop_at:
+            outcomes.append((time.monotonic(), await call(client, w * 100000 + i)))
+            i += 1
+            if not outcomes[-1][1]:
+                await asyncio.sleep(0.05)
+
+    async def restart():
+        await asyncio.sleep(duration / 4)
+        server.kill()
+        killed_at = time.monotonic()
+        await asyncio.sleep(downtime)
+        await asyncio.to_thread(server.start)
+        return killed_at
+
+    results = await asyncio.gather(restart(), *(worker(w) for w in range(concurrency)))
+    killed_at = results[0]
+    after = [(t, ok) for t, ok in outcomes if t >= killed_at]
+    recovered = next((t - killed_at for t, ok in after if ok), None)
+    return {
+        "calls": len(outcomes),
+        "failed": sum(not ok for _, ok in outcomes),
+        "recovered_s": recovered
+    }
+
+
+async def run(args):
+    server = StubProcess(args.latency, args.serial)
+    server.start()
+    clients = {
+        "single": lambda: MCPClient(lambda: sse_client(server.url)),
+        f"pool({args.pool_size})": lambda: MCPSessionPool(
+            lambda: sse_client(server.url), size=args.pool_size, call_timeout=10, backoff_base=0.2, backoff_max=2
+        )
+    }
+    try:
+        for label, factory in clients.items():
+            client = factory()
+            health = None
+            await asyncio.to_thread(client.start)
+            if isinstance(client, MCPSessionPool):
+                client.health_interval = 0.5
+                health = asyncio.create_task(client.run_health_checks())
+            rates = []
+            for concurrency in args.concurrency:
+                rate = await throughput(client, concurrency, args.calls)
+                rates.append(f"c={concurrency} {rate:,.0f}/s")
+            print(f"{label:>8}: {', '.join(rates)}")
+
+            outcome = await blip(client, server, args.concurrency[-1], args.downtime, args.duration)
+            recovered = f"{outcome['recovered_s']:.2f}s after the kill" if outcome["recovered_s"] else "never"
+            print(f"          restart: {outcome['failed']}/{outcome['calls']} calls failed, recovered {recovered}")
+            if health is not None:
+                health.cancel()
+                print(f"          {({k: v for k, v in client.stats().items() if k != 'sessions'})}")
+            stop = client.stop if isinstance(client, MCPSessionPool) else lambda: client.stop(None, None, None)
+            try:
+                await asyncio.wait_for(asyncio.to_thread(stop), 10)
+            except Exception:
+                pass
+    finally:
+        server.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub server seconds per tool call")
+    parser.add_argument("--serial", action="store_true", help="Stub answers one call per session at a time")
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--calls", type=int, default=200, help="Calls per concurrency level")
+    parser.add_argument("--downtime", type=float, default=1.0, help="Seconds the server stays down")
+    parser.add_argument("--duration", type=float, default=8.0, help="Seconds of load around the restart")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
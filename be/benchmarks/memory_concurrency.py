@@ -0,0 +1,76 @@
+"""
+Load test: blocking vs executor-backed ShortTermMemory calls
+
+Simulates /invocations turns on a single event loop (one uvicorn worker).
+Each turn reads history, awaits simulated agent work and writes the turn
+back. The memory backend is replaced by a stand-in that sleeps like a slow
+AgentCore round trip, so no AWS access is needed.
+
+    python -m benchmarks.memory_concurrency --requests 64 --latency 0.05
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.memory import ShortTermMemory
+from app.core.memory_backends import MemoryBackend
+
+
+class SlowMemoryBackend(MemoryBackend):
+    """Blocking stand-in backend with fixed per-call latency"""
+
+    name = "slow"
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def list_events(self, actor_id, session_id, max_results):
+        time.sleep(self.latency)
+        return []
+
+    def create_event(self, actor_id, session_id, messages):
+        time.sleep(self.latency)
+        return {}
+
+
+async def blocking_turn(memory: ShortTermMemory, agent_time: float):
+    memory.list_events(actor_id="bench", session_id="s")
+    await asyncio.sleep(agent_time)
+    memory.create_event(messages=[("hi", "USER"), ("hello", "ASSISTANT")], actor_id="bench", session_id="s")
+
+
+async def async_turn(memory: ShortTermMemory, agent_time: float):
+    await memory.alist_events(actor_id="bench", session_id="s")
+    await asyncio.sleep(agent_time)
+    await memory.acreate_event(messages=[("hi", "USER"), ("hello", "ASSISTANT")], actor_id="bench", session_id="s")
+
+
+async def run(turn, memory: ShortTermMemory, requests: int, agent_time: float) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(turn(memory, agent_time) for _ in range(requests)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=64, help="Concurrent requests")
+    parser.add_argument("--latency", type=float, default=0.05, help="Memory call latency (s)")
+    parser.add_argument("--agent-time", type=float, default=0.2, help="Simulated agent work per turn (s)")
+    parser.add_argument("--workers", type=int, default=8, help="Memory executor size")
+    args = parser.parse_args()
+
+    memory = ShortTermMemory(SlowMemoryBackend(args.latency), max_workers=args.workers, timeout=60)
+
+    serial_floor = 2 * args.latency + args.agent_time
+    for name, turn in (("blocking", blocking_turn), ("executor", async_turn)):
+        elapsed = asyncio.run(run(turn, memory, args.requests, args.agent_time))
+        print(
+            f"{name:>9}: {args.requests} requests in {elapsed:.2f}s "
+            f"-> {args.requests / elapsed:.1f} req/s, "
+            f"effective concurrency {args.requests * serial_floor / elapsed:.1f}"
+        )
+    memory.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: cost of the /metrics instrumentation per stage and per request
+
+Times the calls routes make around every request - a stage timer, a direct
+stage observation, the request tracker - and recording a finished graph run,
+plus rendering /metrics. A recorded stage is a graph node, an agent or a
+tool call; agents also record their tokens, model calls and cost. The graph
+results are real tarot runs (swarm and pipeline) on the scripted stand-in
+model (stubs/scripted_model.py), so node_usages walks the same shapes it
+does in production. Each benchmark uses its own registry, not the global one.
+
+    python -m benchmarks.metrics_overhead --iterations 100000
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("MEMORY_BACKEND", "memory")
+os.environ.setdefault("NUMEROLOGY_TOOLS", "local")
+
+import app.agents.model as model_module
+from app.agents.graph import create_agent_graph_with_history
+from app.api.results import node_usages
+from app.core.config import config
+from app.core.metrics import Metrics
+from stubs.scripted_model import ScriptedModel
+
+QUESTION = "Can you do a three card reading about my career change?"
+
+
+def per_call_us(func, iterations: int) -> float:
+    """Best of five runs, in microseconds per call"""
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / iterations * 1e6
+
+
+async def tarot_result(mode: str):
+    config.TAROT_MODE = mode
+    graph = create_agent_graph_with_history(intent="tarot", fresh=True)
+    return await graph.invoke_async(QUESTION, invocation_state={
+        "actor_id": "bench", "session_id": mode, "question": QUESTION,
+        "callback_handler": lambda **_: None
+    })
+
+
+def run(args):
+    model_module._model = ScriptedModel(latency=0, tokens_per_second=1e9, time_scale=0)
+    metrics = Metrics()
+
+    def stage_timer():
+        with metrics.stage("history"):
+            pass
+
+    def tracked_request():
+        with metrics.track_request("invocations") as tracked:
+            tracked.agent = "tarot"
+
+    rows = [
+        ("stage timer (empty block)", per_call_us(stage_timer, args.iterations), "stage"),
+        ("observe_stage", per_call_us(lambda: metrics.observe_stage("classify", 0.0004), args.iterations), "stage"),
+        ("track_request", per_call_us(tracked_request, args.iterations), "request")
+    ]
+    for mode in ("swarm", "pipeline"):
+        result = asyncio.run(tarot_result(mode))
+        # Computed once per request by extract_graph_result and shared with record_graph
+        usages = node_usages(result)
+        rows.append((f"node_usages ({mode})", per_call_us(lambda: node_usages(result), args.iterations // 10), "request"))
+        stages = len(result.results) + len(usages) + sum(calls for u in usages for calls, _ in u.tools.values())
+        recorder = Metrics()
+        us = per_call_us(lambda: recorder.record_graph(result, usages), args.iterations // 10)
+        rows.append((f"record_graph ({mode}, {stages} stages)", us, "request"))
+        rows.append(("  per stage", us / stages, "stage"))
+    rows.append(("render /metrics", per_call_us(metrics.render, max(args.iterations // 1000, 10)), "scrape"))
+    print(f"{len(metrics.render().splitlines())} lines in the rendered test registry\n")
+
+    print(f"{'operation':<36}{'us':>9}  per")
+    for name, us, unit in rows:
+        print(f"{name:<36}{us:>9.2f}  {unit}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100000, help="Calls per timed loop")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Startup benchmark: import time, warm-up time and first-request latency
+
+Each measurement runs in a fresh interpreter so module caches are cold.
+Three boot modes are compared:
+
+    lazy      STARTUP_WARMUP=false; the first request loads what it needs
+    cold      warm-up with no snapshot: prompts and MCP tools are fetched
+    snapshot  warm-up restoring the snapshot written by the cold runs
+
+The snapshot is only written when a cold warm-up fully succeeds (prompts
+and a live MCP tool list). The MCP server is the stub from
+stubs/mcp_server.py unless --mcp-uri points somewhere else, so the
+benchmark runs offline; prompts come from Prompt Management when prompt IDs
+are configured, else from prompts/.
+
+    python -m benchmarks.startup --runs 3
+    python -m benchmarks.startup --invoke   # include a real model call (needs AWS)
+
+First-request latency covers history loading and graph checkout; --invoke
+adds graph.invoke_async on a real Bedrock model.
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+CHILD = r"""
+import asyncio, json, sys, time
+start = time.perf_counter()
+import main
+import_s = time.perf_counter() - start
+
+from app.api import routes
+from app.api import lifespan as lifespan_module
+from app.api.lifespan import lifespan
+from app.core.readiness import readiness
+
+async def run(invoke, prompt, ready_timeout):
+    out = {"import_s": import_s}
+    async with lifespan(main.app):
+        t0 = time.perf_counter()
+        if routes.config.STARTUP_WARMUP:
+            await asyncio.to_thread(readiness.wait, ready_timeout)
+        out["ready_s"] = time.perf_counter() - t0
+        out["readiness"] = readiness.stats()
+
+        request = routes.ChatRequest(prompt=prompt, session_id=f"bench-{time.time_ns()}")
+        t0 = time.perf_counter()
+        try:
+            messages = await routes._load_history(request)
+            prediction = routes.intent_classifier.classify(prompt)
+            graph, intent = await routes._create_graph(request, messages, prediction)
+            out["first_setup_s"] = time.perf_counter() - t0
+            if invoke:
+                await graph.invoke_async(request.prompt)
+                out["first_invoke_s"] = time.perf_counter() - t0
+        except Exception as e:
+            out["first_error"] = f"{type(e).__name__}: {e}"
+        # Let snapshot saving / revalidation finish before shutting down
+        if lifespan_module._warm_up_task is not None:
+            await lifespan_module._warm_up_task
+    return out
+
+print("BENCH " + json.dumps(asyncio.run(run(sys.argv[1] == "1", sys.argv[2], float(sys.argv[3])))))
+"""
+
+
+def run_child(
+    warmup: bool, invoke: bool, prompt: str, ready_timeout: float, memory_backend: str, snapshot: str, mcp_uri: str
+) -> dict:
+    env = dict(
+        os.environ,
+        STARTUP_WARMUP="true" if warmup else "false",
+        MEMORY_BACKEND=memory_backend,
+        WARM_SNAPSHOT_PATH=snapshot,
+        MCP_SERVER_URI=mcp_uri
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD, "1" if invoke else "0", prompt, str(ready_timeout)],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    for line in proc.stdout.splitlines():
+        if line.startswith("BENCH "):
+            return json.loads(line[len("BENCH "):])
+    raise RuntimeError(f"benchmark child failed:\n{proc.stdout[-2000:]}\n{proc.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per mode")
+    parser.add_argument("--invoke", action="store_true", help="Also run the first request's graph (needs AWS)")
+    parser.add_argument("--prompt", default="Hello!", help="First request prompt")
+    parser.add_argument("--memory-backend", default="memory", help="MEMORY_BACKEND for the child processes")
+    parser.add_argument("--ready-timeout", type=float, default=120.0, help="Max seconds to wait for warm-up")
+    parser.add_argument("--mcp-uri", help="MCP server to warm up against (default: a local stub server)")
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        mcp_uri = args.mcp_uri
+        if mcp_uri is None:
+            from stubs.mcp_server import StubMCPServer
+            mcp_uri = stack.enter_context(StubMCPServer()).url
+        run_modes(args, mcp_uri)
+
+
+def run_modes(args, mcp_uri: str):
+    snapshot = os.path.join(tempfile.mkdtemp(prefix="startup-bench-"), "warm_snapshot.json")
+    for label in ("lazy", "cold", "snapshot"):
+        if label == "snapshot" and not os.path.exists(snapshot):
+            print(f"{label:>8}: skipped, cold warm-up did not write a snapshot (see errors above)")
+            continue
+        runs = []
+        for _ in range(args.runs):
+            if label == "cold" and os.path.exists(snapshot):
+                os.remove(snapshot)
+            runs.append(run_child(
+                label != "lazy", args.invoke, args.prompt, args.ready_timeout, args.memory_backend, snapshot, mcp_uri
+            ))
+        metrics = ["import_s", "ready_s", "first_setup_s"] + (["first_invoke_s"] if args.invoke else [])
+        summary = ", ".join(
+            f"{metric[:-2]} {statistics.median(r[metric] for r in runs) * 1000:.0f} ms"
+            for metric in metrics if all(metric in r for r in runs)
+        )
+        print(f"{label:>8}: {summary}")
+        if "first_error" in runs[-1]:
+            print(f"          first request failed: {runs[-1]['first_error'][:160]}")
+        if label != "lazy":
+            readiness = runs[-1]["readiness"]
+            print(f"          status {readiness['status']}, stages {readiness['stages']}")
+            for stage, error in readiness["errors"].items():
+                print(f"          {stage}: {error[:120]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: tarot readings through the swarm vs the fixed pipeline
+
+Runs the same reading requests through the tarot node built with
+TAROT_MODE=swarm and TAROT_MODE=pipeline, on the scripted stand-in model
+(stubs/scripted_model.py), and reports model calls, input/output tokens and
+wall-clock time per reading. The router is skipped (the graph is built for
+the tarot intent) since both modes share it.
+
+Model time is `latency` per call plus output tokens at `tokens_per_second`;
+--time-scale shrinks the sleeps to keep the run short and times are reported
+scaled back up.
+
+    python -m benchmarks.tarot_pipeline --readings 3 --latency 0.6 --tps 60
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("MEMORY_BACKEND", "memory")
+os.environ.setdefault("NUMEROLOGY_TOOLS", "local")
+
+import app.agents.model as model_module
+from app.agents.graph import create_agent_graph_with_history
+from app.api.routes import ChatRequest, _build_chat_response
+from app.core.config import config
+from stubs.scripted_model import ScriptedModel
+
+QUESTIONS = [
+    ("three card", "Can you do a three card reading about my career change?"),
+    ("relationship", "Do a relationship reading for me and my partner"),
+    ("celtic cross", "I'd like a Celtic Cross reading about the year ahead")
+]
+
+
+async def run_reading(mode: str, question: str, model: ScriptedModel, session: str):
+    config.TAROT_MODE = mode
+    graph = create_agent_graph_with_history(intent="tarot", fresh=True)
+    model.reset()
+    start = time.perf_counter()
+    result = await graph.invoke_async(question, invocation_state={
+        "actor_id": "bench", "session_id": session, "question": question,
+        # Keep the agents from printing their output
+        "callback_handler": lambda **_: None
+    })
+    elapsed = time.perf_counter() - start
+    response = _build_chat_response(ChatRequest(prompt=question, session_id=session), result)
+    return elapsed / model.time_scale, model.totals(), len(response.card_list or [])
+
+
+async def run(args):
+    model = ScriptedModel(latency=args.latency, tokens_per_second=args.tps, time_scale=args.time_scale)
+    model_module._model = model
+
+    print(f"{'reading':<14}{'mode':<10}{'calls':>7}{'input tok':>11}{'output tok':>12}{'cards':>7}{'wall s':>9}")
+    summary = {}
+    for label, question in QUESTIONS:
+        for mode in ("swarm", "pipeline"):
+            runs = [await run_reading(mode, question, model, f"{mode}-{i}") for i in range(args.readings)]
+            wall = statistics.median(r[0] for r in runs)
+            totals = runs[-1][1]
+            summary[(label, mode)] = (totals["calls"], wall)
+            print(
+                f"{label:<14}{mode:<10}{totals['calls']:>7}{totals['input_tokens']:>11}"
+                f"{totals['output_tokens']:>12}{runs[-1][2]:>7}{wall:>9.2f}"
+            )
+    print()
+    for label, _ in QUESTIONS:
+        swarm_calls, swarm_wall = summary[(label, "swarm")]
+        calls, wall = summary[(label, "pipeline")]
+        print(f"{label}: {swarm_calls} -> {calls} calls, {swarm_wall / wall:.1f}x faster")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readings", type=int, default=3, help="Readings per question and mode (median time)")
+    parser.add_argument("--latency", type=float, default=0.6, help="Modelled seconds to first token per call")
+    parser.add_argument("--tps", type=float, default=60.0, help="Modelled output tokens per second")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="Factor applied to modelled sleeps")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
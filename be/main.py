@@ -8,6 +8,7 @@ from app.core.config import config
 import uvicorn
 
 from app.auth import google_auth_middleware
+from app.api.lifespan import lifespan
 
 import logging
 import sys
@@ -28,7 +29,8 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title="Bedrock Agent Runtime API",
         description="Multi-agent system with tarot swarm, numerology, and welcome agents",
-        version="1.0.0"
+        version="1.0.0",
+        lifespan=lifespan
     )
 
     app.middleware("http")(google_auth_middleware)
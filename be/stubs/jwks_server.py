@@ -0,0 +1,129 @@
+"""
+Stand-in for Google's signing key endpoint
+
+Serves a JWKS document for a locally generated RSA key and mints ID tokens
+signed with it, so AUTH_MODE=jwks can be exercised offline:
+
+    python -m stubs.jwks_server --port 8765 --client-id local-client
+
+then start the API with:
+
+    AUTH_MODE=jwks GOOGLE_CLIENT_ID=local-client \\
+    GOOGLE_CERTS_URL=http://127.0.0.1:8765/oauth2/v3/certs python main.py
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+CERTS_PATH = "/oauth2/v3/certs"
+
+
+class StubKeyServer:
+    """Serve a JWKS for a freshly generated RSA key and mint tokens with it"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, max_age: int = 3600):
+        self.max_age = max_age
+        self.kid = uuid.uuid4().hex
+        self._private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        public_jwk = json.loads(RSAAlgorithm.to_jwk(self._private_key.public_key()))
+        public_jwk.update({"kid": self.kid, "alg": "RS256", "use": "sig"})
+        self.jwks = {"keys": [public_jwk]}
+        self.requests = 0
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def certs_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{CERTS_PATH}"
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != CERTS_PATH:
+                    self.send_error(404)
+                    return
+                stub.requests += 1
+                body = json.dumps(stub.jwks).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", f"public, max-age={stub.max_age}, must-revalidate")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def mint_token(
+        self,
+        audience: str,
+        subject: str = "stub-user",
+        email: str = "stub-user@example.com",
+        lifetime: int = 3600,
+        issuer: str = "https://accounts.google.com",
+        **extra_claims: Any
+    ) -> str:
+        """Mint an RS256 ID token shaped like Google's"""
+        now = int(time.time())
+        claims: Dict[str, Any] = {
+            "iss": issuer,
+            "aud": audience,
+            "sub": subject,
+            "email": email,
+            "email_verified": True,
+            "iat": now,
+            "exp": now + lifetime,
+        }
+        claims.update(extra_claims)
+        return jwt.encode(claims, self._private_key, algorithm="RS256", headers={"kid": self.kid})
+
+    def start(self) -> "StubKeyServer":
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubKeyServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for Google's JWKS endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--client-id", default="local-client", help="Audience for minted tokens")
+    parser.add_argument("--max-age", type=int, default=3600, help="Cache-Control max-age for the key set")
+    args = parser.parse_args()
+
+    server = StubKeyServer(args.host, args.port, args.max_age)
+    print(f"🔑 Serving JWKS at {server.certs_url}")
+    print(f"🎫 Bearer token (aud={args.client_id}):")
+    print(server.mint_token(args.client_id))
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
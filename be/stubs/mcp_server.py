@@ -0,0 +1,163 @@
+"""
+Stand-in for the numerology MCP server (SSE transport)
+
+Serves a `calculate_numerology` tool (backed by app/tools/numerology_calc.py)
+with optional artificial latency, and can drop every connection periodically
+to exercise reconnects:
+
+    python -m stubs.mcp_server --port 8001 --latency 0.2 --blip-every 30
+
+then start the API with MCP_SERVER_URI=http://127.0.0.1:8001/sse. --serial
+answers one call per session at a time, like servers that do not multiplex
+requests on a session.
+"""
+import argparse
+import asyncio
+import socket
+import threading
+import time
+from typing import Dict, Optional
+
+import uvicorn
+from mcp.server.fastmcp import Context, FastMCP
+
+from app.tools.numerology_calc import core_numbers
+
+class StubMCPServer:
+    """Serve the stub MCP tools over SSE in a background thread"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, serial: bool = False):
+        if not port:
+            with socket.socket() as sock:
+                sock.bind((host, 0))
+                port = sock.getsockname()[1]
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.serial = serial
+        self._session_locks: Dict[int, asyncio.Lock] = {}
+        self.calls = 0
+        self.connections = 0
+        self.mcp = FastMCP("numerology-stub")
+        self._register_tools()
+        self._server: Optional[uvicorn.Server] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/sse"
+
+    def _register_tools(self):
+        stub = self
+
+        @self.mcp.tool()
+        async def calculate_numerology(full_name: str = "", birth_date: str = "", ctx: Context = None) -> Dict[str, object]:
+            """Calculate every core numerology number for a name and/or birth date.
+
+            Args:
+                full_name: Full birth name
+                birth_date: Birth date as YYYY-MM-DD
+            """
+            stub.calls += 1
+            if stub.serial:
+                lock = stub._session_locks.setdefault(id(ctx.session), asyncio.Lock())
+                async with lock:
+                    await asyncio.sleep(stub.latency)
+            elif stub.latency:
+                await asyncio.sleep(stub.latency)
+            return core_numbers(full_name, birth_date)
+
+    def _app(self):
+        app = self.mcp.sse_app()
+        stub = self
+
+        async def counting_app(scope, receive, send):
+            if scope["type"] == "http" and scope["path"] == "/sse":
+                stub.connections += 1
+            await app(scope, receive, send)
+
+        return counting_app
+
+    def start(self) -> "StubMCPServer":
+        """Serve in a background thread and wait until it accepts connections"""
+        self._server = uvicorn.Server(uvicorn.Config(
+            self._app(), host=self.host, port=self.port, log_level="warning", timeout_graceful_shutdown=0
+        ))
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_until_complete, args=(self._server.serve(),), daemon=True
+        )
+        self._thread.start()
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError(f"stub MCP server could not bind {self.host}:{self.port}")
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        """Stop serving, dropping every open SSE stream"""
+        if self._server is not None:
+            server = self._server
+
+            def abort_connections():
+                # Reset sockets like a crashed server would, instead of leaving them to the GC
+                for connection in list(server.server_state.connections):
+                    connection.transport.abort()
+
+            self._loop.call_soon_threadsafe(abort_connections)
+            self._server.should_exit = True
+            self._server.force_exit = True
+            self._thread.join()
+            # A forced exit skips lifespan shutdown and leaves SSE watchers behind
+            lifespan = getattr(server, "lifespan", None)
+            if lifespan is not None:
+                self._loop.run_until_complete(lifespan.shutdown())
+            pending = asyncio.all_tasks(self._loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            self._loop.close()
+            self._server = None
+
+    def blip(self, downtime: float = 1.0):
+        """Drop all connections and refuse new ones for `downtime` seconds"""
+        self.stop()
+        time.sleep(downtime)
+        self.start()
+
+    def __enter__(self) -> "StubMCPServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the numerology MCP server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every tool call")
+    parser.add_argument("--serial", action="store_true", help="Answer one call per session at a time")
+    parser.add_argument("--blip-every", type=float, default=0.0, help="Drop all connections every N seconds")
+    parser.add_argument("--blip-downtime", type=float, default=1.0, help="Seconds to stay down per blip")
+    args = parser.parse_args()
+
+    server = StubMCPServer(args.host, args.port, args.latency, args.serial).start()
+    print(f"🔢 Serving stub MCP tools at {server.url}")
+    try:
+        while True:
+            if args.blip_every:
+                time.sleep(args.blip_every)
+                print(f"💥 Dropping connections for {args.blip_downtime}s")
+                server.blip(args.blip_downtime)
+            else:
+                time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Minimal Redis-protocol (RESP2) server for local development
+
+Implements just the list commands used by RedisMemoryBackend, keeping data
+in process memory:
+
+    python -m stubs.redis_server --port 6379
+
+then start the API with MEMORY_BACKEND=redis MEMORY_REDIS_URL=redis://127.0.0.1:6379/0
+"""
+import argparse
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class RespStore:
+    """In-memory list store with per-key expiry"""
+
+    def __init__(self):
+        self.lists: Dict[bytes, List[bytes]] = {}
+        self.expires: Dict[bytes, float] = {}
+
+    def _live(self, key: bytes) -> Optional[List[bytes]]:
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at <= time.time():
+            self.lists.pop(key, None)
+            self.expires.pop(key, None)
+        return self.lists.get(key)
+
+    @staticmethod
+    def _slice(values: List[bytes], start: int, stop: int) -> Tuple[int, int]:
+        n = len(values)
+        start = max(n + start, 0) if start < 0 else start
+        stop = n + stop if stop < 0 else min(stop, n - 1)
+        return start, stop
+
+    def execute(self, args: List[bytes]):
+        command = args[0].upper()
+        if command == b"PING":
+            return "PONG"
+        if command in (b"SELECT", b"CLIENT"):
+            return "OK"
+        if command == b"RPUSH":
+            values = self._live(args[1])
+            if values is None:
+                values = self.lists[args[1]] = []
+            values.extend(args[2:])
+            return len(values)
+        if command == b"LRANGE":
+            values = self._live(args[1]) or []
+            start, stop = self._slice(values, int(args[2]), int(args[3]))
+            return values[start:stop + 1] if start <= stop else []
+        if command == b"LTRIM":
+            values = self._live(args[1])
+            if values is not None:
+                start, stop = self._slice(values, int(args[2]), int(args[3]))
+                self.lists[args[1]] = values[start:stop + 1] if start <= stop else []
+            return "OK"
+        if command == b"EXPIRE":
+            if self._live(args[1]) is None:
+                return 0
+            self.expires[args[1]] = time.time() + int(args[2])
+            return 1
+        if command == b"DEL":
+            removed = 0
+            for key in args[1:]:
+                if self._live(key) is not None:
+                    removed += 1
+                self.lists.pop(key, None)
+                self.expires.pop(key, None)
+            return removed
+        if command == b"FLUSHDB":
+            self.lists.clear()
+            self.expires.clear()
+            return "OK"
+        return Exception(f"ERR unknown command '{args[0].decode(errors='replace')}'")
+
+
+def _encode(value) -> bytes:
+    if isinstance(value, Exception):
+        return f"-{value}\r\n".encode()
+    if isinstance(value, str):
+        return f"+{value}\r\n".encode()
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, list):
+        return f"*{len(value)}\r\n".encode() + b"".join(_encode(v) for v in value)
+    if value is None:
+        return b"$-1\r\n"
+    return f"${len(value)}\r\n".encode() + value + b"\r\n"
+
+
+async def _read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        # Inline command (e.g. from telnet)
+        return line.strip().split()
+    args = []
+    for _ in range(int(line[1:])):
+        size = int((await reader.readline())[1:])
+        args.append((await reader.readexactly(size + 2))[:-2])
+    return args
+
+
+class StubRedisServer:
+    """Serve a RespStore over TCP on a background event loop"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.store = RespStore()
+        self.commands = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                args = await _read_command(reader)
+                if not args:
+                    break
+                self.commands += 1
+                writer.write(_encode(self.store.execute(args)))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start(self) -> "StubRedisServer":
+        """Serve in a background thread"""
+        def run():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self.serve())
+            except asyncio.CancelledError:
+                pass
+
+        threading.Thread(target=run, daemon=True).start()
+        self._ready.wait(timeout=5)
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+
+    def __enter__(self) -> "StubRedisServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minimal Redis-protocol stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+
+    server = StubRedisServer(args.host, args.port)
+    print(f"🧰 Stub Redis listening on redis://{args.host}:{args.port}/0")
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Stand-in Bedrock model that plays the agents' parts offline
+
+ScriptedModel answers every agent of the graph the way the real model tends
+to, recognising the agent from the first line of its system prompt:
+
+- router: the intent named by the prompt's wording (tarot, numerology or
+  welcome)
+- welcome: a short greeting
+- numerology: calls calculate_numerology (MCP or local) with the name and
+  date found in the prompt, then explains the numbers
+- spread_reader (swarm): draws, looks up the meanings, consults
+  card_interpreter and life_advisor by handoff, then writes the reading
+- card_interpreter / life_advisor (swarm): a consultation, handed back
+- card_interpreter / life_advisor in pipeline or follow-up mode: one answer
+
+Each call sleeps for `latency` plus its output tokens at `tokens_per_second`,
+scaled by `time_scale`, and reports usage with tokens estimated at four
+characters each, so runs compare model calls, tokens and serial latency.
+
+    model = ScriptedModel(latency=0.5, tokens_per_second=60)
+    app.agents.model._model = model
+"""
+import asyncio
+import json
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from strands.models.model import Model
+
+ROLES = [
+    ("Router Agent", "router"),
+    ("Tarot Spread Reader", "spread_reader"),
+    ("Tarot Card Interpreter", "card_interpreter"),
+    ("Tarot Life Advisor", "life_advisor"),
+    ("Numerology Expert", "numerology"),
+    ("Welcome Guide", "welcome")
+]
+_CARDS = re.compile(r"CARDS:\s*\[[^\]]*\]")
+_SPREAD_WORDS = [("celtic cross", "celtic_cross"), ("relationship", "relationship"), ("one card", "single")]
+_NUMEROLOGY_WORDS = re.compile(r"numerolog|life path|birth|born|\bnumbers?\b", re.IGNORECASE)
+_TAROT_WORDS = re.compile(r"tarot|\bcards?\b|reading|spread|\bdraw", re.IGNORECASE)
+_NAME = re.compile(r"name is ([A-Z][a-z]+(?: [A-Z][a-z]+)*)")
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# Output lengths in tokens, roughly what the real prompts produce
+LENGTHS = {
+    "handoff": 80,
+    "after_tool": 20,
+    "consultation": 350,
+    "card": 150,
+    "welcome": 120,
+    "numerology": 400,
+    "advice": 500,
+    "reading": 700
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _filler(tokens: int, lead: str = "") -> str:
+    words = "the cards point toward patience and a clear next step in this season".split()
+    out, size = [lead] if lead else [], len(lead)
+    i = 0
+    while size < tokens * 4:
+        out.append(words[i % len(words)])
+        size += len(out[-1]) + 1
+        i += 1
+    return " ".join(out)
+
+
+def _texts(messages: List[Dict[str, Any]]) -> Iterable[str]:
+    for message in messages:
+        for block in message.get("content", []):
+            if "text" in block:
+                yield block["text"]
+            elif "toolResult" in block:
+                for item in block["toolResult"].get("content", []):
+                    if "text" in item:
+                        yield item["text"]
+                    elif "json" in item:
+                        yield json.dumps(item["json"])
+            elif "toolUse" in block:
+                yield json.dumps(block["toolUse"].get("input", {}))
+
+
+class ScriptedModel(Model):
+    """Offline model with scripted agent behaviour and modelled latency"""
+
+    def __init__(self, latency: float = 0.5, tokens_per_second: float = 60.0, time_scale: float = 1.0):
+        self.config: Dict[str, Any] = {"model_id": "scripted"}
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.time_scale = time_scale
+        self._lock = threading.Lock()
+        self.calls: Counter = Counter()
+        self.tokens: Dict[str, Counter] = defaultdict(Counter)
+
+    def update_config(self, **model_config: Any):
+        self.config.update(model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError("ScriptedModel does not produce structured output")
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+            self.tokens.clear()
+
+    def totals(self) -> Dict[str, int]:
+        """Calls and tokens over every role"""
+        with self._lock:
+            return {
+                "calls": sum(self.calls.values()),
+                "input_tokens": sum(t["input"] for t in self.tokens.values()),
+                "output_tokens": sum(t["output"] for t in self.tokens.values())
+            }
+
+    @staticmethod
+    def role(system_prompt: Optional[str]) -> str:
+        head = (system_prompt or "").lstrip()[:200]
+        for marker, role in ROLES:
+            if marker in head:
+                if "**Pipeline mode:**" in system_prompt or "**Follow-up mode:**" in system_prompt:
+                    return f"{role}:single"
+                return role
+        return "other"
+
+    def _respond(self, role: str, messages: List[Dict[str, Any]], tools: List[str] = ()) -> Dict[str, Any]:
+        """The next step of the role's script: {"text": ...} or {"tool": name, "input": {...}}"""
+        last = messages[-1]["content"] if messages else []
+        tool_results = [b["toolResult"] for b in last if "toolResult" in b]
+        text = "\n".join(_texts(messages))
+        cards = _CARDS.findall(text)
+        if tool_results:
+            # Strands calls the model again after every tool result
+            tool_text = "".join(c.get("text", "") for c in tool_results[-1].get("content", []))
+            if role == "spread_reader" and tool_text.startswith("CARDS:"):
+                labels = tool_text[len("CARDS: ["):].split("]")[0]
+                return {"tool": "lookup_card_meanings", "input": {
+                    "cards": [c.strip() for c in labels.split(",")], "spread": self._spread(text)
+                }}
+            if role == "spread_reader" and "Keywords" in tool_text:
+                return {"tool": "handoff_to_agent", "input": {
+                    "agent_name": "card_interpreter",
+                    "message": f"{cards[-1]} Please add the symbolism of these cards. " + _filler(LENGTHS["handoff"] - 20)
+                }}
+            if role == "numerology":
+                return {"text": _filler(LENGTHS["numerology"], "**Your Numbers**")}
+            return {"text": _filler(LENGTHS["after_tool"], "Handing over.")}
+
+        if role == "router":
+            prompt = "\n".join(_texts(messages[-1:]))
+            if _NUMEROLOGY_WORDS.search(prompt):
+                return {"text": "numerology"}
+            return {"text": "tarot" if _TAROT_WORDS.search(prompt) else "welcome"}
+        if role == "welcome":
+            return {"text": _filler(LENGTHS["welcome"], "Welcome!")}
+        if role == "numerology":
+            prompt = "\n".join(_texts(messages[-1:]))
+            if "calculate_numerology" not in tools:
+                return {"text": _filler(LENGTHS["numerology"], "**Your Numbers**")}
+            name, date = _NAME.search(prompt), _DATE.search(prompt)
+            return {"tool": "calculate_numerology", "input": {
+                "full_name": name.group(1) if name else "", "birth_date": date.group(0) if date else ""
+            }}
+        if role == "spread_reader":
+            visited = re.search(r"Previous agents who worked on this: (.*)", text)
+            visited = visited.group(1) if visited else ""
+            if not visited:
+                return {"tool": "draw_tarot_cards", "input": {"spread": self._spread(text)}}
+            if "life_advisor" not in visited:
+                return {"tool": "handoff_to_agent", "input": {
+                    "agent_name": "life_advisor",
+                    "message": f"{cards[-1]} Please give practical guidance. " + _filler(LENGTHS["handoff"] - 20)
+                }}
+            return {"text": _filler(LENGTHS["reading"], f"{cards[-1]}\n\n**Your Reading**")}
+        if role in ("card_interpreter", "life_advisor"):
+            return {"tool": "handoff_to_agent", "input": {
+                "agent_name": "spread_reader",
+                "message": f"{cards[-1] if cards else ''} " + _filler(LENGTHS["consultation"])
+            }}
+        if role == "card_interpreter:single":
+            return {"text": _filler(LENGTHS["card"], "**Interpretation**")}
+        if role == "life_advisor:single":
+            return {"text": _filler(LENGTHS["advice"], "**Your Reading**")}
+        return {"text": _filler(LENGTHS["consultation"])}
+
+    @staticmethod
+    def _spread(text: str) -> str:
+        lowered = text.lower()
+        for words, spread in _SPREAD_WORDS:
+            if words in lowered:
+                return spread
+        return "three_card"
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        role = self.role(system_prompt)
+        tools = [spec.get("name", "") for spec in tool_specs or []]
+        step = self._respond(role, messages, tools)
+        output = step["text"] if "text" in step else json.dumps(step["input"])
+        prompt_text = (system_prompt or "") + "".join(_texts(messages)) + json.dumps(tool_specs or [])
+        input_tokens, output_tokens = estimate_tokens(prompt_text), estimate_tokens(output)
+        with self._lock:
+            self.calls[role] += 1
+            self.tokens[role]["input"] += input_tokens
+            self.tokens[role]["output"] += output_tokens
+
+        seconds = self.latency + output_tokens / self.tokens_per_second
+        await asyncio.sleep(seconds * self.time_scale)
+
+        yield {"messageStart": {"role": "assistant"}}
+        if "text" in step:
+            yield {"contentBlockStart": {"start": {}}}
+            yield {"contentBlockDelta": {"delta": {"text": output}}}
+            stop_reason = "end_turn"
+        else:
+            tool_use_id = f"scripted-{sum(self.calls.values())}"
+            yield {"contentBlockStart": {"start": {"toolUse": {"name": step["tool"], "toolUseId": tool_use_id}}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": output}}}}
+            stop_reason = "tool_use"
+        yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": stop_reason}}
+        yield {"metadata": {
+            "usage": {"inputTokens": input_tokens, "outputTokens": output_tokens,
+                      "totalTokens": input_tokens + output_tokens},
+            "metrics": {"latencyMs": round(seconds * 1000)}
+        }}
@@ -0,0 +1,107 @@
+"""Tests for tokeninfo verification and the token cache in app/auth.py"""
+import asyncio
+import httpx
+import pytest
+from fastapi import HTTPException
+from app import auth
+from app.auth import TokenCache
+
+VALID = {"email": "ana@example.com", "sub": "1", "expires_in": "3600"}
+
+
+def run_with_google(monkeypatch, statuses, coroutine_fn):
+    """Run a coroutine with tokeninfo answering each call with the next status"""
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        # Let concurrent callers pile up before answering
+        await asyncio.sleep(0.01)
+        code = statuses[min(len(calls), len(statuses)) - 1]
+        return httpx.Response(code, json=VALID if code == 200 else {"error": "invalid_token"})
+
+    async def main():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(auth, "get_http_client", lambda: client)
+        monkeypatch.setattr(auth, "token_cache", TokenCache(negative_ttl=30))
+        try:
+            return await coroutine_fn()
+        finally:
+            await client.aclose()
+
+    return asyncio.run(main()), calls
+
+
+async def _verify_twice():
+    outcomes = []
+    for _ in range(2):
+        try:
+            outcomes.append(await auth.verify_google_token("token"))
+        except HTTPException as e:
+            outcomes.append(e.status_code)
+    return outcomes
+
+
+@pytest.mark.parametrize("code", [500, 502, 503, 429])
+def test_upstream_failure_is_503_and_not_cached(monkeypatch, code):
+    outcomes, calls = run_with_google(monkeypatch, [code, 200], _verify_twice)
+    assert outcomes == [503, VALID]
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("code", [400, 401])
+def test_rejection_is_401_and_negative_cached(monkeypatch, code):
+    outcomes, calls = run_with_google(monkeypatch, [code, 200], _verify_twice)
+    assert outcomes == [401, 401]
+    assert len(calls) == 1
+    assert auth.token_cache.negative_hits == 1
+
+
+def test_valid_token_is_cached(monkeypatch):
+    outcomes, calls = run_with_google(monkeypatch, [200], _verify_twice)
+    assert outcomes == [VALID, VALID]
+    assert len(calls) == 1
+    assert auth.token_cache.hits == 1
+
+
+def test_concurrent_checks_share_one_request(monkeypatch):
+    async def verify_many():
+        return await asyncio.gather(*(auth.verify_google_token("token") for _ in range(10)))
+
+    results, calls = run_with_google(monkeypatch, [200], verify_many)
+    assert results == [VALID] * 10
+    assert len(calls) == 1
+    assert auth.token_cache.coalesced == 9
+
+
+def test_failed_background_key_refresh_is_retried(monkeypatch):
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if len(calls) in (2, 3):
+            return httpx.Response(503)
+        max_age = 0 if len(calls) == 1 else 3600
+        return httpx.Response(200, json={"keys": []}, headers={"cache-control": f"max-age={max_age}"})
+
+    async def main():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(auth, "get_http_client", lambda: client)
+        key_set = auth.GoogleKeySet("https://keys.example/certs")
+        key_set.REFRESH_MARGIN = 0
+        key_set.MIN_FORCED_REFRESH_INTERVAL = 0.01
+        key_set.RETRY_INTERVAL = 0.01
+        try:
+            await key_set.refresh()
+            for _ in range(100):
+                if key_set.refreshes >= 2:
+                    break
+                await asyncio.sleep(0.01)
+            return key_set.refreshes
+        finally:
+            await key_set.close()
+            await client.aclose()
+
+    # Initial fetch, two failed background refreshes, then a successful retry
+    assert asyncio.run(main()) == 2
+    assert len(calls) == 4
@@ -0,0 +1,75 @@
+"""Tests for the card-meaning index in app/tools/card_meanings.py"""
+import json
+import pytest
+from app.tools.card_meanings import CardMeaningIndex, card_meanings
+from app.tools.tarot_deck import CARD_IDS, DECK, find_card
+
+
+def test_every_card_has_both_orientations():
+    assert card_meanings.load() == 2 * len(DECK)
+    for card in DECK:
+        upright, reversed_ = card_meanings.get(card), card_meanings.get(card, True)
+        assert (upright.card, upright.reversed, reversed_.reversed) == (card, False, True)
+        assert upright.keywords and upright.meaning and reversed_.meaning != upright.meaning
+
+
+def test_lookup_follows_the_spread_positions():
+    results = card_meanings.lookup(["The Tower (Reversed)", "Two of Cups", "the sun"], "three_card")
+    assert [(r["card"], r["reversed"], r["position"]) for r in results] == [
+        ("The Tower", True, "Past"), ("Two of Cups", False, "Present"), ("The Sun", False, "Future")
+    ]
+    tower = card_meanings.get(find_card("The Tower")[0], True)
+    assert results[0]["meaning"] == tower.meaning
+    assert results[0]["keywords"] == list(tower.keywords)
+    assert results[0]["suit"] is None
+    assert results[1]["suit"] == card_meanings.suits["Cups"]
+    assert results[1]["position_note"] == card_meanings.positions["Present"]
+
+
+@pytest.mark.parametrize("label, name, reversed_", [
+    ("  the   HIGH priestess ", "The High Priestess", False),
+    ("Tower reversed", "The Tower", True),
+    ("Judgment", "Judgement", False),
+    ("3 of Swords (Reversed)", "Three of Swords", True),
+])
+def test_lookup_accepts_loose_spellings(label, name, reversed_):
+    [result] = card_meanings.lookup([label])
+    assert (result["card"], result["reversed"]) == (name, reversed_)
+
+
+def test_unknown_cards_are_reported_inline():
+    results = card_meanings.lookup(["The Fool", "Eleven of Wands"])
+    assert results[0]["card"] == "The Fool"
+    assert results[1] == {"card": "Eleven of Wands", "error": "Unknown tarot card 'Eleven of Wands'"}
+
+
+def test_cards_past_the_spread_have_no_position():
+    results = card_meanings.lookup(["The Fool", "The Magician"], "single")
+    assert [r["position"] for r in results] == ["Insight", None]
+
+
+def test_unknown_spread_is_rejected():
+    with pytest.raises(ValueError, match="Unknown spread"):
+        card_meanings.lookup(["The Fool"], "horseshoe")
+
+
+def test_format_gives_one_block_per_card():
+    text = card_meanings.format(["The Star", "Nope"], "relationship")
+    star, error = text.split("\n\n")
+    assert star.startswith("The Star | You\nKeywords: ")
+    assert "Position: " in star
+    assert error == "Unknown tarot card 'Nope'"
+
+
+def test_incomplete_file_is_rejected(tmp_path):
+    data = json.loads(card_meanings.path.read_text(encoding="utf-8"))
+    del data["cards"]["Death"]["reversed"]
+    path = tmp_path / "meanings.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    with pytest.raises(ValueError, match=r"Death \(reversed\)"):
+        CardMeaningIndex(path).load()
+
+
+def test_table_is_indexed_by_card_id_and_orientation():
+    index = CardMeaningIndex()
+    assert index.table[CARD_IDS["Death"] * 2 + 1].card.name == "Death"
@@ -0,0 +1,143 @@
+"""Tests for record-then-replay cassettes in app/core/cassette.py"""
+import asyncio
+import pytest
+from strands.models.model import Model
+from strands.types._events import ToolResultEvent
+from strands.types.tools import AgentTool
+from app.core.cassette import CASSETTE_VERSION, Cassette, CassetteMissError, CassetteModel, CassetteTool
+
+MESSAGES = [{"role": "user", "content": [{"text": "Hello there"}]}]
+SYSTEM = "You are a Welcome Guide."
+
+
+class CountingModel(Model):
+    """Streams a numbered answer, with a bytes payload like redacted reasoning"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def update_config(self, **model_config):
+        pass
+
+    def get_config(self):
+        return {"model_id": "test-model"}
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError
+        yield
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        self.calls += 1
+        yield {"messageStart": {"role": "assistant"}}
+        yield {"contentBlockDelta": {"delta": {"reasoningContent": {"redactedContent": b"\x00secret"}}}}
+        yield {"contentBlockDelta": {"delta": {"text": f"Answer {self.calls}"}}}
+        yield {"messageStop": {"stopReason": "end_turn"}}
+
+
+class NumerologyTool(AgentTool):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    @property
+    def tool_name(self):
+        return "calculate_numerology"
+
+    @property
+    def tool_spec(self):
+        return {"name": self.tool_name, "description": "test", "inputSchema": {"json": {"type": "object"}}}
+
+    @property
+    def tool_type(self):
+        return "python"
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        self.calls += 1
+        yield ToolResultEvent({"toolUseId": tool_use["toolUseId"], "status": "success", "content": [{"text": "7"}]})
+
+
+async def collect(model: Model, messages=MESSAGES, system_prompt=SYSTEM):
+    return [event async for event in model.stream(messages, None, system_prompt)]
+
+
+async def call_tool(tool: AgentTool, tool_use_id: str, **arguments):
+    tool_use = {"toolUseId": tool_use_id, "name": tool.tool_name, "input": arguments}
+    events = [event async for event in tool.stream(tool_use, {})]
+    return events[-1].tool_result
+
+
+def test_model_streams_replay_as_recorded_in_order(tmp_path):
+    model = CountingModel()
+    recorder = CassetteModel(model, Cassette(str(tmp_path), "record", time_scale=0))
+
+    async def record():
+        return [await collect(recorder), await collect(recorder), await collect(recorder, system_prompt="Other")]
+
+    recorded = asyncio.run(record())
+    replayer = CassetteModel(None, Cassette(str(tmp_path), "replay", time_scale=0))
+
+    async def replay():
+        # A key's calls replay in order and the last one answers further repeats
+        return [await collect(replayer) for _ in range(3)] + [await collect(replayer, system_prompt="Other")]
+
+    replayed = asyncio.run(replay())
+    assert replayed == [recorded[0], recorded[1], recorded[1], recorded[2]]
+    assert replayed[0][1]["contentBlockDelta"]["delta"]["reasoningContent"]["redactedContent"] == b"\x00secret"
+    assert replayer.cassette.stats()["replayed"] == 4
+    assert model.calls == 3
+
+
+def test_unrecorded_request_is_a_miss(tmp_path):
+    asyncio.run(collect(CassetteModel(CountingModel(), Cassette(str(tmp_path), "record", time_scale=0))))
+    replayer = CassetteModel(None, Cassette(str(tmp_path), "replay", time_scale=0))
+    with pytest.raises(CassetteMissError):
+        asyncio.run(collect(replayer, messages=[{"role": "user", "content": [{"text": "Something else"}]}]))
+    assert replayer.cassette.stats()["misses"] == 1
+
+
+def test_tool_results_replay_with_the_new_tool_use_id(tmp_path):
+    tool = NumerologyTool()
+    recorder = Cassette(str(tmp_path), "record", time_scale=0)
+    [wrapped] = recorder.wrap_tools([tool])
+    assert isinstance(wrapped, CassetteTool)
+    asyncio.run(call_tool(wrapped, "recorded", full_name="Ada Lovelace"))
+
+    [replaying] = Cassette(str(tmp_path), "replay", time_scale=0).wrap_tools([NumerologyTool()])
+    # Arguments match the recording the way tool cache keys do
+    result = asyncio.run(call_tool(replaying, "replayed", full_name="Ada  Lovelace"))
+    assert result == {"toolUseId": "replayed", "status": "success", "content": [{"text": "7"}]}
+    assert tool.calls == 1
+    assert replaying.tool.calls == 0
+
+
+def test_off_mode_leaves_tools_unwrapped(tmp_path):
+    tool = NumerologyTool()
+    assert Cassette(str(tmp_path), "off").wrap_tools([tool]) == [tool]
+
+
+def test_meta_and_requests_round_trip(tmp_path):
+    recorder = Cassette(str(tmp_path), "record", time_scale=0)
+    recorder.model_id = "test-model"
+    recorder.record_request("/invocations", "ana", "s1", "Draw three cards")
+    recorder.record_request("/invocations", "ana", "s1", "What does the second card mean?")
+    recorder.save_meta({"welcome": {"text": "Hi"}}, [{"name": "calculate_numerology"}], tarot_seed=42)
+    recorder.close()
+
+    replayer = Cassette(str(tmp_path), "replay")
+    meta = replayer.load_meta()
+    assert (meta["version"], meta["tarot_seed"], replayer.model_id) == (CASSETTE_VERSION, 42, "test-model")
+    assert meta["prompts"] == {"welcome": {"text": "Hi"}}
+    assert [r["prompt"] for r in replayer.load_requests()] == ["Draw three cards", "What does the second card mean?"]
+
+
+def test_missing_or_foreign_cassette_is_refused(tmp_path):
+    with pytest.raises(CassetteMissError):
+        Cassette(str(tmp_path), "replay").load_meta()
+    (tmp_path / "cassette.json").write_text('{"version": 0}')
+    with pytest.raises(CassetteMissError, match="version 0"):
+        Cassette(str(tmp_path), "replay").load_meta()
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Cassette(str(tmp_path), "rewind")
@@ -0,0 +1,18 @@
+"""
+Offline settings for the test suite
+
+app.core.config reads the environment on import, so these are set before any
+test module imports the app: in-process memory, local numerology tools, no
+remote MCP server, no warm-up and no warm-start snapshot.
+"""
+import os
+
+for name, value in {
+    "MEMORY_BACKEND": "memory",
+    "NUMEROLOGY_TOOLS": "local",
+    "MCP_SERVER_URI": "",
+    "STARTUP_WARMUP": "false",
+    "WARM_SNAPSHOT": "false",
+    "CASSETTE_MODE": "off",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,96 @@
+"""
+Recorded agent results, rebuilt as the strands objects routes receive
+
+Each JSON file under results/ is a snapshot of one run: the graph, swarm or
+pipeline shape (execution order, node history, status), every agent's final
+text and stop reason, and the event loop metrics /metrics reads. Nodes that
+failed are recorded as {"type": "error", "message": ...}.
+"""
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Union
+from strands.agent import AgentResult
+from strands.agent.state import AgentState
+from strands.multiagent.base import MultiAgentResult, NodeResult, Status
+from strands.multiagent.graph import GraphNode, GraphResult
+from strands.multiagent.swarm import SwarmNode, SwarmResult
+from strands.telemetry.metrics import EventLoopMetrics, ToolMetrics
+from app.agents.tarot_pipeline import PipelineResult
+from app.tools.tarot_deck import Reading
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def _agent_result(data: Dict[str, Any]) -> AgentResult:
+    metrics = EventLoopMetrics(
+        cycle_count=len(data.get("cycle_durations", [])),
+        cycle_durations=list(data.get("cycle_durations", [])),
+        accumulated_usage=dict(data.get("usage", {}))
+    )
+    for name, (calls, seconds) in data.get("tools", {}).items():
+        metrics.tool_metrics[name] = ToolMetrics(
+            tool={"toolUseId": f"tooluse_{name}", "name": name, "input": {}},
+            call_count=calls, success_count=calls, total_time=seconds
+        )
+    content = [{"text": data["text"]}] if data.get("text") is not None else []
+    return AgentResult(
+        stop_reason=data["stop_reason"],
+        message={"role": "assistant", "content": content},
+        metrics=metrics,
+        state={}
+    )
+
+
+def _swarm_node(node_id: str) -> SwarmNode:
+    # Only the id is read from node_history; SwarmNode snapshots its executor's state
+    return SwarmNode(node_id, SimpleNamespace(messages=[], state=AgentState()))
+
+
+def _multi_agent_result(data: Dict[str, Any]) -> MultiAgentResult:
+    status = Status(data.get("status", "completed"))
+    results = {node_id: _node_result(node) for node_id, node in data["results"].items()}
+    kind = data["type"]
+    if kind == "graph":
+        return GraphResult(
+            status=status,
+            results=results,
+            execution_order=[GraphNode(node_id, None) for node_id in data["execution_order"]]
+        )
+    if kind == "swarm":
+        return SwarmResult(
+            status=status,
+            results=results,
+            node_history=[_swarm_node(node_id) for node_id in data["node_history"]]
+        )
+    if kind == "pipeline":
+        reading = data.get("reading")
+        return PipelineResult(
+            status=status,
+            results=results,
+            node_history=list(data["node_history"]),
+            reading=Reading(reading["seed"], tuple(reading["ids"]), tuple(reading["reversed"]),
+                            reading.get("spread")) if reading else None
+        )
+    raise ValueError(f"Unknown result type {kind!r}")
+
+
+def _node_result(data: Dict[str, Any]) -> NodeResult:
+    if data["type"] == "error":
+        return NodeResult(result=RuntimeError(data["message"]), status=Status.FAILED)
+    result = build_result(data)
+    status = Status(data.get("status", "completed"))
+    return NodeResult(result=result, status=status)
+
+
+def build_result(data: Dict[str, Any]) -> Union[AgentResult, MultiAgentResult]:
+    """Strands result object for a recorded snapshot"""
+    if data["type"] == "agent":
+        return _agent_result(data)
+    return _multi_agent_result(data)
+
+
+def load_result(name: str) -> Union[AgentResult, MultiAgentResult]:
+    """Recorded result `results/<name>.json`"""
+    with open(RESULTS_DIR / f"{name}.json", encoding="utf-8") as f:
+        return build_result(json.load(f))
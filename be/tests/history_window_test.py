@@ -0,0 +1,96 @@
+"""Tests for the token-budgeted history window in app/core/history_window.py"""
+from strands.types.content import ContentBlock, Message
+from app.core.history_window import (
+    SUMMARY_HEADER, HistoryWindow, digest_turn, messages_tokens, split_turns
+)
+
+
+def history(turns: int, answer_words: int = 40):
+    messages = []
+    for i in range(turns):
+        messages.append(Message(role="user", content=[ContentBlock(text=f"Question {i}?")]))
+        messages.append(Message(role="assistant", content=[
+            ContentBlock(text=f"Answer {i} first sentence. " + "more detail " * answer_words)
+        ]))
+    return messages
+
+
+def texts(messages):
+    return [block["text"] for message in messages for block in message["content"]]
+
+
+def window(budget: int, summary_budget: int = 500, agent_turns=None) -> HistoryWindow:
+    return HistoryWindow(budget=budget, summary_budget=summary_budget, agent_turns=agent_turns or {}, max_sessions=10)
+
+
+def test_split_turns_starts_each_turn_at_a_user_message():
+    messages = [Message(role="assistant", content=[ContentBlock(text="Welcome")])] + history(2)
+    assert [len(turn) for turn in split_turns(messages)] == [1, 2, 2]
+
+
+def test_history_within_budget_is_unchanged():
+    messages = history(3)
+    result = window(10_000).compact("ana", "s1", messages)
+    assert result.messages == messages
+    assert (result.kept_turns, result.folded_turns, result.saved_tokens) == (3, 0, 0)
+
+
+def test_older_turns_fold_into_a_summary_on_the_first_kept_message():
+    messages = history(6)
+    turn_cost = messages_tokens(messages[:2])
+    result = window(turn_cost * 2).compact("ana", "s1", messages)
+
+    assert (result.kept_turns, result.folded_turns) == (2, 4)
+    assert result.messages[0]["role"] == "user"
+    summary_block, question = result.messages[0]["content"]
+    assert summary_block["text"] == f"{SUMMARY_HEADER}\n{result.summary}"
+    assert result.summary.splitlines() == [digest_turn(turn) for turn in split_turns(messages)[:4]]
+    assert question["text"] == "Question 4?"
+    assert texts(result.messages[1:]) == texts(messages[9:])
+    assert result.tokens < result.raw_tokens
+    # The caller's history is not modified
+    assert texts(messages) == texts(history(6))
+
+
+def test_latest_turn_is_kept_even_over_budget():
+    result = window(1).compact("ana", "s1", history(3))
+    assert (result.kept_turns, result.folded_turns) == (1, 2)
+
+
+def test_zero_budget_disables_compaction():
+    messages = history(10)
+    result = window(0).compact("ana", "s1", messages)
+    assert result.messages == messages and result.summary == ""
+
+
+def test_digest_keeps_question_and_first_sentence():
+    turn = history(1)[0:2]
+    assert digest_turn(turn) == "- User: Question 0? / Answer: Answer 0 first sentence."
+
+
+def test_folded_turns_are_digested_once():
+    win = window(1)
+    messages = history(4)
+    win.compact("ana", "s1", messages)
+    assert win.stats()["digests_built"] == 3
+    win.compact("ana", "s1", messages)
+    assert win.stats()["summaries_reused"] == 1
+    win.compact("ana", "s1", messages + history(5)[8:])
+    # Only the turn that just left the window is new
+    assert win.stats()["digests_built"] == 4
+
+
+def test_summary_is_capped_to_its_budget_keeping_the_newest_lines():
+    win = window(1, summary_budget=30)
+    result = win.compact("ana", "s1", history(8))
+    lines = result.summary.splitlines()
+    assert 0 < len(lines) < 7
+    assert lines[-1] == digest_turn(split_turns(history(8))[6])
+
+
+def test_slice_for_gives_agents_their_last_turns_without_the_summary():
+    win = window(1, agent_turns={"router": 0, "welcome": 1})
+    compacted = win.compact("ana", "s1", history(4)).messages
+    assert win.slice_for("router", compacted) == []
+    assert texts(win.slice_for("welcome", compacted)) == texts(history(4)[6:])
+    assert win.slice_for("numerology", compacted) is compacted
@@ -0,0 +1,75 @@
+"""Tests for the local intent classifier's fast-path thresholds in app/core/intent_classifier.py"""
+import pytest
+from app.core.intent_classifier import IntentClassifier, IntentPrediction, parse_route
+
+
+@pytest.fixture
+def classifier():
+    return IntentClassifier(threshold=0.75)
+
+
+@pytest.mark.parametrize("prompt, intent", [
+    ("hello", "welcome"),
+    ("thanks", "welcome"),
+    ("Calculate my life path number for 03/15/1990", "numerology"),
+    ("what is my soul urge number", "numerology"),
+    ("Do a tarot reading about my career", "tarot"),
+    ("will my relationship last", "tarot"),
+])
+def test_clear_prompts_take_the_fast_path(classifier, prompt, intent):
+    prediction = classifier.classify(prompt)
+    assert prediction.intent == intent
+    assert classifier.is_confident(prediction)
+
+
+@pytest.mark.parametrize("prompt", [
+    # Mixed intents and thin evidence stay below the threshold and go to the router
+    "Can you help with my life path or a tarot spread?",
+    "What does the number 7 mean",
+    "I want to know about my future",
+])
+def test_ambiguous_prompts_go_to_the_router(classifier, prompt):
+    prediction = classifier.classify(prompt)
+    assert prediction.intent is not None
+    assert 0 < prediction.confidence < 0.75
+    assert not classifier.is_confident(prediction)
+
+
+def test_prompt_without_evidence_has_no_intent(classifier):
+    prediction = classifier.classify("asdf qwerty")
+    assert prediction == IntentPrediction(None, 0.0, prediction.scores)
+    assert not classifier.is_confident(prediction)
+
+
+def test_threshold_is_inclusive_and_configurable():
+    prediction = IntentPrediction("tarot", 0.6, {"tarot": 1.0})
+    assert IntentClassifier(threshold=0.6).is_confident(prediction)
+    assert not IntentClassifier(threshold=0.61).is_confident(prediction)
+    assert not IntentClassifier(threshold=0).is_confident(IntentPrediction(None, 0.0, {}))
+
+
+def test_little_evidence_scales_confidence_down():
+    classifier = IntentClassifier(threshold=0.75, min_evidence=100)
+    prediction = classifier.classify("hello")
+    assert prediction.intent == "welcome"
+    assert prediction.confidence < 0.1
+
+
+def test_counters(classifier):
+    prediction = classifier.classify("hello")
+    classifier.record_fast_path(prediction)
+    classifier.record_router(classifier.classify("what is my life path"), "numerology")
+    classifier.record_router(classifier.classify("pull a card"), "welcome")
+    stats = classifier.stats()
+    assert (stats["classified"], stats["fast_path"]) == (3, 1)
+    assert (classifier.router_compared, classifier.router_agreed) == (2, 1)
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("tarot", "tarot"),
+    ("Route to: Numerology", "numerology"),
+    ("numerology, then tarot", "numerology"),
+    ("I am not sure", None),
+])
+def test_parse_route(text, intent):
+    assert parse_route(text) == intent
@@ -0,0 +1,97 @@
+"""Tests for MCP session pool retries and reconnects in app/core/mcp_pool.py, against the stub server"""
+import asyncio
+import time
+import pytest
+from mcp.client.sse import sse_client
+from app.core.mcp_pool import MCPSessionPool
+from stubs.mcp_server import StubMCPServer
+
+ARGUMENTS = {"full_name": "Ada Lovelace", "birth_date": "1815-12-10"}
+
+
+@pytest.fixture
+def server():
+    with StubMCPServer() as server:
+        yield server
+
+
+def make_pool(url: str, size: int = 2) -> MCPSessionPool:
+    return MCPSessionPool(
+        lambda: sse_client(url, timeout=5), size=size, call_timeout=5, connect_timeout=5,
+        backoff_base=0.05, backoff_max=0.2, health_interval=0.1
+    )
+
+
+def call(pool: MCPSessionPool, tool_use_id: str = "t1"):
+    return asyncio.run(pool.call_tool_async(tool_use_id, "calculate_numerology", ARGUMENTS))
+
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.02)
+
+
+def test_sessions_open_on_first_use(server):
+    pool = make_pool(server.url)
+    try:
+        result = call(pool)
+        assert result["status"] == "success"
+        assert pool.stats()["connected"] == 2
+        assert server.connections == 2
+    finally:
+        pool.stop()
+
+
+def test_call_after_a_server_restart_reconnects(server):
+    pool = make_pool(server.url)
+    try:
+        assert call(pool)["status"] == "success"
+        server.blip(downtime=0.1)
+
+        result = call(pool, "t2")
+
+        assert result["status"] == "success"
+        stats = pool.stats()
+        assert stats["errors"] == 0
+        assert stats["retries"] + stats["reconnects"] >= 1
+    finally:
+        pool.stop()
+
+
+def test_server_down_returns_an_error_result_and_backs_off():
+    server = StubMCPServer()
+    pool = make_pool(server.url, size=1)
+    try:
+        result = call(pool)
+        assert result["status"] == "error"
+        assert "Tool execution failed" in result["content"][0]["text"]
+        session = pool.sessions[0]
+        assert session.failures == 1
+        assert session.retry_at > time.monotonic() - 0.2
+        assert pool.stats()["errors"] == 1
+
+        # Health checks reopen the session once the server is back and the backoff expired
+        server.start()
+        time.sleep(0.25)
+        asyncio.run(pool.check())
+        assert pool.stats()["connected"] == 1
+        assert call(pool, "t2")["status"] == "success"
+    finally:
+        pool.stop()
+        server.stop()
+
+
+def test_health_check_reconnects_a_dropped_session(server):
+    pool = make_pool(server.url, size=1)
+    try:
+        assert call(pool)["status"] == "success"
+        server.stop()
+        wait_until(lambda: not pool.sessions[0].connected)
+        assert pool.unreachable
+        server.start()
+        wait_until(lambda: asyncio.run(pool.check()) or pool.stats()["connected"] == 1)
+        assert pool.stats()["reconnects"] == 1
+    finally:
+        pool.stop()
@@ -0,0 +1,80 @@
+"""Tests for the short-term memory storage backends in app/core/memory_backends.py"""
+import pytest
+from app.core.memory_backends import InMemoryBackend, RedisMemoryBackend, SQLiteMemoryBackend, create_backend
+from stubs.redis_server import StubRedisServer
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryBackend(max_events_per_session=5)
+    elif request.param == "sqlite":
+        backend = SQLiteMemoryBackend(str(tmp_path / "memory.db"))
+        yield backend
+        backend.close()
+    else:
+        pytest.importorskip("redis")
+        with StubRedisServer() as server:
+            backend = RedisMemoryBackend(server.url, max_events_per_session=5, ttl=60)
+            yield backend
+            # Disconnect before the server stops
+            backend.close()
+
+
+def texts(events):
+    return [[item["conversational"]["content"]["text"] for item in event["payload"]] for event in events]
+
+
+def test_event_round_trips_in_the_agentcore_shape(backend):
+    created = backend.create_event("ana", "s1", [("Hi", "USER"), ("Hello!", "ASSISTANT")])
+
+    [loaded] = backend.list_events("ana", "s1", 10)
+
+    assert loaded["eventId"] == created["eventId"]
+    assert loaded["payload"] == [
+        {"conversational": {"content": {"text": "Hi"}, "role": "USER"}},
+        {"conversational": {"content": {"text": "Hello!"}, "role": "ASSISTANT"}}
+    ]
+    assert loaded["eventTimestamp"].timestamp() == pytest.approx(created["eventTimestamp"].timestamp())
+
+
+def test_most_recent_events_are_listed_oldest_first(backend):
+    for i in range(4):
+        backend.create_event("ana", "s1", [(f"q{i}", "USER"), (f"a{i}", "ASSISTANT")])
+
+    assert texts(backend.list_events("ana", "s1", 3)) == [["q1", "a1"], ["q2", "a2"], ["q3", "a3"]]
+
+
+def test_sessions_are_kept_apart_and_deleted_alone(backend):
+    backend.create_event("ana", "s1", [("mine", "USER")])
+    backend.create_event("ana", "s2", [("other session", "USER")])
+    backend.create_event("bo", "s1", [("other actor", "USER")])
+
+    backend.delete_session("ana", "s1")
+
+    assert backend.list_events("ana", "s1", 10) == []
+    assert texts(backend.list_events("ana", "s2", 10)) == [["other session"]]
+    assert texts(backend.list_events("bo", "s1", 10)) == [["other actor"]]
+
+
+def test_capped_backends_keep_the_newest_events():
+    backend = InMemoryBackend(max_events_per_session=2)
+    for i in range(3):
+        backend.create_event("ana", "s1", [(f"q{i}", "USER")])
+    assert texts(backend.list_events("ana", "s1", 10)) == [["q1"], ["q2"]]
+
+
+def test_sqlite_events_survive_a_new_connection(tmp_path):
+    path = str(tmp_path / "memory.db")
+    first = SQLiteMemoryBackend(path)
+    first.create_event("ana", "s1", [("remember me", "USER")])
+    first.close()
+
+    second = SQLiteMemoryBackend(path)
+    assert texts(second.list_events("ana", "s1", 10)) == [["remember me"]]
+    second.close()
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown MEMORY_BACKEND"):
+        create_backend("dynamo")
@@ -0,0 +1,66 @@
+"""Tests for ShortTermMemory's off-loop calls in app/core/memory.py"""
+import asyncio
+import threading
+import time
+import pytest
+from app.core.memory import ShortTermMemory
+from app.core.memory_backends import InMemoryBackend
+
+
+class SlowBackend(InMemoryBackend):
+    """A backend whose calls block like a network round trip"""
+
+    def __init__(self, delay: float):
+        super().__init__(max_events_per_session=10)
+        self.delay = delay
+        self.threads = set()
+
+    def list_events(self, actor_id, session_id, max_results):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        return super().list_events(actor_id, session_id, max_results)
+
+
+def test_async_calls_round_trip_through_the_backend():
+    memory = ShortTermMemory(backend=InMemoryBackend(max_events_per_session=10), max_workers=2)
+
+    async def main():
+        await memory.acreate_event([("Hi", "USER"), ("Hello!", "ASSISTANT")], "ana", "s1")
+        return await memory.alist_events("ana", "s1", max_results=5)
+
+    [event] = asyncio.run(main())
+    memory.shutdown()
+    assert [item["conversational"]["content"]["text"] for item in event["payload"]] == ["Hi", "Hello!"]
+
+
+def test_blocking_backend_calls_do_not_stall_the_event_loop():
+    backend = SlowBackend(delay=0.2)
+    memory = ShortTermMemory(backend=backend, max_workers=4)
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        await asyncio.gather(*(memory.alist_events("ana", f"s{i}") for i in range(4)))
+        elapsed = time.perf_counter() - started
+        task.cancel()
+        return elapsed
+
+    elapsed = asyncio.run(main())
+    memory.shutdown()
+    # The four calls ran side by side on the memory pool while the loop kept ticking
+    assert elapsed < 0.6
+    assert len(ticks) >= 10
+    assert all(name.startswith("memory") for name in backend.threads)
+
+
+def test_slow_call_times_out():
+    memory = ShortTermMemory(backend=SlowBackend(delay=0.3), max_workers=1, timeout=0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(memory.alist_events("ana", "s1"))
+    memory.shutdown()
@@ -0,0 +1,88 @@
+"""Tests for follow-up matching in app/core/reading_store.py"""
+import pytest
+from app.core.intent_classifier import intent_classifier
+from app.core.reading_store import SessionReading, match_follow_up
+from app.tools.tarot_deck import Reading
+
+# The Tower (Past), The Empress (Present), Strength (Future)
+READING = SessionReading(Reading(42, (16, 3, 8), (False, False, False), "three_card"), "What lies ahead?", 0.0)
+
+
+def match(prompt: str):
+    """match_follow_up with the classifier's lean, as routes call it"""
+    return match_follow_up(prompt, READING, tarot_leaning=intent_classifier.classify(prompt).intent == "tarot")
+
+
+@pytest.mark.parametrize("prompt, focus", [
+    ("What does the third card mean for my career?", [2]),
+    ("and the last one?", [2]),
+    ("Tell me about card 2", [1]),
+    ("Why did the Tower come up?", [0]),
+    ("what does the future card say?", [2]),
+    ("Explain the present position", [1]),
+    ("Compare the first card and Strength", [0, 2]),
+])
+def test_named_cards(prompt, focus):
+    assert match(prompt) == focus
+    # Naming a card does not depend on the classifier
+    assert match_follow_up(prompt, READING) == focus
+
+
+@pytest.mark.parametrize("prompt", [
+    "What do these cards say about my job?",
+    "Is my reading good news?",
+    "Does it matter that none of them were reversed?",
+])
+def test_reading_as_a_whole(prompt):
+    assert match_follow_up(prompt, READING) == []
+
+
+@pytest.mark.parametrize("prompt, focus", [
+    ("what about the future?", [2]),
+    ("what does it mean?", []),
+    ("tell me more", []),
+])
+def test_generic_wording_needs_tarot_lean(prompt, focus):
+    assert match(prompt) == focus
+    assert match_follow_up(prompt, READING, tarot_leaning=False) is None
+
+
+@pytest.mark.parametrize("prompt", [
+    "what does the future hold for my numerology?",
+    "Tell me more about my life path number",
+    "thanks, what does it mean for my birthday number?",
+    "My name is Ana Lee, born 1990-07-14. What are my numbers?",
+    "hello!",
+])
+def test_other_questions_are_not_follow_ups(prompt):
+    assert match(prompt) is None
+
+
+@pytest.mark.parametrize("prompt", [
+    "What is my biggest strength according to my life path number?",
+    "What does my soul urge number say given the tower-like year I had?",
+])
+def test_bare_card_name_in_a_numerology_question(prompt):
+    assert intent_classifier.classify(prompt).intent == "numerology"
+    assert match(prompt) is None
+
+
+@pytest.mark.parametrize("prompt, focus", [
+    ("Is the Strength card about patience?", [2]),
+    ("what does strength mean here?", [2]),
+])
+def test_bare_card_name_with_card_context_or_tarot_lean(prompt, focus):
+    assert match_follow_up(prompt, READING, tarot_leaning=True) == focus
+
+
+@pytest.mark.parametrize("prompt", [
+    "Draw me another three cards",
+    "Can I get a new reading about the future?",
+    "Do a celtic cross for me",
+])
+def test_new_draw_is_not_a_follow_up(prompt):
+    assert match_follow_up(prompt, READING, tarot_leaning=True) is None
+
+
+def test_card_number_outside_the_reading():
+    assert match_follow_up("what about card 7?", READING) is None
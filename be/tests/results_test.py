@@ -0,0 +1,141 @@
+"""Tests for app/api/results.py against recorded results"""
+import pytest
+from app.api.results import (
+    ResultExtractionError, clean_text, extract_agent_result, extract_graph_result, node_usages, parse_cards
+)
+from app.tools.tarot_deck import Reading
+from tests.fixtures import load_result
+
+
+class TestParseCards:
+    def test_cards_line(self):
+        assert parse_cards("Intro\nCARDS: [The Fool, Death (Reversed), Ace of Swords]\nMore") == [
+            "The Fool", "Death (Reversed)", "Ace of Swords"
+        ]
+
+    def test_blank_entries_dropped(self):
+        assert parse_cards("CARDS: [The Star, , ]") == ["The Star"]
+
+    def test_no_cards_line(self):
+        assert parse_cards("Your life path number is 7.") == []
+
+
+class TestCleanText:
+    def test_thinking_removed(self):
+        text, cards = clean_text("<thinking>plan\nsteps</thinking>\nHello there")
+        assert text == "Hello there"
+        assert cards == []
+
+    def test_cards_kept_unless_stripped(self):
+        raw = "CARDS: [The Tower]\nThe Tower means change."
+        assert clean_text(raw) == (raw, [])
+        assert clean_text(raw, strip_cards=True) == ("The Tower means change.", ["The Tower"])
+
+    def test_only_first_cards_line_stripped(self):
+        text, cards = clean_text("CARDS: [A]\nmiddle\nCARDS: [B]", strip_cards=True)
+        assert cards == ["A"]
+        assert text == "middle\nCARDS: [B]"
+
+    def test_thinking_only_is_empty(self):
+        assert clean_text("<thinking>nothing to say</thinking>\n") == ("", [])
+
+
+class TestExtractGraphResult:
+    def test_numerology(self):
+        extracted = extract_graph_result(load_result("graph_numerology"))
+        assert extracted.agent == "numerology"
+        assert extracted.node == "numerology"
+        assert extracted.text.startswith("Your life path number is 7")
+        assert "<thinking>" not in extracted.text
+        assert extracted.cards == []
+        assert extracted.reading is None
+        # Router and specialist both count towards the turn
+        assert extracted.usage == {"inputTokens": 2042, "outputTokens": 420, "totalTokens": 2462}
+
+    def test_pipeline_reading_preferred(self):
+        stored = Reading(7, (21,), (False,), None)
+        extracted = extract_graph_result(load_result("graph_tarot_pipeline"), reading=stored)
+        assert extracted.agent == "tarot"
+        assert extracted.node == "life_advisor"
+        assert extracted.cards == ["The Fool", "Death (Reversed)", "Ace of Swords"]
+        assert extracted.reading.seed == 42
+        assert not extracted.text.startswith("CARDS:")
+        assert extracted.usage["outputTokens"] == 150 + 148 + 151 + 501
+
+    def test_swarm_last_responder(self):
+        extracted = extract_graph_result(load_result("graph_tarot_swarm"))
+        assert extracted.agent == "tarot"
+        assert extracted.node == "spread_reader"
+        assert extracted.cards == ["The Tower", "The Star"]
+        assert "CARDS:" not in extracted.text
+        assert extracted.text.startswith("Here is your reading.")
+
+    def test_reading_store_overrides_cards_line(self):
+        stored = Reading(3, (16, 17), (False, True), None)
+        extracted = extract_graph_result(load_result("graph_tarot_swarm"), reading=stored)
+        assert extracted.cards == stored.labels
+        assert extracted.reading is stored
+
+    def test_failed_node(self):
+        with pytest.raises(ResultExtractionError, match="Agent 'numerology' failed: ModelThrottledException"):
+            extract_graph_result(load_result("graph_failed_node"))
+
+    def test_swarm_without_responder(self):
+        with pytest.raises(ResultExtractionError, match="'tarot' finished without a responder \\(status: failed\\)"):
+            extract_graph_result(load_result("graph_swarm_no_responder"))
+
+    def test_empty_text(self):
+        with pytest.raises(ResultExtractionError, match="'welcome' returned no text \\(stop reason: max_tokens\\)"):
+            extract_graph_result(load_result("graph_empty_text"))
+
+    def test_only_router_ran(self):
+        result = load_result("graph_numerology")
+        del result.results["numerology"]
+        with pytest.raises(ResultExtractionError, match="No agent answered"):
+            extract_graph_result(result)
+
+
+class TestExtractAgentResult:
+    def test_followup(self):
+        extracted = extract_agent_result(load_result("agent_followup"), "tarot", strip_cards=True)
+        assert extracted.agent == extracted.node == "tarot"
+        assert extracted.text == "Death reversed is an ending you keep postponing."
+        # Cards named in a follow-up were not drawn in this turn
+        assert extracted.cards == []
+        assert extracted.usage["totalTokens"] == 1370
+
+    def test_cards_line_kept_without_strip(self):
+        extracted = extract_agent_result(load_result("agent_followup"), "tarot")
+        assert extracted.text.startswith("CARDS: [Death (Reversed)]")
+
+    def test_empty_text(self):
+        result = load_result("agent_followup")
+        result.message["content"] = []
+        with pytest.raises(ResultExtractionError, match="returned no text"):
+            extract_agent_result(result, "welcome")
+
+
+class TestNodeUsages:
+    def test_graph_agents(self):
+        usages = node_usages(load_result("graph_numerology"))
+        assert [(u.agent, u.node) for u in usages] == [("router", "router"), ("numerology", "numerology")]
+        numerology = usages[1]
+        assert numerology.model_calls == 2
+        assert numerology.seconds == pytest.approx(3.65)
+        assert numerology.tools == {"calculate_numerology": (1, 0.21)}
+
+    def test_pipeline_instances_share_a_node(self):
+        usages = node_usages(load_result("graph_tarot_pipeline"))
+        assert {u.agent for u in usages} == {"tarot"}
+        assert [u.node for u in usages] == ["card_interpreter"] * 3 + ["life_advisor"]
+
+    def test_swarm_agents_counted_once(self):
+        usages = node_usages(load_result("graph_tarot_swarm"))
+        assert [(u.agent, u.node) for u in usages] == [
+            ("router", "router"), ("tarot", "card_interpreter"), ("tarot", "spread_reader")
+        ]
+        assert usages[2].tools["draw_cards"] == (1, 0.002)
+
+    def test_failed_node_skipped(self):
+        usages = node_usages(load_result("graph_failed_node"))
+        assert [u.agent for u in usages] == ["router"]
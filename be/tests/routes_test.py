@@ -0,0 +1,37 @@
+"""Tests for request handling in app/api/routes.py, against the scripted model"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import app.agents.model as model_module
+from app.api import routes
+from app.core.config import config
+from app.core.intent_classifier import IntentClassifier
+from stubs.scripted_model import ScriptedModel
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(model_module, "_model", ScriptedModel(time_scale=0))
+    monkeypatch.setattr(routes, "intent_classifier", IntentClassifier())
+    app = FastAPI()
+    app.include_router(routes.router)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_fast_path_request_is_counted_once(client, monkeypatch):
+    monkeypatch.setattr(config, "INTENT_FAST_PATH", True)
+    response = client.post("/invocations", json={"prompt": "hello", "session_id": "fast-path"})
+    assert response.status_code == 200
+    assert response.json()["agent"] == "welcome"
+    stats = routes.intent_classifier.stats()
+    assert stats["classified"] == 1
+    assert stats["fast_path"] == 1
+    assert stats["fast_path_rate"] == 1.0
+
+
+def test_routed_request_is_not_a_fast_path(client, monkeypatch):
+    monkeypatch.setattr(config, "INTENT_FAST_PATH", False)
+    response = client.post("/invocations", json={"prompt": "hello", "session_id": "routed"})
+    assert response.status_code == 200
+    assert routes.intent_classifier.stats()["fast_path"] == 0
@@ -0,0 +1,47 @@
+"""Tests for the session history cache in app/core/session_tracker.py"""
+from app.core.session_tracker import SessionTracker
+
+
+def event(*turns):
+    """A memory event holding one or more (question, answer) turns, as a coalesced flush writes them"""
+    payload = []
+    for question, answer in turns:
+        payload.append({"conversational": {"content": {"text": question}, "role": "USER"}})
+        payload.append({"conversational": {"content": {"text": answer}, "role": "ASSISTANT"}})
+    return {"eventId": None, "payload": payload}
+
+
+def texts(messages):
+    return [message["content"][0]["text"] for message in messages]
+
+
+def test_history_is_capped_by_events_not_messages():
+    tracker = SessionTracker(max_events=2)
+    events = [event(("q1", "a1")), event(("q2", "a2"), ("q3", "a3"), ("q4", "a4")), event(("q5", "a5"))]
+
+    loaded = tracker.put("ana", "s1", events)
+
+    # The coalesced event keeps all three of its turns
+    assert texts(loaded) == ["q2", "a2", "q3", "a3", "q4", "a4", "q5", "a5"]
+    assert texts(tracker.get("ana", "s1")) == texts(loaded)
+
+
+def test_appended_turns_count_as_one_event_each():
+    tracker = SessionTracker(max_events=2)
+    tracker.put("ana", "s1", [event(("q1", "a1"), ("q2", "a2"))])
+
+    tracker.append_turn("ana", "s1", "q3", "a3")
+    assert texts(tracker.get("ana", "s1")) == ["q1", "a1", "q2", "a2", "q3", "a3"]
+
+    tracker.append_turn("ana", "s1", "q4", "a4")
+    assert texts(tracker.get("ana", "s1")) == ["q3", "a3", "q4", "a4"]
+    # A reload of the same events from memory gives the same history
+    reloaded = SessionTracker(max_events=2).put("ana", "s1", [event(("q3", "a3")), event(("q4", "a4"))])
+    assert texts(reloaded) == texts(tracker.get("ana", "s1"))
+
+
+def test_cached_history_is_a_copy():
+    tracker = SessionTracker()
+    tracker.put("ana", "s1", [event(("q1", "a1"))])
+    tracker.get("ana", "s1").append({"role": "user", "content": [{"text": "edited"}]})
+    assert texts(tracker.get("ana", "s1")) == ["q1", "a1"]
@@ -0,0 +1,63 @@
+"""Tests for the incremental clean-up of streamed text in app/api/streaming.py"""
+import pytest
+from app.api.streaming import StreamTextFilter, format_sse
+
+TAROT = (
+    "<thinking>The user wants a reading.\nDraw three cards.</thinking>\n"
+    "CARDS: [The Fool, Death (Reversed), Ace of Swords]\n"
+    "The Fool opens a new path; Death closes an old one."
+)
+
+
+def run(chunks, strip_cards=False):
+    stream = StreamTextFilter(strip_cards=strip_cards)
+    return "".join(stream.feed(chunk) for chunk in chunks) + stream.flush()
+
+
+def splits(text):
+    """The text in two chunks at every position, then one character at a time"""
+    for i in range(len(text) + 1):
+        yield [text[:i], text[i:]]
+    yield list(text)
+
+
+class TestStreamTextFilter:
+    def test_thinking_and_cards_removed(self):
+        assert run([TAROT], strip_cards=True) == "The Fool opens a new path; Death closes an old one."
+
+    def test_cards_kept_unless_stripped(self):
+        assert run([TAROT]) == (
+            "CARDS: [The Fool, Death (Reversed), Ace of Swords]\n"
+            "The Fool opens a new path; Death closes an old one."
+        )
+
+    @pytest.mark.parametrize("strip_cards", [False, True])
+    def test_any_chunking_gives_the_same_text(self, strip_cards):
+        expected = run([TAROT], strip_cards)
+        for chunks in splits(TAROT):
+            assert run(chunks, strip_cards) == expected, chunks
+
+    def test_thinking_between_answer_text(self):
+        text = "Your number is 7. <thinking>check the sum</thinking>It means wisdom."
+        for chunks in splits(text):
+            assert run(chunks) == "Your number is 7. It means wisdom."
+
+    def test_marker_prefix_is_held_back_until_decided(self):
+        stream = StreamTextFilter(strip_cards=True)
+        assert stream.feed("Look <thi") == "Look "
+        assert stream.feed("s is fine") == "<this is fine"
+        assert stream.feed(" CARD") == " "
+        assert stream.feed("S: [The Star]") == ""
+        assert stream.flush() == ""
+
+    def test_only_the_first_cards_line_is_hidden(self):
+        text = "CARDS: [The Star]\nLater I mention CARDS: [The Moon] again."
+        assert run([text], strip_cards=True) == "Later I mention CARDS: [The Moon] again."
+
+    def test_unclosed_thinking_is_never_emitted(self):
+        for chunks in splits("Hello <thinking>never finished"):
+            assert run(chunks) == "Hello "
+
+
+def test_format_sse():
+    assert format_sse("text", {"delta": "Olá"}) == 'event: text\ndata: {"delta": "Olá"}\n\n'
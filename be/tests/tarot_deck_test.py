@@ -0,0 +1,88 @@
+"""Tests for seeded, reproducible draws in app/tools/tarot_deck.py"""
+import pytest
+from app.tools.tarot_deck import (
+    DECK_SIZE, MAX_DRAW_CARDS, SPREADS, SessionDecks, draw_batch, draw_cards, draw_reading, find_card
+)
+
+
+class TestDrawReading:
+    def test_same_seed_same_reading(self):
+        first = draw_reading("celtic_cross", allow_reversed=True, seed=42)
+        assert draw_reading("celtic_cross", allow_reversed=True, seed=42) == first
+        assert first.seed == 42
+
+    def test_seeds_give_different_readings(self):
+        readings = {draw_reading(3, seed=seed).ids for seed in range(20)}
+        assert len(readings) == 20
+
+    def test_cards_are_distinct_and_in_the_deck(self):
+        for seed in range(50):
+            reading = draw_reading(MAX_DRAW_CARDS, allow_reversed=True, seed=seed)
+            assert len(set(reading.ids)) == MAX_DRAW_CARDS
+            assert all(0 <= card_id < DECK_SIZE for card_id in reading.ids)
+
+    def test_reversals_only_when_allowed(self):
+        upright = [draw_reading(10, seed=seed) for seed in range(20)]
+        assert not any(any(reading.reversed) for reading in upright)
+        mixed = [draw_reading(10, allow_reversed=True, seed=seed) for seed in range(20)]
+        assert any(any(reading.reversed) for reading in mixed)
+
+    def test_spread_labels_positions(self):
+        reading = draw_reading("three_card", seed=7)
+        assert reading.spread == "three_card"
+        assert reading.positions == SPREADS["three_card"].positions
+        assert [drawn.position for drawn in reading.cards] == ["Past", "Present", "Future"]
+        assert reading.formatted == f"CARDS: [{', '.join(reading.labels)}]"
+
+    @pytest.mark.parametrize("count, drawn", [(0, 1), (-3, 1), (4, 4), (MAX_DRAW_CARDS + 1, MAX_DRAW_CARDS), (78, MAX_DRAW_CARDS)])
+    def test_card_count_is_capped(self, count, drawn):
+        assert len(draw_reading(count, seed=1).ids) == drawn
+
+    def test_unknown_spread_is_rejected(self):
+        with pytest.raises(ValueError, match="Unknown spread"):
+            draw_reading("horseshoe", seed=1)
+
+    def test_labels_round_trip_through_find_card(self):
+        reading = draw_reading(10, allow_reversed=True, seed=3)
+        for label, card_id, reversed_ in zip(reading.labels, reading.ids, reading.reversed):
+            card, is_reversed = find_card(label)
+            assert (card.id, is_reversed) == (card_id, reversed_)
+
+
+def test_batch_is_reproducible_and_replayable():
+    spreads = ["single", 3, "celtic_cross", 5]
+    batch = draw_batch(spreads, allow_reversed=True, seed=99)
+    assert draw_batch(spreads, allow_reversed=True, seed=99) == batch
+    assert [len(reading.ids) for reading in batch] == [1, 3, 10, 5]
+    for spread, reading in zip(spreads, batch):
+        assert draw_reading(spread, allow_reversed=True, seed=reading.seed) == reading
+
+
+def test_draw_cards_replays_its_seed():
+    first = draw_cards(num_cards=4, allow_reversed=True)
+    again = draw_cards(num_cards=4, allow_reversed=True, seed=first["seed"])
+    assert again["cards"] == first["cards"]
+    assert again["count"] == 4
+
+
+class TestSessionDecks:
+    def test_fixed_base_seed_repeats_each_session_sequence(self):
+        first, second = SessionDecks(base_seed=5), SessionDecks(base_seed=5)
+        assert [first.draw("s1", 3) for _ in range(3)] == [second.draw("s1", 3) for _ in range(3)]
+
+    def test_sessions_have_their_own_sequences(self):
+        decks = SessionDecks(base_seed=5)
+        assert decks.draw("s1", 10).ids != decks.draw("s2", 10).ids
+
+    def test_reset_and_eviction_start_the_sequence_over(self):
+        decks = SessionDecks(base_seed=5, max_sessions=1)
+        opening = decks.draw("s1", 3)
+        decks.draw("s1", 3)
+        decks.reset("s1")
+        assert decks.draw("s1", 3) == opening
+        decks.draw("s2", 3)  # evicts s1
+        assert decks.draw("s1", 3) == opening
+
+    def test_draw_without_session_is_one_off(self):
+        decks = SessionDecks(base_seed=5)
+        assert decks.draw(None, 3).seed != decks.draw(None, 3).seed
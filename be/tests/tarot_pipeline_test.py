@@ -0,0 +1,42 @@
+"""Tests for the tarot pipeline's fallback to the swarm"""
+import asyncio
+from types import SimpleNamespace
+from app.agents import tarot_pipeline
+from app.agents.tarot_pipeline import TarotPipeline
+
+
+class RecordingSwarm:
+    def __init__(self):
+        self.tasks = []
+
+    async def invoke_async(self, task, invocation_state=None, **kwargs):
+        self.tasks.append(task)
+        return "swarm result"
+
+
+def test_failed_card_interpretation_falls_back_to_the_swarm(monkeypatch):
+    calls = []
+
+    async def interpret(prompt):
+        calls.append(prompt)
+        if len(calls) == 2:
+            raise RuntimeError("model throttled")
+        await asyncio.sleep(0)
+        return SimpleNamespace(message={"content": [{"text": "fine"}]})
+
+    swarm = RecordingSwarm()
+    pipeline = TarotPipeline(swarm)
+    monkeypatch.setattr(pipeline, "_interpreter", lambda: SimpleNamespace(invoke_async=interpret))
+    monkeypatch.setattr(pipeline, "_advisor", lambda: (_ for _ in ()).throw(AssertionError("advisor ran")))
+    streamed = []
+
+    result = asyncio.run(pipeline.invoke_async(
+        "Draw three cards for my career",
+        {"session_id": "s1", "callback_handler": lambda **event: streamed.append(event)}
+    ))
+
+    assert result == "swarm result"
+    assert swarm.tasks == ["Draw three cards for my career"]
+    assert len(calls) == 3
+    assert streamed == []
+    assert tarot_pipeline.tarot_runs["interpreter_failed"] >= 1
@@ -0,0 +1,136 @@
+"""Tests for the memoizing tool result cache in app/core/tool_cache.py"""
+import asyncio
+from typing import Any, Dict
+import pytest
+from strands.types._events import ToolResultEvent
+from strands.types.tools import AgentTool
+import app.core.tool_cache as tool_cache
+from app.core.tool_cache import CachedTool, ToolResultCache, cache_key
+
+
+class CountingTool(AgentTool):
+    """A slow deterministic tool that counts its executions"""
+
+    def __init__(self, name: str = "calculate_numerology", status: str = "success", delay: float = 0.02):
+        super().__init__()
+        self.name = name
+        self.status = status
+        self.delay = delay
+        self.calls = 0
+
+    @property
+    def tool_name(self) -> str:
+        return self.name
+
+    @property
+    def tool_spec(self) -> Dict[str, Any]:
+        return {"name": self.name, "description": "test tool", "inputSchema": {"json": {"type": "object"}}}
+
+    @property
+    def tool_type(self) -> str:
+        return "python"
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        yield ToolResultEvent({
+            "toolUseId": tool_use["toolUseId"],
+            "status": self.status,
+            "content": [{"text": f"life path for {tool_use['input'].get('full_name')}"}]
+        })
+
+
+async def call(tool: AgentTool, tool_use_id: str, **arguments):
+    tool_use = {"toolUseId": tool_use_id, "name": tool.tool_name, "input": arguments}
+    events = [event async for event in tool.stream(tool_use, {})]
+    return events[-1].tool_result
+
+
+def test_key_ignores_order_whitespace_and_none():
+    assert cache_key("t", {"b": " 1990-01-01", "a": "Ada  Lovelace", "year": None}) == cache_key(
+        "t", {"a": "Ada Lovelace", "b": "1990-01-01"}
+    )
+
+
+@pytest.mark.parametrize("first, second", [
+    ({"a": "Ada"}, {"a": "ada"}),
+    ({"a": "Ada"}, {"a": "Ada", "year": 2024}),
+    ({"a": [1, 2]}, {"a": [2, 1]}),
+])
+def test_key_keeps_significant_differences(first, second):
+    assert cache_key("t", first) != cache_key("t", second)
+
+
+def test_only_opted_in_tools_are_wrapped():
+    cache = ToolResultCache(tools=["calculate_numerology"])
+    other = CountingTool("number_compatibility")
+    wrapped = cache.wrap([CountingTool(), other])
+    assert isinstance(wrapped[0], CachedTool)
+    assert wrapped[1] is other
+    assert ToolResultCache(tools=[]).wrap([other]) == [other]
+
+
+def test_repeated_call_is_served_with_its_own_tool_use_id():
+    tool = CountingTool()
+    cached = CachedTool(tool, ToolResultCache(tools=[tool.tool_name]))
+
+    async def main():
+        first = await call(cached, "first", full_name="Ada Lovelace")
+        second = await call(cached, "second", full_name="Ada  Lovelace")
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert tool.calls == 1
+    assert (first["toolUseId"], second["toolUseId"]) == ("first", "second")
+    assert first["content"] == second["content"]
+    assert cached.cache.stats()["hits"] == 1
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(tool_cache.time, "time", lambda: now[0])
+    tool = CountingTool(delay=0)
+    cached = CachedTool(tool, ToolResultCache(tools=[tool.tool_name], ttl=60))
+
+    asyncio.run(call(cached, "1", full_name="Ada"))
+    now[0] += 59
+    asyncio.run(call(cached, "2", full_name="Ada"))
+    assert tool.calls == 1
+    now[0] += 2
+    asyncio.run(call(cached, "3", full_name="Ada"))
+    assert tool.calls == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    tool = CountingTool(delay=0)
+    cached = CachedTool(tool, ToolResultCache(tools=[tool.tool_name], max_entries=2))
+
+    async def main():
+        for name in ("Ada", "Bob", "Ada", "Cy", "Ada", "Bob"):
+            await call(cached, name, full_name=name)
+
+    asyncio.run(main())
+    # Cy evicted Bob (Ada was used more recently), so Bob ran twice
+    assert tool.calls == 4
+    assert cached.cache.stats()["evictions"] == 2
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    tool = CountingTool()
+    cached = CachedTool(tool, ToolResultCache(tools=[tool.tool_name]))
+
+    async def main():
+        return await asyncio.gather(*(call(cached, str(i), full_name="Ada") for i in range(8)))
+
+    results = asyncio.run(main())
+    assert tool.calls == 1
+    assert [result["toolUseId"] for result in results] == [str(i) for i in range(8)]
+    assert cached.cache.stats()["collapsed"] == 7
+
+
+def test_errors_are_not_cached():
+    tool = CountingTool(status="error", delay=0)
+    cached = CachedTool(tool, ToolResultCache(tools=[tool.tool_name]))
+    asyncio.run(call(cached, "1", full_name="Ada"))
+    asyncio.run(call(cached, "2", full_name="Ada"))
+    assert tool.calls == 2
@@ -0,0 +1,85 @@
+"""Tests for the write-behind queue in app/core/write_behind.py"""
+import asyncio
+import json
+from app.core.write_behind import WriteBehindQueue
+
+
+class RecordingMemory:
+    """acreate_event that records every write, optionally failing or stalling"""
+
+    def __init__(self, failures: int = 0, delay: float = 0.0):
+        self.events = []
+        self.failures = failures
+        self.delay = delay
+
+    async def acreate_event(self, messages, actor_id, session_id):
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise OSError("memory unavailable")
+        self.events.append((actor_id, session_id, list(messages)))
+
+
+def queue(tmp_path, memory, **kwargs) -> WriteBehindQueue:
+    kwargs.setdefault("flush_interval", 0)
+    return WriteBehindQueue(memory, spill_path=str(tmp_path / "spill.jsonl"), **kwargs)
+
+
+def turn(i: int):
+    return [(f"question {i}", "USER"), (f"answer {i}", "ASSISTANT")]
+
+
+def written_turns(memory, session_id: str):
+    return [text for _, sid, messages in memory.events if sid == session_id for text, _ in messages]
+
+
+def test_turns_are_spilled_before_the_write_returns(tmp_path):
+    async def main():
+        writer = queue(tmp_path, RecordingMemory(delay=0.05))
+        await writer.enqueue(turn(1), "ana", "s1")
+        spilled = [json.loads(line) for line in (tmp_path / "spill.jsonl").read_text().splitlines()]
+        assert spilled[0]["messages"] == [list(m) for m in turn(1)]
+        await writer.drain(timeout=5)
+        assert (tmp_path / "spill.jsonl").read_text() == ""
+
+    asyncio.run(main())
+
+
+def test_full_queue_keeps_each_session_in_order(tmp_path):
+    memory = RecordingMemory(delay=0.01)
+
+    async def main():
+        # Room for one turn: every other enqueue waits for the worker
+        writer = queue(tmp_path, memory, max_pending=2)
+        for i in range(6):
+            await writer.enqueue(turn(i), "ana", "s1" if i % 2 else "s2")
+        await writer.drain(timeout=5)
+        return writer
+
+    writer = asyncio.run(main())
+    assert written_turns(memory, "s1") == [text for i in (1, 3, 5) for text, _ in turn(i)]
+    assert written_turns(memory, "s2") == [text for i in (0, 2, 4) for text, _ in turn(i)]
+    assert writer.stats()["backpressure_waits"] > 0
+
+
+def test_failed_writes_are_parked_and_visible(tmp_path):
+    memory = RecordingMemory(failures=10)
+
+    async def main():
+        writer = queue(tmp_path, memory, retries=0)
+        await writer.enqueue(turn(1), "ana", "s1")
+        await asyncio.wait_for(writer._idle.wait(), timeout=5)
+        assert writer.stats()["parked_messages"] == 2
+        events = writer.pending_events("ana", "s1")
+        assert [item["conversational"]["content"]["text"] for item in events[0]["payload"]] == [
+            "question 1", "answer 1"
+        ]
+        # Later turns of the session wait behind the parked one
+        await writer.enqueue(turn(2), "ana", "s1")
+        await asyncio.wait_for(writer._idle.wait(), timeout=5)
+        assert writer.stats()["parked_messages"] == 4
+        memory.failures = 0
+        await writer.drain(timeout=5)
+
+    asyncio.run(main())
+    assert written_turns(memory, "s1") == ["question 1", "answer 1", "question 2", "answer 2"]